@@ -1,34 +1,67 @@
 import os 
 import logging
 import uuid
-from flask import Flask, request, render_template, render_template_string, jsonify, Response, session, redirect, url_for
+import json
+import queue
+import threading
+import contextvars
+from flask import Flask, request, render_template, render_template_string, jsonify, Response, session, redirect, url_for, stream_with_context
 from functools import wraps
+from pipeline import Deadline, bound_by, run_parallel
+from gemini_client import generate_content_stream
+from client_pool import client_pool, GENAI_BACKEND, GENAI_INSTALLED
+from llm_cache import response_cache
+from context_cache import prefix_cache
+from metrics import llm_metrics
+from resilience import gemini_resilience, track_degraded
+from ratelimit import gemini_rate_limiter, track_quota_wait
+from skills import render_skills_latex
+from resume_model import resume_parse_cache
+from keyword_coverage import coverage_calibration, feedback_with_uncovered
+from latex_lint import latex_validation_stats
+from resume_steps import (
+    DEFAULT_LATEX_TEMPLATE, FORMATTER_PROMPT_PREFIX, OPTIMIZER_PROMPT_PREFIX, EVALUATE_AND_ANALYZE_DEFAULTS,
+    mock_process_resume, build_formatter_prompt, build_optimizer_prompt, evaluate_and_analyze_results,
+    needs_optimization, run_step, format_resume, repair_sections, validate_latex, evaluate_match,
+    evaluate_coverage, rewrite_sections, optimize_resume, write_cover_letter, recommend_skills, tailor_resume,
+)
+from speculation import SPECULATIVE_OPTIMIZATION, Speculation, speculative_feedback, speculation_stats
+from resume_storage import create_resume_store
+from jobs import JobStore, JobQueue
+from batch import BATCH_MAX_JOBS, run_batch, rank_results, build_latex_zip
+
+# Configure logging before anything is logged, so the first warning does not install the default handler
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-try:
-    from google import genai
-    HAS_GENAI = True
-except ImportError:
-    HAS_GENAI = False
+# The offline mock backend (GENAI_BACKEND=mock) does not need the SDK; client_pool imports it
+# when the first real client is built
+HAS_GENAI = GENAI_BACKEND == "mock" or GENAI_INSTALLED
+if not HAS_GENAI:
     logging.warning("Google Generative AI module not found. Using mock implementation.")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
 # Read the default Gemini API key from environment variable (or use a fallback)
 DEFAULT_GENAI_API_KEY = os.environ.get("GENAI_API_KEY", "YOUR_DEFAULT_API_KEY")
 
 # Create a default client using the default API key if the module is available
 if HAS_GENAI:
-    default_client = genai.Client(api_key=DEFAULT_GENAI_API_KEY)
+    default_client = client_pool.get(DEFAULT_GENAI_API_KEY)
 else:
     default_client = None
 
+def has_ai(client):
+    """Whether Gemini can be called with this client; without it each step uses its local fallback."""
+    return bool(client) and HAS_GENAI
+
 app = Flask(__name__)
-app.secret_key = os.urandom(24)  # Required for session management
+# Required for session management; set FLASK_SECRET_KEY so sessions survive restarts and work across workers
+app.secret_key = os.environ.get("FLASK_SECRET_KEY") or os.urandom(24)
 
 # Set the passcode
 PASSCODE = "ibrahim@aplyease4139"
 
+# Bearer token that lets a Prometheus scraper read /metrics without logging in (optional)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 # Login required decorator
 def login_required(f):
     @wraps(f)
@@ -52,34 +85,12 @@ def logout():
     session.pop('authenticated', None)
     return redirect(url_for('login'))
 
-# In-memory store for resumes. Each entry will be a dict with keys:
-# "latex_code": the LaTeX content, "score": the alignment score, "api_key": the API key used (if any)
-resume_store = {}
+# Bounded store for generated resumes (see resume_storage.py). Each entry is a dict with keys:
+# "latex_code": the LaTeX content, "score": the alignment score, "feedback": the evaluation feedback
+resume_store = create_resume_store()
 
-# Load the default LaTeX template
-def load_template(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except Exception as e:
-        logging.error(f"Error loading template file {file_path}: {str(e)}")
-        return ""
-
-# Load prompt template files
-def load_prompt(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except Exception as e:
-        logging.error(f"Error loading prompt file {file_path}: {str(e)}")
-        return ""
-
-# Default LaTeX resume template
-DEFAULT_LATEX_TEMPLATE = load_template("templates/latex_template.tex")
-RESUME_FORMATTER_PROMPT = load_prompt("prompts/resume_formatter.txt")
-RESUME_EVALUATOR_PROMPT = load_prompt("prompts/resume_evaluator.txt")
-RESUME_OPTIMIZER_PROMPT = load_prompt("prompts/resume_optimizer.txt")
-COVER_LETTER_PROMPT = load_prompt("prompts/cover_letter_generator.txt")
+# Background generation jobs, polled via /jobs/<job_id> (see jobs.py)
+job_queue = JobQueue(JobStore())
 
 @app.route("/", methods=["GET"]) 
 @login_required
@@ -104,66 +115,16 @@ def generate_resume():
         
         # Use the provided API key if available; otherwise, use default
         if HAS_GENAI:
-            local_client = genai.Client(api_key=provided_api_key) if provided_api_key else default_client
+            local_client = client_pool.get(provided_api_key) if provided_api_key else default_client
             if not local_client:
                 return jsonify({"error": "No valid API client available"}), 500
         else:
             local_client = None
 
         try:
-            logging.info("Starting resume processing")
-            
-            # Process the resume content with Gemini
-            latex_code = process_with_gemini(local_client, resume_content, job_description)
-            if not latex_code:
+            response_data = run_resume_pipeline(local_client, resume_content, job_description, company_name)
+            if not response_data:
                 return jsonify({"error": "Failed to generate LaTeX code"}), 500
-            
-            # Evaluate the resume's alignment with the job description
-            score, feedback = evaluate_resume_job_match(local_client, latex_code, job_description)
-            
-            # Analyze skills
-            skills_analysis = analyze_skills(local_client, latex_code, job_description)
-            if not skills_analysis:
-                skills_analysis = {
-                    "current_skills": ["Error analyzing skills"],
-                    "missing_skills": [],
-                    "recommended_skills": [],
-                    "latex_skills_section": ""
-                }
-            
-            optimized = False
-            optimization_message = ''
-            
-            # If score is below 8, reprocess to better align with job description
-            if score < 8:
-                logging.info(f"Initial score {score}/10 is below threshold. Reprocessing resume...")
-                latex_code = optimize_resume_for_job(local_client, latex_code, job_description, feedback)
-                optimized = True
-                optimization_message = 'Optimization was performed automatically because the initial score was low.'
-                # Re-evaluate the optimized resume
-                score, feedback = evaluate_resume_job_match(local_client, latex_code, job_description)
-                logging.info(f"Optimized resume score: {score}/10")
-            
-            # Generate a unique ID and store the LaTeX code and score
-            resume_id = str(uuid.uuid4())
-            resume_store[resume_id] = {
-                "latex_code": latex_code,
-                "score": score,
-                "feedback": feedback,
-                "api_key": provided_api_key if provided_api_key else None
-            }
-
-            response_data = {
-                "resume_id": resume_id,
-                "latex_code": latex_code,
-                "score": score,
-                "feedback": feedback,
-                "optimized": optimized,
-                "optimization_message": optimization_message,
-                "skills_analysis": skills_analysis,
-                "message": "Resume generated successfully",
-                "company_name": company_name
-            }
 
             return jsonify(response_data), 200
 
@@ -176,14 +137,322 @@ def generate_resume():
         logging.exception("An error occurred in the generate_resume route")
         return jsonify({"error": "Server error occurred"}), 500
 
+def run_resume_pipeline(client, resume_content, job_description, company_name, progress=None, on_event=None):
+    """
+    Format -> evaluate + analyze skills -> optimize if the score is low, then save the result.
+    Returns the response payload, or None if no LaTeX was generated. `progress(stage, message)`
+    is called as each stage starts (used by background jobs to report status). When `on_event`
+    is given the LaTeX is streamed through it: on_event("chunk", {"text": ...}) as Gemini writes
+    it, and on_event("reset", {}) before the optimized resume replaces the first draft.
+    "degraded_stages" lists the Gemini stages that failed and fell back; when the evaluation is
+    one of them the score is None rather than a made-up number. "quota_wait" reports how long
+    the calls queued for the API key's rate limit. Every Gemini call is bounded by the request
+    deadline (PIPELINE_DEADLINE_SECONDS); calls it cuts short fall back like any other failure.
+    """
+    progress = progress or (lambda stage, message: None)
+    logging.info("Starting resume processing")
+    deadline = Deadline()
+    
+    def on_wait(seconds, queue_depth):
+        progress("queued", f"Waiting {seconds:.0f}s for Gemini quota ({queue_depth} call(s) queued)...")
+    
+    with track_degraded() as degraded, track_quota_wait(on_wait) as quota_wait, bound_by(deadline):
+        # Process the resume content with Gemini
+        progress("formatting", "Generating LaTeX...")
+        latex_code = generate_latex(client, resume_content, job_description, on_event)
+        if not latex_code:
+            return None
+        
+        speculation = start_speculative_optimization(client, latex_code, job_description)
+        progress("evaluating", "Evaluating resume and analyzing skills...")
+        score, feedback, skills_analysis, incomplete, coverage = evaluate_and_analyze(client, latex_code, job_description, deadline)
+        
+        optimized = False
+        optimization_message = ''
+        
+        # If score is below 8, reprocess to better align with job description
+        if needs_optimization(score, incomplete, deadline):
+            logging.info(f"Initial score {score}/10 is below threshold. Reprocessing resume...")
+            progress("optimizing", f"Initial score {score}/10 is below threshold. Optimizing resume...")
+            latex_code = optimize_latex(client, latex_code, job_description, feedback_with_uncovered(feedback, coverage),
+                                        score, speculation, deadline, on_event)
+            optimized = True
+            optimization_message = 'Optimization was performed automatically because the initial score was low.'
+            # Re-evaluate the optimized resume
+            progress("re-evaluating", "Evaluating the optimized resume...")
+            score, feedback, coverage = evaluate_with_coverage(client, latex_code, job_description)
+            logging.info(f"Optimized resume score: {score}/10")
+        if speculation:
+            speculation.discard()
+    
+    # Generate a unique ID and store the LaTeX code and score
+    resume_id = str(uuid.uuid4())
+    resume_store.save(resume_id, {
+        "latex_code": latex_code,
+        "score": score,
+        "feedback": feedback
+    })
+
+    return {
+        "resume_id": resume_id,
+        "latex_code": latex_code,
+        "score": score,
+        "feedback": feedback,
+        "optimized": optimized,
+        "optimization_message": optimization_message,
+        "skills_analysis": skills_analysis,
+        "message": "Resume generated successfully",
+        "company_name": company_name,
+        "partial": bool(incomplete),
+        "incomplete_stages": incomplete,
+        "degraded": bool(degraded),
+        "degraded_stages": degraded,
+        "quota_wait": quota_wait,
+        "keyword_coverage": coverage
+    }
+
+def generate_latex(client, resume_content, job_description, on_event=None):
+    """The formatter stage of run_resume_pipeline; streams the draft through `on_event` when given."""
+    if on_event is None:
+        return process_with_gemini(client, resume_content, job_description)
+    chunks = []
+    for chunk in stream_with_gemini(client, resume_content, job_description):
+        chunks.append(chunk)
+        on_event("chunk", {"text": chunk})
+    latex_code = "".join(chunks).strip()
+    if not latex_code:
+        return None
+    return validate_latex_output(client, latex_code) or DEFAULT_LATEX_TEMPLATE
+
+def optimize_latex(client, latex_code, job_description, feedback, score, speculation=None, deadline=None, on_event=None):
+    """
+    The optimization stage of run_resume_pipeline: uses the speculative result when there is one,
+    otherwise rewrites the resume (streamed through `on_event` when given).
+    """
+    optimized_latex = speculation.accept(deadline) if speculation else None
+    if on_event is None:
+        return optimized_latex or optimize_resume_for_job(client, latex_code, job_description, feedback, score=score)
+    on_event("reset", {})
+    if optimized_latex:
+        # Already optimized next to the evaluation; sent in one chunk
+        on_event("chunk", {"text": optimized_latex})
+        return optimized_latex
+    chunks = []
+    for chunk in stream_optimize_resume_for_job(client, latex_code, job_description, feedback, score):
+        chunks.append(chunk)
+        on_event("chunk", {"text": chunk})
+    return validate_latex_output(client, "".join(chunks), previous=latex_code) or latex_code
+
+def start_speculative_optimization(client, latex_code, job_description):
+    """
+    Starts optimizing the first draft next to its evaluation when SPECULATIVE_OPTIMIZATION is on
+    (speculation.py). Returns the Speculation, or None when it is off or Gemini is unavailable.
+    """
+    if not SPECULATIVE_OPTIMIZATION or not has_ai(client):
+        return None
+    feedback = speculative_feedback(latex_code, job_description)
+    return Speculation(optimize_resume_for_job, (client, latex_code, job_description, feedback), baseline=latex_code)
+
+def generate_resume_job(progress, client, resume_content, job_description, company_name):
+    """Background-job wrapper around run_resume_pipeline; a missing result fails the job."""
+    result = run_resume_pipeline(client, resume_content, job_description, company_name, progress)
+    if not result:
+        raise RuntimeError("Failed to generate LaTeX code")
+    return result
+
+@app.route("/jobs/generate_resume", methods=["POST"])
+@login_required
+def submit_generate_resume_job():
+    """Queues a resume generation and returns 202 with a job id to poll at /jobs/<job_id>."""
+    resume_content = request.form.get("resume_content")
+    job_description = request.form.get("job_description")
+    company_name = request.form.get("company_name", "").strip()
+    provided_api_key = request.form.get("api_key")
+    
+    if not resume_content:
+        return jsonify({"error": "No resume content provided"}), 400
+    
+    if not job_description:
+        return jsonify({"error": "Job description is required for tailoring"}), 400
+    
+    if HAS_GENAI:
+        local_client = client_pool.get(provided_api_key) if provided_api_key else default_client
+        if not local_client:
+            return jsonify({"error": "No valid API client available"}), 500
+    else:
+        local_client = None
+    
+    job_id = job_queue.submit("generate_resume", generate_resume_job, local_client, resume_content, job_description, company_name)
+    if not job_id:
+        response = jsonify({"error": "The server is busy. Please try again shortly."})
+        response.headers["Retry-After"] = "30"
+        return response, 503
+    
+    status_url = url_for("get_job", job_id=job_id)
+    response = jsonify({"job_id": job_id, "status": "queued", "status_url": status_url})
+    response.headers["Location"] = status_url
+    return response, 202
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+@login_required
+def get_job(job_id):
+    """Stage-by-stage progress of a background job, plus its result once it has finished."""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    job.pop("owner", None)
+    return jsonify(job), 200
+
+def evaluate_and_analyze(client, latex_code, job_description, deadline):
+    """
+    Runs evaluation and skills analysis concurrently; both only depend on the finished LaTeX.
+    Returns (score, feedback, skills_analysis, incomplete_stages, keyword coverage report).
+    """
+    results, incomplete = run_parallel(
+        {
+            "evaluation": (evaluate_with_coverage, (client, latex_code, job_description)),
+            "skills_analysis": (analyze_skills, (client, latex_code, job_description)),
+        },
+        deadline=deadline,
+        defaults=EVALUATE_AND_ANALYZE_DEFAULTS
+    )
+    score, feedback, skills_analysis, coverage = evaluate_and_analyze_results(results)
+    return score, feedback, skills_analysis, incomplete, coverage
+
+def sse_event(event, data):
+    """Formats a single Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route("/generate_resume_stream", methods=["POST"])
+@login_required
+def generate_resume_stream():
+    """Same pipeline as /generate_resume, streamed to the browser as Server-Sent Events."""
+    resume_content = request.form.get("resume_content")
+    job_description = request.form.get("job_description")
+    company_name = request.form.get("company_name", "").strip()
+    provided_api_key = request.form.get("api_key")
+    
+    if not resume_content:
+        return jsonify({"error": "No resume content provided"}), 400
+    
+    if not job_description:
+        return jsonify({"error": "Job description is required for tailoring"}), 400
+    
+    if HAS_GENAI:
+        local_client = client_pool.get(provided_api_key) if provided_api_key else default_client
+        if not local_client:
+            return jsonify({"error": "No valid API client available"}), 500
+    else:
+        local_client = None
+    
+    events = queue.Queue()
+    
+    def run():
+        try:
+            result = run_resume_pipeline(
+                local_client, resume_content, job_description, company_name,
+                progress=lambda stage, message: events.put(("status", {"message": message})),
+                on_event=lambda event, data: events.put((event, data)))
+            if result is None:
+                events.put(("error", {"error": "Failed to generate LaTeX code"}))
+            else:
+                events.put(("result", result))
+        except Exception as e:
+            logging.exception("An error occurred during streamed resume generation")
+            error_message = str(e) if str(e) else "An unknown error occurred during processing"
+            events.put(("error", {"error": f"Processing error: {error_message}"}))
+    
+    def generate():
+        # The pipeline runs on its own thread and this generator relays its events as they arrive
+        threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True).start()
+        while True:
+            event, data = events.get()
+            yield sse_event(event, data)
+            if event in ("result", "error"):
+                return
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route("/batch_generate", methods=["POST"])
+@login_required
+def batch_generate():
+    """
+    Tailors one resume against many job descriptions. Expects JSON with "resume_content" and
+    "jobs": [{"company_name", "job_description"}, ...]. Results stream back as Server-Sent Events
+    in completion order; the final "done" event carries the ranked table and a zip download id.
+    """
+    data = request.get_json(silent=True) or {}
+    resume_content = data.get("resume_content")
+    jobs = [job for job in data.get("jobs", []) if isinstance(job, dict) and job.get("job_description")]
+    provided_api_key = data.get("api_key")
+    
+    if not resume_content:
+        return jsonify({"error": "No resume content provided"}), 400
+    
+    if not jobs:
+        return jsonify({"error": "At least one job with a job description is required"}), 400
+    
+    if len(jobs) > BATCH_MAX_JOBS:
+        return jsonify({"error": f"A batch can contain at most {BATCH_MAX_JOBS} jobs"}), 400
+    
+    if HAS_GENAI:
+        local_client = client_pool.get(provided_api_key) if provided_api_key else default_client
+        if not local_client:
+            return jsonify({"error": "No valid API client available"}), 500
+    else:
+        local_client = None
+    
+    def generate():
+        results = []
+        ai = has_ai(local_client)
+        for index, result in run_batch(lambda job: run_step(local_client, tailor_resume(ai, resume_content, job)), jobs):
+            result["index"] = index
+            results.append(result)
+            yield sse_event("result", {key: value for key, value in result.items() if key != "latex_code"})
+        
+        batch_id = str(uuid.uuid4())
+        resume_store.save(batch_id, {"batch_results": results})
+        yield sse_event("done", {
+            "batch_id": batch_id,
+            "ranked": [
+                {key: value for key, value in result.items() if key != "latex_code"}
+                for result in rank_results(results)
+            ]
+        })
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route("/download_batch/<batch_id>", methods=["GET"])
+@login_required
+def download_batch(batch_id):
+    """Downloads every .tex file of a batch as a zip archive."""
+    batch_data = resume_store.get(batch_id)
+    if not batch_data or "batch_results" not in batch_data:
+        return "Batch not found", 404
+    
+    return Response(
+        build_latex_zip(batch_data["batch_results"]),
+        mimetype="application/zip",
+        headers={"Content-Disposition": "attachment;filename=tailored_resumes.zip"}
+    )
+
 @app.route("/download_latex/<resume_id>", methods=["GET"])
 @login_required
 def download_latex(resume_id):
     """Allows downloading the LaTeX code as a .tex file."""
-    if resume_id not in resume_store:
+    resume_data = resume_store.get(resume_id)
+    if not resume_data:
         return "Resume not found", 404
     
-    latex_code = resume_store[resume_id].get("latex_code")
+    latex_code = resume_data.get("latex_code")
     if not latex_code:
         return "LaTeX code not found", 404
     
@@ -194,512 +463,123 @@ def download_latex(resume_id):
         headers={"Content-Disposition": "attachment;filename=resume.tex"}
     )
 
-def mock_process_resume(resume_content, job_description=None):
-    """
-    A mock implementation for when the Gemini API is not available.
-    This function does basic parsing of the resume content and populates the template.
-    If a job description is provided, a tailored note is inserted.
-    """
-    # Very basic parsing - extract name if it appears to be in the first line
-    lines = resume_content.strip().split('\n')
-    name = lines[0] if lines else "Your Name"
-    
-    # Try to extract contact info from first few lines
-    contact_info = {
-        "email": "your.email@example.com",
-        "phone": "Your Phone",
-        "linkedin": "Your LinkedIn",
-        "github": "Your GitHub",
-        "location": "Your Location",
-        "website": "Your Website"
-    }
-    
-    for i in range(min(5, len(lines))):
-        line = lines[i].lower()
-        if '@' in line and '.' in line:
-            contact_info["email"] = lines[i].split()[-1]
-        elif any(word in line for word in ["phone", "tel", "cell"]):
-            contact_info["phone"] = lines[i].split(":")[-1].strip() if ":" in lines[i] else lines[i]
-    
-    # Create a basic LaTeX document with the extracted information
-    latex_code = DEFAULT_LATEX_TEMPLATE.replace("Jake Ryan", name)
-    latex_code = latex_code.replace("jake@su.edu", contact_info["email"])
-    latex_code = latex_code.replace("123-456-7890", contact_info["phone"])
-    
-    # If a job description is provided, insert a tailored note after \begin{document}
-    if job_description:
-        tailored_line = f"\\textit{{Tailored for: {job_description[:100]}{'...' if len(job_description) > 100 else ''}}}\\\\"
-        latex_code = latex_code.replace(r"\begin{document}", r"\begin{document}" + "\n" + tailored_line)
-    
-    return latex_code
-
 def process_with_gemini(client, resume_content, job_description=None):
     """
     Sends the resume content (and optional job description) to Gemini AI for processing and formatting into LaTeX.
     Falls back to mock processing if Gemini is not available.
     """
-    if not client or not HAS_GENAI:
+    return run_step(client, format_resume(has_ai(client), resume_content, job_description))
+
+def stream_with_gemini(client, resume_content, job_description=None):
+    """
+    Streaming variant of process_with_gemini: yields LaTeX chunks as they arrive from Gemini.
+    Yields the mock LaTeX (or the default template on error) in one chunk when streaming is not possible.
+    """
+    if not has_ai(client):
         logging.warning("Using mock implementation for resume processing")
-        return mock_process_resume(resume_content, job_description)
+        yield mock_process_resume(resume_content, job_description)
+        return
     
+    streamed = False
     try:
-        logging.info("Sending resume content to Gemini AI for processing...")
-        # If a job description is provided, include it in the prompt
-        job_desc_section = f"\nHere is the job description to tailor the resume:\n```\n{job_description}\n```" if job_description else ""
-        
-        prompt = f"""
-{RESUME_FORMATTER_PROMPT}
-
-LaTeX Template
-{DEFAULT_LATEX_TEMPLATE}
-
-
-User Resume Content to Format:
-```
-{resume_content}
-```
-
-{job_desc_section}
+        logging.info("Streaming resume content through Gemini AI...")
+        prompt = build_formatter_prompt(resume_content, job_description)
+        for chunk in generate_content_stream(client, model="gemini-2.0-flash", contents=prompt, prefix=FORMATTER_PROMPT_PREFIX, prefix_name="resume_formatter", stage="formatter"):
+            streamed = True
+            yield chunk
+        logging.info("Gemini AI streaming completed.")
+    except Exception as e:
+        logging.exception("Exception occurred while streaming with Gemini AI")
+    
+    if not streamed:
+        yield DEFAULT_LATEX_TEMPLATE
 
+def request_section_repairs(client, latex_code, report):
+    """Asks Gemini to fix only the sections the local checks could not; returns {key: section LaTeX}."""
+    return run_step(client, repair_sections(has_ai(client), latex_code, report))
 
-  
+def validate_latex_output(client, latex_code, previous=None):
     """
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
-
-        if not response.text:
-            logging.error("Error: No response from Gemini AI.")
-            return DEFAULT_LATEX_TEMPLATE
-        
-        logging.info("Gemini AI processing completed.")
-        return response.text.strip()
-
-    except Exception as e:
-        logging.exception("Exception occurred while processing with Gemini AI")
-        return DEFAULT_LATEX_TEMPLATE
+    Checks LaTeX from Gemini before it is accepted (see resume_steps.validate_latex); falls back
+    section by section to `previous`. Returns None when the output holds no LaTeX at all.
+    """
+    return run_step(client, validate_latex(has_ai(client), latex_code, previous))
 
 
 def evaluate_resume_job_match(client, latex_code, job_description):
     """
     Evaluates how well the resume matches the job description.
-    Returns a score out of 10 and detailed feedback.
+    Returns a score out of 10 and detailed feedback; the score is None when Gemini could not answer
+    or its answer had no readable score.
     """
-    if not client or not HAS_GENAI:
-        # Return a mock score if Gemini is not available
-        return 6, "Resume appears well-tailored to the job description."
-    
-    try:
-        logging.info("Evaluating resume-job match...")
-        
-        prompt = f"""
-{RESUME_EVALUATOR_PROMPT}
-
-JOB DESCRIPTION:
-```
-{job_description}
-```
-LATEX RESUME:
-```
-{latex_code}
-```
-"""
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash", 
-            contents=prompt
-        )
-        
-        if not response.text:
-            logging.error("Error: No response from Gemini AI for evaluation.")
-            return 7, "Unable to evaluate resume-job match."
-        
-        # Parse the response to extract score and feedback
-        response_text = response.text.strip()
-        
-        # Extract score
-        score_line = next((line for line in response_text.split('\n') if line.startswith('SCORE:')), None)
-        if score_line:
-            try:
-                score = int(score_line.split('SCORE:')[1].strip())
-                # Ensure score is within range 1-10
-                score = max(1, min(10, score))
-            except (ValueError, IndexError):
-                score = 7  # Default if parsing fails
-        else:
-            score = 7  # Default if no score line found
-        
-        # Extract feedback
-        feedback_parts = response_text.split('FEEDBACK:')
-        if len(feedback_parts) > 1:
-            feedback = feedback_parts[1].strip()
-        else:
-            feedback = "No specific feedback available."
-        
-        logging.info(f"Resume evaluation completed. Score: {score}/10")
-        return score, feedback
-        
-    except Exception as e:
-        logging.exception("Exception occurred during resume evaluation")
-        return 7, f"Unable to evaluate resume-job match due to an error: {str(e)}"
+    return run_step(client, evaluate_match(has_ai(client), latex_code, job_description))
 
 
-def optimize_resume_for_job(client, latex_code, job_description, feedback):
+def evaluate_with_coverage(client, latex_code, job_description):
     """
-    Optimizes the resume LaTeX code to better match the job description based on feedback.
+    Scores keyword coverage locally first and only asks Gemini when the calibrated threshold
+    says the match is not clearly good. Returns (score, feedback, coverage report).
     """
-    if not client or not HAS_GENAI:
-        # Return the original code if Gemini is not available
-        return latex_code
-    
-    try:
-        logging.info("Optimizing resume for better job alignment...")
-        
-        prompt = f"""
-{RESUME_OPTIMIZER_PROMPT}
-
-LaTeX Template Reference:
-Use the provided LaTeX template for formatting but do not return the template itself. Instead, apply its formatting principles to the user's resume content.
+    return run_step(client, evaluate_coverage(has_ai(client), latex_code, job_description))
 
-LaTeX Template:
-{DEFAULT_LATEX_TEMPLATE}
 
-Current LaTeX Resume to Optimize:
-{latex_code}
-
-Job Description:
-{job_description}
-
-Previous Evaluation Feedback (If Available):
-{feedback}
-"""
+def optimize_resume_sections(client, latex_code, job_description, feedback, use_cache=True, score=None):
+    """
+    Rewrites only the sections the feedback (or a low score) points at and splices them back in.
+    Returns None when the resume cannot be split or the response held no usable section.
+    """
+    return run_step(client, rewrite_sections(has_ai(client), latex_code, job_description, feedback, use_cache, score))
 
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
-        
-        if not response.text:
-            logging.error("Error: No response from Gemini AI for optimization.")
-            return latex_code
-        
-        optimized_latex = response.text.strip()
-        logging.info("Resume optimization completed.")
-        return optimized_latex
-        
-    except Exception as e:
-        logging.exception("Exception occurred during resume optimization")
-        return latex_code
+def optimize_resume_for_job(client, latex_code, job_description, feedback, use_cache=True, score=None):
+    """
+    Optimizes the resume LaTeX code to better match the job description based on feedback.
+    Pass use_cache=False when the user explicitly asks for a fresh re-optimization.
+    Only the flagged sections are rewritten; the whole document is sent only when that fails.
+    """
+    return run_step(client, optimize_resume(has_ai(client), latex_code, job_description, feedback, use_cache, score))
 
-def generate_cover_letter(client, latex_code, company_name, job_description):
+def stream_optimize_resume_for_job(client, latex_code, job_description, feedback, score=None):
     """
-    Generates a cover letter based on the resume, company name, and job description.
+    Streaming variant of optimize_resume_for_job. A section-level rewrite is short, so its spliced
+    result is yielded in one chunk; only the whole-document fallback is streamed. Yields the original
+    LaTeX in one chunk if Gemini is unavailable or the stream fails before producing any output.
     """
-    if not client or not HAS_GENAI:
-        return "AI processing not available. Please set your API key."
+    if not has_ai(client):
+        yield latex_code
+        return
     
+    streamed = False
     try:
-        logging.info("Generating cover letter with Gemini AI...")
-        
-        # Extract key information from the LaTeX resume
-        lines = latex_code.split('\n')
-        name = "Your Name"
-        email = "your.email@example.com"
-        
-        # Extract name and email from LaTeX code
-        for line in lines:
-            if '\\textbf{\\Huge' in line and 'scshape' in line:
-                # Extract name from LaTeX formatting
-                name_match = line.split('\\textbf{\\Huge \\scshape ')[1].split('}')[0] if '\\textbf{\\Huge \\scshape ' in line else None
-                if name_match:
-                    name = name_match
-            elif 'href{mailto:' in line:
-                # Extract email from LaTeX formatting
-                email_match = line.split('href{mailto:')[1].split('}')[0] if 'href{mailto:' in line else None
-                if email_match:
-                    email = email_match
+        optimized_latex = optimize_resume_sections(client, latex_code, job_description, feedback, score=score)
+        if optimized_latex:
+            yield optimized_latex
+            return
         
-        cover_letter_prompt = f"""
-{COVER_LETTER_PROMPT}
-
-CANDIDATE INFORMATION:
-- Name: {name}
-- Email: {email}
-- Company: {company_name}
-
-RESUME CONTENT (LaTeX format):
-{latex_code}
-
-JOB DESCRIPTION:
-{job_description}
-"""
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=cover_letter_prompt
-        )
-        
-        if response and response.text:
-            cover_letter = response.text.strip()
-            
-            # Clean up the response
-            if cover_letter.startswith("```"):
-                cover_letter = cover_letter[3:]
-            if cover_letter.endswith("```"):
-                cover_letter = cover_letter[:-3]
-            
-            cover_letter = cover_letter.strip()
-            
-            logging.info("Cover letter generated successfully")
-            return cover_letter
-        else:
-            logging.error("No response received from Gemini AI for cover letter generation")
-            return "Error: Unable to generate cover letter. Please try again."
-            
+        logging.info("Streaming resume optimization...")
+        prompt = build_optimizer_prompt(latex_code, job_description, feedback)
+        for chunk in generate_content_stream(client, model="gemini-2.0-flash", contents=prompt, prefix=OPTIMIZER_PROMPT_PREFIX, prefix_name="resume_optimizer", stage="optimizer"):
+            streamed = True
+            yield chunk
+        logging.info("Resume optimization stream completed.")
     except Exception as e:
-        logging.exception("Exception occurred while generating cover letter with Gemini AI")
-        return f"Error generating cover letter: {str(e)}"
+        logging.exception("Exception occurred during streaming resume optimization")
+    
+    if not streamed:
+        yield latex_code
+
+def generate_cover_letter(client, latex_code, company_name, job_description, use_cache=True):
+    """
+    Generates a cover letter based on the resume, company name, and job description.
+    Pass use_cache=False to force a new variation (regeneration).
+    """
+    return run_step(client, write_cover_letter(has_ai(client), latex_code, company_name, job_description, use_cache))
 
 def analyze_skills(client, latex_code, job_description):
     """
     Analyzes the skills section of the resume and compares it with job description requirements.
     Returns a dictionary containing current skills, missing skills, recommended skills, and a formatted LaTeX skills section.
     """
-    if not client or not HAS_GENAI:
-        return {
-            "current_skills": ["Unable to analyze skills without AI service"],
-            "missing_skills": [],
-            "recommended_skills": [],
-            "current_skills_by_category": {},
-            "recommended_skills_by_category": {},
-            "latex_skills_section": ""
-        }
-    
-    try:
-        logging.info("Analyzing skills comparison...")
-        
-        # First prompt to analyze skills and certifications
-        analysis_prompt = f"""
-You are a skilled resume analyzer. Analyze the resume and job description carefully.
-
-Your tasks:
-1. First, identify the profession type and required skill categories
-2. Extract ALL skills from the resume, including those mentioned in project descriptions and experience
-3. Compare with job description requirements
-4. Recommend additional skills based on job market standards
-5. Identify certifications (both current and recommended)
-
-Format your response EXACTLY as follows:
-
-PROFESSION_TYPE:
-[Identify the profession type]
-
-SKILL_CATEGORIES:
-- [List main skill categories relevant to the profession]
-
-CURRENT_SKILLS:
-Technical Skills:
-- [List all technical skills found in resume]
-Security Skills:
-- [List all security-related skills]
-[Other Categories]:
-- [List skills for each relevant category]
-
-CURRENT_CERTIFICATIONS:
-- [List all certifications mentioned in resume]
-
-MISSING_SKILLS:
-- [List skills mentioned in job description but missing from resume]
-
-RECOMMENDED_SKILLS:
-Technical Skills:
-- [List recommended technical skills]
-Security Skills:
-- [List recommended security skills]
-[Other Categories]:
-- [List recommended skills by category]
-
-RECOMMENDED_CERTIFICATIONS:
-- [List recommended certifications based on job requirements and industry standards]
-
-IMPORTANT INSTRUCTIONS:
-1. Include ALL skills mentioned anywhere in the resume
-2. Include skills mentioned in project descriptions and work experience
-3. Do not mark a skill as missing if it's mentioned anywhere in the resume
-4. Group skills logically by category
-5. Be thorough in skill extraction - don't miss any skills
-
-LaTeX Resume:
-{latex_code}
-
-Job Description:
-{job_description}
-"""
-
-        analysis_response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=analysis_prompt
-        )
-        
-        if not analysis_response.text:
-            return {
-                "current_skills": ["Error: No response from AI"],
-                "missing_skills": [],
-                "recommended_skills": [],
-                "current_skills_by_category": {},
-                "recommended_skills_by_category": {},
-                "latex_skills_section": ""
-            }
-        
-        # Parse the analysis response
-        response_text = analysis_response.text.strip()
-        skills_data = {
-            "profession_type": "",
-            "skill_categories": [],
-            "current_skills": [],
-            "current_skills_by_category": {},
-            "current_certifications": [],
-            "missing_skills": [],
-            "recommended_skills": [],
-            "recommended_skills_by_category": {},
-            "recommended_certifications": []
-        }
-        
-        current_section = None
-        current_category = None
-        
-        for line in response_text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            if 'PROFESSION_TYPE:' in line:
-                current_section = "profession_type"
-                skills_data["profession_type"] = line.split('PROFESSION_TYPE:')[1].strip()
-            elif 'SKILL_CATEGORIES:' in line:
-                current_section = "skill_categories"
-            elif 'CURRENT_SKILLS:' in line:
-                current_section = "current_skills"
-                current_category = None
-            elif 'CURRENT_CERTIFICATIONS:' in line:
-                current_section = "current_certifications"
-            elif 'MISSING_SKILLS:' in line:
-                current_section = "missing_skills"
-            elif 'RECOMMENDED_SKILLS:' in line:
-                current_section = "recommended_skills"
-                current_category = None
-            elif 'RECOMMENDED_CERTIFICATIONS:' in line:
-                current_section = "recommended_certifications"
-            elif line.endswith(':') and current_section in ["current_skills", "recommended_skills"]:
-                current_category = line[:-1]
-                if current_section == "current_skills":
-                    skills_data["current_skills_by_category"][current_category] = []
-                else:
-                    skills_data["recommended_skills_by_category"][current_category] = []
-            elif line.startswith('- '):
-                skill = line[2:].strip()
-                if current_section == "skill_categories":
-                    skills_data["skill_categories"].append(skill)
-                elif current_section == "current_skills":
-                    if current_category:
-                        skills_data["current_skills_by_category"][current_category].append(skill)
-                    skills_data["current_skills"].append(skill)
-                elif current_section == "current_certifications":
-                    skills_data["current_certifications"].append(skill)
-                elif current_section == "missing_skills":
-                    skills_data["missing_skills"].append(skill)
-                elif current_section == "recommended_skills":
-                    if current_category:
-                        skills_data["recommended_skills_by_category"][current_category].append(skill)
-                    skills_data["recommended_skills"].append(skill)
-                elif current_section == "recommended_certifications":
-                    skills_data["recommended_certifications"].append(skill)
-
-        # Second prompt to generate LaTeX skills section
-        latex_template = """%-----------SKILLS and CERTIFICATIONS-----------
-\\section{Professional Skills \\& Certifications}
- \\begin{itemize}[leftmargin=0.15in, label={}]
-    \\small{\\item{
-<SKILLS_BY_CATEGORY>
-     \\textbf{Certifications}{: <CERTS>}
-    }}
- \\end{itemize}"""
-
-        # Prepare skills data for formatting
-        current_skills_text = ""
-        for category, skills in skills_data["current_skills_by_category"].items():
-            if skills:
-                current_skills_text += f"{category}:\n- " + "\n- ".join(skills) + "\n\n"
-
-        recommended_skills_text = ""
-        for category, skills in skills_data["recommended_skills_by_category"].items():
-            if skills:
-                recommended_skills_text += f"{category}:\n- " + "\n- ".join(skills) + " (Recommended)\n\n"
-
-        format_prompt = f"""
-Based on the following skills and certifications analysis for a {skills_data['profession_type']} professional, 
-generate a LaTeX skills section using the exact template below.
-
-Current Skills:
-{current_skills_text}
-
-Current Certifications:
-{', '.join(skills_data['current_certifications'])}
-
-Recommended Skills:
-{recommended_skills_text}
-
-Recommended Certifications:
-{', '.join(skills_data['recommended_certifications'])}
-
-Use this exact LaTeX template format:
-{latex_template}
-
-Requirements:
-1. Replace <SKILLS_BY_CATEGORY> with appropriate category sections
-2. For each category, use the format: \\textbf{{Category Name}}{{: skill1, skill2, etc.}} \\\\
-3. Include both current and recommended skills/certifications
-4. Do not mark recommended skills/certifications with any special suffix
-5. Use appropriate line breaks (\\\\) between sections
-6. Escape any special LaTeX characters
-7. ALWAYS include the Certifications section
-8. If no certifications are found, add "No current certifications"
-9. Group similar skills together within each category
-10. Maintain professional formatting and organization
-11. Keep the overall length of the generated skills section (number of lines/items) similar to the original skills section. Do not make the section significantly longer than the original.
-"""
-
-        latex_response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=format_prompt
-        )
-        
-        if latex_response.text:
-            skills_data["latex_skills_section"] = latex_response.text.strip()
-        else:
-            skills_data["latex_skills_section"] = "Error generating LaTeX skills section"
-
-        return {
-            "current_skills": skills_data["current_skills"],
-            "missing_skills": skills_data["missing_skills"],
-            "recommended_skills": skills_data["recommended_skills"],
-            "current_skills_by_category": skills_data["current_skills_by_category"],
-            "recommended_skills_by_category": skills_data["recommended_skills_by_category"],
-            "latex_skills_section": skills_data["latex_skills_section"]
-        }
-
-    except Exception as e:
-        logging.exception("Error in analyze_skills")
-        return {
-            "current_skills": ["Error analyzing skills: " + str(e)],
-            "missing_skills": [],
-            "recommended_skills": [],
-            "current_skills_by_category": {},
-            "recommended_skills_by_category": {},
-            "latex_skills_section": ""
-        }
+    return run_step(client, recommend_skills(has_ai(client), latex_code, job_description))
 
 @app.route("/reoptimize_resume", methods=["POST"])
 @login_required
@@ -714,38 +594,41 @@ def reoptimize_resume():
             return jsonify({"error": "Missing required fields."}), 400
 
         if HAS_GENAI:
-            local_client = genai.Client(api_key=provided_api_key) if provided_api_key else default_client
+            local_client = client_pool.get(provided_api_key) if provided_api_key else default_client
             if not local_client:
                 return jsonify({"error": "No valid API client available"}), 500
         else:
             local_client = None
 
         try:
-            # Re-optimize the resume
-            optimized_latex = optimize_resume_for_job(local_client, latex_code, job_description, feedback)
-            if not optimized_latex:
-                return jsonify({"error": "Failed to optimize resume"}), 500
-                
-            # Re-evaluate
-            score, new_feedback = evaluate_resume_job_match(local_client, optimized_latex, job_description)
+            with track_degraded() as degraded, track_quota_wait() as quota_wait:
+                # Re-optimize the resume
+                optimized_latex = optimize_resume_for_job(local_client, latex_code, job_description, feedback, use_cache=False)
+                if not optimized_latex:
+                    return jsonify({"error": "Failed to optimize resume"}), 500
+                    
+                # Re-evaluate
+                score, new_feedback = evaluate_resume_job_match(local_client, optimized_latex, job_description)
             
             # Generate a new resume_id for download
             resume_id = str(uuid.uuid4())
-            resume_store[resume_id] = {
+            resume_store.save(resume_id, {
                 "latex_code": optimized_latex,
                 "score": score,
-                "feedback": new_feedback,
-                "api_key": provided_api_key if provided_api_key else None
-            }
+                "feedback": new_feedback
+            })
 
             response_data = {
                 "resume_id": resume_id,
                 "latex_code": optimized_latex,
                 "score": score,
                 "feedback": new_feedback,
-                "optimized": True,
+                "optimized": "optimizer" not in degraded,
                 "optimization_message": 'Re-optimization was performed by user request.',
-                "message": "Resume re-optimized successfully"
+                "message": "Resume re-optimized successfully",
+                "degraded": bool(degraded),
+                "degraded_stages": degraded,
+                "quota_wait": quota_wait
             }
 
             return jsonify(response_data), 200
@@ -771,7 +654,7 @@ def reanalyze_skills():
             return jsonify({"error": "Missing required fields."}), 400
 
         if HAS_GENAI:
-            local_client = genai.Client(api_key=provided_api_key) if provided_api_key else default_client
+            local_client = client_pool.get(provided_api_key) if provided_api_key else default_client
             if not local_client:
                 return jsonify({"error": "No valid API client available"}), 500
         else:
@@ -779,13 +662,17 @@ def reanalyze_skills():
 
         try:
             # Re-analyze skills
-            skills_analysis = analyze_skills(local_client, latex_code, job_description)
+            with track_degraded() as degraded, track_quota_wait() as quota_wait:
+                skills_analysis = analyze_skills(local_client, latex_code, job_description)
             if not skills_analysis:
                 return jsonify({"error": "Failed to analyze skills"}), 500
 
             return jsonify({
                 "skills_analysis": skills_analysis,
-                "message": "Skills re-analyzed successfully"
+                "message": "Skills re-analyzed successfully",
+                "degraded": bool(degraded),
+                "degraded_stages": degraded,
+                "quota_wait": quota_wait
             }), 200
 
         except Exception as e:
@@ -800,97 +687,61 @@ def reanalyze_skills():
 @app.route("/regenerate_skills_latex", methods=["POST"])
 @login_required
 def regenerate_skills_latex():
+    """Re-renders the LaTeX skills section from user-edited skills data; no Gemini call is needed."""
     try:
-        skills_data = request.get_json()
-        provided_api_key = request.form.get("api_key")
+        skills_data = request.get_json(silent=True)
 
-        if not skills_data:
+        if not skills_data or not isinstance(skills_data, dict):
             return jsonify({"error": "Missing skills data."}), 400
 
-        if HAS_GENAI:
-            local_client = genai.Client(api_key=provided_api_key) if provided_api_key else default_client
-            if not local_client:
-                return jsonify({"error": "No valid API client available"}), 500
-        else:
-            local_client = None
-
-        try:
-            # LaTeX template for skills section
-            latex_template = """%-----------SKILLS and CERTIFICATIONS-----------
-\\section{Professional Skills \\& Certifications}
- \\begin{itemize}[leftmargin=0.15in, label={}]
-    \\small{\\item{
-<SKILLS_BY_CATEGORY>
-     \\textbf{Certifications}{: <CERTS>}
-    }}
- \\end{itemize}"""
-
-            # Prepare skills data for formatting
-            current_skills_text = ""
-            for category, skills in skills_data.get("current_skills_by_category", {}).items():
-                if skills:
-                    current_skills_text += f"{category}:\n- " + "\n- ".join(skills) + "\n\n"
-
-            recommended_skills_text = ""
-            for category, skills in skills_data.get("recommended_skills_by_category", {}).items():
-                if skills:
-                    recommended_skills_text += f"{category}:\n- " + "\n- ".join(skills) + " (Recommended)\n\n"
-
-            format_prompt = f"""
-Based on the following skills and certifications analysis for a {skills_data.get('profession_type', '')} professional, 
-generate a LaTeX skills section using the exact template below.
-
-Current Skills:
-{current_skills_text}
-
-Current Certifications:
-{', '.join(skills_data.get('current_certifications', []))}
-
-Recommended Skills:
-{recommended_skills_text}
-
-Recommended Certifications:
-{', '.join(skills_data.get('recommended_certifications', []))}
-
-Use this exact LaTeX template format:
-{latex_template}
-
-Requirements:
-1. Replace <SKILLS_BY_CATEGORY> with appropriate category sections
-2. For each category, use the format: \\textbf{{Category Name}}{{: skill1, skill2, etc.}} \\\\
-3. Include both current and recommended skills/certifications
-4. Mark recommended skills/certifications with "(Recommended)" suffix
-5. Use appropriate line breaks (\\\\) between sections
-6. Escape any special LaTeX characters
-7. ALWAYS include the Certifications section
-8. If no certifications are found, add "No current certifications"
-9. Group similar skills together within each category
-10. Maintain professional formatting and organization
-11. Keep the overall length of the generated skills section (number of lines/items) similar to the original skills section. Do not make the section significantly longer than the original.
-"""
-
-            latex_response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=format_prompt
-            )
-            
-            if not latex_response.text:
-                return jsonify({"error": "Failed to generate LaTeX skills section"}), 500
-
-            return jsonify({
-                "latex_skills_section": latex_response.text.strip(),
-                "message": "Skills LaTeX section regenerated successfully"
-            }), 200
-
-        except Exception as e:
-            logging.exception("An error occurred during LaTeX skills regeneration")
-            error_message = str(e) if str(e) else "An unknown error occurred during LaTeX generation"
-            return jsonify({"error": f"Processing error: {error_message}"}), 500
+        return jsonify({
+            "latex_skills_section": render_skills_latex(skills_data, mark_recommended=True),
+            "message": "Skills LaTeX section regenerated successfully"
+        }), 200
 
     except Exception as e:
         logging.exception("An error occurred in the regenerate_skills_latex route")
         return jsonify({"error": "Server error occurred"}), 500
 
+@app.route("/cache_stats", methods=["GET"])
+@login_required
+def cache_stats():
+    """Reports hit/miss counters for the shared Gemini response cache, the cached prompt prefixes, the parsed-resume index, the LaTeX output checks and speculative optimization."""
+    stats = response_cache.stats()
+    stats["context_cache"] = prefix_cache.stats()
+    stats["resume_parse"] = resume_parse_cache.stats()
+    stats["keyword_coverage"] = coverage_calibration.stats()
+    stats["latex_validation"] = latex_validation_stats.stats()
+    stats["speculative_optimization"] = speculation_stats.stats()
+    return jsonify(stats), 200
+
+@app.route("/client_pool_stats", methods=["GET"])
+@login_required
+def client_pool_stats():
+    """Reports the per-API-key client pool, retry/circuit breaker counters and the quota queue."""
+    stats = client_pool.stats()
+    stats["resilience"] = gemini_resilience.stats()
+    stats["rate_limit"] = gemini_rate_limiter.stats()
+    return jsonify(stats), 200
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text-format metrics: Gemini calls, tokens, estimated cost and latency per stage."""
+    authorized = 'authenticated' in session or (
+        METRICS_TOKEN and request.headers.get("Authorization") == f"Bearer {METRICS_TOKEN}"
+    )
+    if not authorized:
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    
+    cache = response_cache.stats()
+    body = llm_metrics.render_prometheus() + "\n".join([
+        "# HELP llm_response_cache_lookups_total Response cache lookups by result.",
+        "# TYPE llm_response_cache_lookups_total counter",
+        f'llm_response_cache_lookups_total{{result="hit"}} {cache["hits"]}',
+        f'llm_response_cache_lookups_total{{result="miss"}} {cache["misses"]}',
+    ]) + "\n"
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
 @app.route('/save_main_resume', methods=['POST'])
 @login_required
 def save_main_resume():
@@ -916,6 +767,7 @@ def generate_cover_letter_route():
         company_name = request.form.get("company_name", "").strip()
         job_description = request.form.get("job_description")
         provided_api_key = request.form.get("api_key")
+        regenerate = request.form.get("regenerate") == "true"
         
         if not latex_code:
             return jsonify({"error": "No LaTeX code provided"}), 400
@@ -928,7 +780,7 @@ def generate_cover_letter_route():
         
         # Use the provided API key if available; otherwise, use default
         if HAS_GENAI:
-            local_client = genai.Client(api_key=provided_api_key) if provided_api_key else default_client
+            local_client = client_pool.get(provided_api_key) if provided_api_key else default_client
             if not local_client:
                 return jsonify({"error": "No valid API client available"}), 500
         else:
@@ -938,7 +790,7 @@ def generate_cover_letter_route():
             logging.info("Starting cover letter generation")
             
             # Generate cover letter with Gemini
-            cover_letter = generate_cover_letter(local_client, latex_code, company_name, job_description)
+            cover_letter = generate_cover_letter(local_client, latex_code, company_name, job_description, use_cache=not regenerate)
             if not cover_letter or cover_letter.startswith("Error"):
                 return jsonify({"error": "Failed to generate cover letter"}), 500
             
@@ -0,0 +1,340 @@
+"""
+Async serving mode for the slow Gemini routes.
+
+The Flask views in app.py hold a worker thread for every sequential Gemini call. This ASGI app
+serves the five generation routes with the SDK's async client (client.aio), so a request that is
+waiting on Gemini costs a coroutine instead of a thread, and a single process can keep hundreds
+of generations in flight. Every other route (login, index, downloads, streaming, batch, metrics)
+is still handled by the Flask app, mounted underneath.
+
+Run with:
+    uvicorn async_app:app --host 0.0.0.0 --port 8000
+
+Set FLASK_SECRET_KEY when running more than one process so session cookies work across them.
+"""
+import uuid
+import logging
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, RedirectResponse
+from starlette.routing import Mount, Route
+from uvicorn.middleware.wsgi import WSGIMiddleware
+from pipeline import Deadline, bound_by, run_parallel_async
+from client_pool import client_pool
+from resilience import track_degraded
+from ratelimit import track_quota_wait
+from keyword_coverage import feedback_with_uncovered
+from speculation import SPECULATIVE_OPTIMIZATION, AsyncSpeculation, speculative_feedback
+from resume_steps import (
+    EVALUATE_AND_ANALYZE_DEFAULTS, evaluate_and_analyze_results, needs_optimization, arun_step, format_resume,
+    evaluate_match, evaluate_coverage, optimize_resume, write_cover_letter, recommend_skills,
+)
+import app as flask_module
+from app import app as flask_app, resume_store
+
+def is_authenticated(request):
+    """Reads the Flask session cookie, so a login on the Flask side also covers these routes."""
+    cookie = request.cookies.get(flask_app.config["SESSION_COOKIE_NAME"])
+    if not cookie:
+        return False
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    try:
+        data = serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except Exception:
+        return False
+    return 'authenticated' in data
+
+
+def login_required(f):
+    async def decorated_function(request):
+        if not is_authenticated(request):
+            return RedirectResponse("/login", status_code=302)
+        return await f(request)
+    return decorated_function
+
+
+def get_client(provided_api_key):
+    """Same client choice as the Flask routes; returns (client, error response or None)."""
+    if flask_module.HAS_GENAI:
+        local_client = client_pool.get(provided_api_key) if provided_api_key else flask_module.default_client
+        if not local_client:
+            return None, JSONResponse({"error": "No valid API client available"}, status_code=500)
+        return local_client, None
+    return None, None
+
+
+def has_ai(client):
+    return bool(client) and flask_module.HAS_GENAI
+
+
+async def process_with_gemini(client, resume_content, job_description=None):
+    """Async counterpart of app.process_with_gemini."""
+    return await arun_step(client, format_resume(has_ai(client), resume_content, job_description))
+
+
+async def evaluate_resume_job_match(client, latex_code, job_description):
+    """Async counterpart of app.evaluate_resume_job_match."""
+    return await arun_step(client, evaluate_match(has_ai(client), latex_code, job_description))
+
+
+async def evaluate_with_coverage(client, latex_code, job_description):
+    """Async counterpart of app.evaluate_with_coverage."""
+    return await arun_step(client, evaluate_coverage(has_ai(client), latex_code, job_description))
+
+
+async def optimize_resume_for_job(client, latex_code, job_description, feedback, use_cache=True, score=None):
+    """Async counterpart of app.optimize_resume_for_job."""
+    return await arun_step(client, optimize_resume(has_ai(client), latex_code, job_description, feedback, use_cache, score))
+
+
+async def generate_cover_letter(client, latex_code, company_name, job_description, use_cache=True):
+    """Async counterpart of app.generate_cover_letter."""
+    return await arun_step(client, write_cover_letter(has_ai(client), latex_code, company_name, job_description, use_cache))
+
+
+async def analyze_skills(client, latex_code, job_description):
+    """Async counterpart of app.analyze_skills."""
+    return await arun_step(client, recommend_skills(has_ai(client), latex_code, job_description))
+
+
+def start_speculative_optimization(client, latex_code, job_description):
+    """Async counterpart of app.start_speculative_optimization; discarding the speculation cancels its Gemini call."""
+    if not SPECULATIVE_OPTIMIZATION or not has_ai(client):
+        return None
+    feedback = speculative_feedback(latex_code, job_description)
+    return AsyncSpeculation(optimize_resume_for_job(client, latex_code, job_description, feedback), baseline=latex_code)
+
+
+async def evaluate_and_analyze(client, latex_code, job_description, deadline):
+    """Async counterpart of app.evaluate_and_analyze."""
+    results, incomplete = await run_parallel_async(
+        {
+            "evaluation": evaluate_with_coverage(client, latex_code, job_description),
+            "skills_analysis": analyze_skills(client, latex_code, job_description),
+        },
+        deadline=deadline,
+        defaults=EVALUATE_AND_ANALYZE_DEFAULTS
+    )
+    score, feedback, skills_analysis, coverage = evaluate_and_analyze_results(results)
+    return score, feedback, skills_analysis, incomplete, coverage
+
+
+@login_required
+async def generate_resume(request):
+    """Async /generate_resume; same form fields and response as the Flask view."""
+    try:
+        form = await request.form()
+        resume_content = form.get("resume_content")
+        job_description = form.get("job_description")
+        company_name = form.get("company_name", "").strip()
+
+        if not resume_content:
+            return JSONResponse({"error": "No resume content provided"}, status_code=400)
+        if not job_description:
+            return JSONResponse({"error": "Job description is required for tailoring"}, status_code=400)
+
+        local_client, error = get_client(form.get("api_key"))
+        if error:
+            return error
+
+        try:
+            logging.info("Starting resume processing")
+            deadline = Deadline()
+
+            with track_degraded() as degraded, track_quota_wait() as quota_wait, bound_by(deadline):
+                latex_code = await process_with_gemini(local_client, resume_content, job_description)
+                if not latex_code:
+                    return JSONResponse({"error": "Failed to generate LaTeX code"}, status_code=500)
+
+                speculation = start_speculative_optimization(local_client, latex_code, job_description)
+                score, feedback, skills_analysis, incomplete, coverage = await evaluate_and_analyze(local_client, latex_code, job_description, deadline)
+
+                optimized = False
+                optimization_message = ''
+                if needs_optimization(score, incomplete, deadline):
+                    logging.info(f"Initial score {score}/10 is below threshold. Reprocessing resume...")
+                    latex_code = (speculation and await speculation.accept(deadline)) or await optimize_resume_for_job(
+                        local_client, latex_code, job_description, feedback_with_uncovered(feedback, coverage), score=score)
+                    optimized = True
+                    optimization_message = 'Optimization was performed automatically because the initial score was low.'
+                    score, feedback, coverage = await evaluate_with_coverage(local_client, latex_code, job_description)
+                    logging.info(f"Optimized resume score: {score}/10")
+                if speculation:
+                    speculation.discard()
+
+            resume_id = str(uuid.uuid4())
+            await resume_store.asave(resume_id, {
+                "latex_code": latex_code,
+                "score": score,
+                "feedback": feedback
+            })
+
+            return JSONResponse({
+                "resume_id": resume_id,
+                "latex_code": latex_code,
+                "score": score,
+                "feedback": feedback,
+                "optimized": optimized,
+                "optimization_message": optimization_message,
+                "skills_analysis": skills_analysis,
+                "message": "Resume generated successfully",
+                "company_name": company_name,
+                "partial": bool(incomplete),
+                "incomplete_stages": incomplete,
+                "degraded": bool(degraded),
+                "degraded_stages": degraded,
+                "quota_wait": quota_wait,
+                "keyword_coverage": coverage
+            }, status_code=200)
+
+        except Exception as e:
+            logging.exception("An error occurred during resume generation")
+            error_message = str(e) if str(e) else "An unknown error occurred during processing"
+            return JSONResponse({"error": f"Processing error: {error_message}"}, status_code=500)
+
+    except Exception:
+        logging.exception("An error occurred in the generate_resume route")
+        return JSONResponse({"error": "Server error occurred"}, status_code=500)
+
+
+@login_required
+async def reoptimize_resume(request):
+    try:
+        form = await request.form()
+        latex_code = form.get("latex_code")
+        job_description = form.get("job_description")
+        feedback = form.get("feedback")
+
+        if not latex_code or not job_description:
+            return JSONResponse({"error": "Missing required fields."}, status_code=400)
+
+        local_client, error = get_client(form.get("api_key"))
+        if error:
+            return error
+
+        try:
+            with track_degraded() as degraded, track_quota_wait() as quota_wait:
+                optimized_latex = await optimize_resume_for_job(local_client, latex_code, job_description, feedback, use_cache=False)
+                if not optimized_latex:
+                    return JSONResponse({"error": "Failed to optimize resume"}, status_code=500)
+
+                score, new_feedback = await evaluate_resume_job_match(local_client, optimized_latex, job_description)
+
+            resume_id = str(uuid.uuid4())
+            await resume_store.asave(resume_id, {
+                "latex_code": optimized_latex,
+                "score": score,
+                "feedback": new_feedback
+            })
+
+            return JSONResponse({
+                "resume_id": resume_id,
+                "latex_code": optimized_latex,
+                "score": score,
+                "feedback": new_feedback,
+                "optimized": "optimizer" not in degraded,
+                "optimization_message": 'Re-optimization was performed by user request.',
+                "message": "Resume re-optimized successfully",
+                "degraded": bool(degraded),
+                "degraded_stages": degraded,
+                "quota_wait": quota_wait
+            }, status_code=200)
+
+        except Exception as e:
+            logging.exception("An error occurred during re-optimization")
+            error_message = str(e) if str(e) else "An unknown error occurred during re-optimization"
+            return JSONResponse({"error": f"Processing error: {error_message}"}, status_code=500)
+
+    except Exception:
+        logging.exception("An error occurred in the reoptimize_resume route")
+        return JSONResponse({"error": "Server error occurred"}, status_code=500)
+
+
+@login_required
+async def reanalyze_skills(request):
+    try:
+        form = await request.form()
+        latex_code = form.get("latex_code")
+        job_description = form.get("job_description")
+
+        if not latex_code or not job_description:
+            return JSONResponse({"error": "Missing required fields."}, status_code=400)
+
+        local_client, error = get_client(form.get("api_key"))
+        if error:
+            return error
+
+        try:
+            with track_degraded() as degraded, track_quota_wait() as quota_wait:
+                skills_analysis = await analyze_skills(local_client, latex_code, job_description)
+            if not skills_analysis:
+                return JSONResponse({"error": "Failed to analyze skills"}, status_code=500)
+
+            return JSONResponse({
+                "skills_analysis": skills_analysis,
+                "message": "Skills re-analyzed successfully",
+                "degraded": bool(degraded),
+                "degraded_stages": degraded,
+                "quota_wait": quota_wait
+            }, status_code=200)
+
+        except Exception as e:
+            logging.exception("An error occurred during skills re-analysis")
+            error_message = str(e) if str(e) else "An unknown error occurred during skills analysis"
+            return JSONResponse({"error": f"Processing error: {error_message}"}, status_code=500)
+
+    except Exception:
+        logging.exception("An error occurred in the reanalyze_skills route")
+        return JSONResponse({"error": "Server error occurred"}, status_code=500)
+
+
+@login_required
+async def generate_cover_letter_route(request):
+    """Async /generate_cover_letter; same form fields and response as the Flask view."""
+    try:
+        form = await request.form()
+        latex_code = form.get("latex_code")
+        company_name = form.get("company_name", "").strip()
+        job_description = form.get("job_description")
+        regenerate = form.get("regenerate") == "true"
+
+        if not latex_code:
+            return JSONResponse({"error": "No LaTeX code provided"}, status_code=400)
+        if not company_name:
+            return JSONResponse({"error": "Company name is required for cover letter generation"}, status_code=400)
+        if not job_description:
+            return JSONResponse({"error": "Job description is required for cover letter generation"}, status_code=400)
+
+        local_client, error = get_client(form.get("api_key"))
+        if error:
+            return error
+
+        try:
+            logging.info("Starting cover letter generation")
+            cover_letter = await generate_cover_letter(local_client, latex_code, company_name, job_description, use_cache=not regenerate)
+            if not cover_letter or cover_letter.startswith("Error"):
+                return JSONResponse({"error": "Failed to generate cover letter"}, status_code=500)
+
+            return JSONResponse({
+                "cover_letter": cover_letter,
+                "message": "Cover letter generated successfully",
+                "company_name": company_name
+            }, status_code=200)
+
+        except Exception as e:
+            logging.exception("An error occurred during cover letter generation")
+            error_message = str(e) if str(e) else "An unknown error occurred during processing"
+            return JSONResponse({"error": f"Processing error: {error_message}"}, status_code=500)
+
+    except Exception:
+        logging.exception("An error occurred in the generate_cover_letter route")
+        return JSONResponse({"error": "Server error occurred"}, status_code=500)
+
+
+app = Starlette(routes=[
+    Route("/generate_resume", generate_resume, methods=["POST"]),
+    Route("/reoptimize_resume", reoptimize_resume, methods=["POST"]),
+    Route("/reanalyze_skills", reanalyze_skills, methods=["POST"]),
+    Route("/generate_cover_letter", generate_cover_letter_route, methods=["POST"]),
+    # Everything else (login, pages, downloads, streaming, batch, metrics, skills LaTeX rendering) stays on Flask
+    Mount("/", app=WSGIMiddleware(flask_app)),
+])
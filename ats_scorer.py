@@ -0,0 +1,256 @@
+import re
+from collections import Counter
+
+# Points per rubric category (total = 100), mirroring the ATS evaluation rubric
+ATS_CATEGORIES = {
+    "contact_info": 8,
+    "sections": 8,
+    "formatting": 10,
+    "parsing": 8,
+    "quantified_impact": 20,
+    "action_verbs": 15,
+    "filler_words": 10,
+    "length": 8,
+    "bullet_quality": 8,
+    "skills": 5,
+    "education": 2,
+}
+
+# Categories that need judgement; the LLM may optionally re-score these
+SUBJECTIVE_CATEGORIES = ("bullet_quality",)
+
+FILLER_WORDS = (
+    "various", "several", "many", "some", "different", "multiple", "numerous", "extensive",
+    "comprehensive", "significant", "substantial", "considerable", "effective", "successful",
+    "excellent", "outstanding", "exceptional", "remarkable", "notable", "important", "valuable",
+    "useful", "beneficial", "helpful", "supportive", "team-oriented", "detail-oriented",
+    "results-driven", "goal-oriented", "customer-focused", "quality-focused", "performance-driven",
+    "successfully", "effectively", "highly",
+)
+
+WEAK_PHRASES = ("was responsible for", "responsible for", "helped with", "assisted in", "worked on", "participated in")
+
+STANDARD_SECTIONS = {
+    "experience": ("experience", "work experience", "professional experience", "employment"),
+    "education": ("education",),
+    "skills": ("skills", "technical skills", "skills & certifications", "professional skills & certifications", "technical skills & certifications"),
+    "projects": ("projects", "personal projects", "academic projects"),
+    "summary": ("summary", "professional summary", "profile"),
+    "certifications": ("certifications",),
+}
+
+RISKY_LAYOUT_PATTERNS = {
+    r"\\includegraphics": "images",
+    r"\\begin\{multicols\}": "multi-column layout",
+    r"\\begin\{tabular\}": "tables used for layout",
+    r"\\begin\{minipage\}": "text boxes (minipage)",
+    r"\\fa[A-Z]\w*|\\faicon": "icons",
+    r"\\textcolor": "colored text",
+    r"\\fancy(head|foot)\[[^\]]*\]\{[^}]+\}": "content in headers/footers",
+}
+
+MONTH_DATE = re.compile(r"\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?\s+(\d{4})\b")
+NUMERIC_DATE = re.compile(r"\b(\d{1,2})/(\d{4})\b")
+YEAR_RANGE = re.compile(r"(?<![A-Za-z.]\s)\b(19|20)\d{2}\s*(--|–|-)\s*((19|20)\d{2}|Present)\b")
+METRIC = re.compile(r"\d|%|\\\$|\$")
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE = re.compile(r"(\+?\d[\d\s().-]{8,}\d)")
+
+
+def _body(latex_code):
+    """Returns the document body with comments removed."""
+    text = re.sub(r"(?<!\\)%.*", "", latex_code)
+    start = text.find("\\begin{document}")
+    end = text.rfind("\\end{document}")
+    if start != -1:
+        text = text[start + len("\\begin{document}"):end if end != -1 else None]
+    return text
+
+
+def _macro_args(text, macro):
+    """Yields the first brace-delimited argument of every occurrence of `macro`."""
+    for match in re.finditer(re.escape(macro) + r"\s*\{", text):
+        depth = 1
+        i = match.end()
+        while i < len(text) and depth:
+            if text[i] == "{" and text[i - 1] != "\\":
+                depth += 1
+            elif text[i] == "}" and text[i - 1] != "\\":
+                depth -= 1
+            i += 1
+        yield text[match.end():i - 1]
+
+
+def latex_to_text(latex):
+    """Rough plain-text rendering of a LaTeX fragment, good enough for counting words."""
+    text = re.sub(r"\\href\{[^}]*\}", "", latex)
+    text = re.sub(r"\\(vspace|hspace)\*?\{[^}]*\}", " ", text)
+    text = re.sub(r"\\begin\{[^}]*\}(\[[^\]]*\])?(\{[^}]*\})?|\\end\{[^}]*\}", " ", text)
+    text = text.replace("\\\\", " ").replace("$|$", " ").replace("\\&", "&").replace("\\%", "%").replace("\\$", "$").replace("\\_", "_").replace("\\#", "#")
+    text = re.sub(r"\\[a-zA-Z]+\*?(\[[^\]]*\])?", " ", text)
+    text = re.sub(r"[{}$]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _sections(body):
+    """Maps lowercased section titles to their LaTeX content."""
+    parts = re.split(r"\\section\*?\{([^}]*)\}", body)
+    sections = {}
+    for i in range(1, len(parts) - 1, 2):
+        title = latex_to_text(parts[i]).lower()
+        sections[title] = parts[i + 1]
+    return sections
+
+
+def _scaled(value, low, high, points):
+    """Full points inside [low, high], losing points proportionally outside it."""
+    if low <= value <= high:
+        return points
+    distance = (low - value) / low if value < low else (value - high) / high
+    return max(0.0, points * (1 - distance))
+
+
+def score_resume(latex_code, job_description=None):
+    """
+    Scores a LaTeX resume against the ATS rubric without any network calls.
+    Returns {"total": int, "breakdown": {category: {"score", "max", "notes"}}}.
+    """
+    body = _body(latex_code or "")
+    plain = latex_to_text(body)
+    sections = _sections(body)
+    bullets = [latex_to_text(item) for item in _macro_args(body, "\\resumeItem")]
+    bullets = [bullet for bullet in bullets if bullet]
+    breakdown = {}
+
+    def record(category, score, notes):
+        maximum = ATS_CATEGORIES[category]
+        breakdown[category] = {"score": round(max(0.0, min(maximum, score)), 1), "max": maximum, "notes": notes}
+
+    # A) Contact info
+    notes = []
+    score = 0
+    if EMAIL.search(body):
+        score += 3
+    else:
+        notes.append("No email address found")
+    if any(len(re.sub(r"\D", "", phone)) >= 10 for phone in PHONE.findall(plain)):
+        score += 3
+    else:
+        notes.append("No 10+ digit phone number found")
+    if re.search(r"linkedin|github|portfolio|https?://", body, re.IGNORECASE):
+        score += 1
+    else:
+        notes.append("No LinkedIn/portfolio link")
+    if re.search(r"\\Huge|\\huge|\\LARGE", body):
+        score += 1
+    else:
+        notes.append("Candidate name heading not found")
+    record("contact_info", score, notes)
+
+    # B) Section presence
+    notes = []
+    found = {key for key, names in STANDARD_SECTIONS.items() if any(title in names or any(name in title for name in names) for title in sections)}
+    score = sum(2 for core in ("experience", "education", "skills") if core in found)
+    for core in ("experience", "education", "skills"):
+        if core not in found:
+            notes.append(f"Missing a standard '{core.title()}' section")
+    if "projects" in found or "summary" in found or "certifications" in found:
+        score += 2
+    unknown = [title for title in sections if not any(any(name in title for name in names) for names in STANDARD_SECTIONS.values())]
+    if unknown:
+        score -= len(unknown)
+        notes.append(f"Non-standard headings: {', '.join(unknown)}")
+    record("sections", score, notes)
+
+    # C) Formatting & layout
+    notes = []
+    score = 10
+    for pattern, label in RISKY_LAYOUT_PATTERNS.items():
+        if re.search(pattern, body):
+            score -= 3
+            notes.append(f"Risky layout element: {label}")
+    record("formatting", score, notes)
+
+    # D) Parsing & date consistency
+    notes = []
+    month_dates = MONTH_DATE.findall(body)
+    numeric_dates = NUMERIC_DATE.findall(body)
+    bare_years = YEAR_RANGE.findall(body)
+    styles = sum(1 for group in (month_dates, numeric_dates) if group)
+    score = 8
+    if styles > 1:
+        score -= 4
+        notes.append("Mixed date formats (Month YYYY and MM/YYYY)")
+    if bare_years:
+        score -= 2
+        notes.append("Date ranges without months")
+    if not (month_dates or numeric_dates or bare_years):
+        score -= 4
+        notes.append("No dates found")
+    if re.search(r"[^\x00-\x7F\u2013\u2014\u2019]", plain):
+        score -= 1
+        notes.append("Unusual characters may confuse ATS parsers")
+    record("parsing", score, notes)
+
+    # E) Quantified impact
+    quantified = [bullet for bullet in bullets if METRIC.search(bullet)]
+    ratio = len(quantified) / len(bullets) if bullets else 0
+    record("quantified_impact", 20 * ratio, [f"{len(quantified)}/{len(bullets)} bullets contain a metric"])
+
+    # F) Repetitive and weak action verbs
+    notes = []
+    score = 15
+    first_words = Counter(bullet.split()[0].strip(",.;:").lower() for bullet in bullets if bullet.split())
+    for verb, count in first_words.most_common():
+        if count > 2:
+            score -= 6 + 2 * (count - 2)
+            notes.append(f"'{verb.title()}' used {count} times")
+    lowered_bullets = " ".join(bullets).lower()
+    for phrase in WEAK_PHRASES:
+        occurrences = lowered_bullets.count(phrase)
+        if occurrences and not (phrase == "responsible for" and "was responsible for" in lowered_bullets):
+            score -= 2 * occurrences
+            notes.append(f"Weak phrase '{phrase}' used {occurrences} time(s)")
+    record("action_verbs", score, notes)
+
+    # G) Filler words
+    words = re.findall(r"[A-Za-z][A-Za-z-]*", plain.lower())
+    filler_counts = Counter(word for word in words if word in FILLER_WORDS)
+    record(
+        "filler_words",
+        10 - sum(filler_counts.values()),
+        [f"'{word}' x{count}" for word, count in filler_counts.most_common()]
+    )
+
+    # H) Length & depth
+    word_count = len(plain.split())
+    score = _scaled(word_count, 400, 675, 4) + _scaled(len(bullets), 12, 20, 4)
+    record("length", score, [f"{word_count} words (target 400-675)", f"{len(bullets)} bullets (target 12-20)"])
+
+    # I) Bullet quality (local estimate: action verb + metric + sensible length)
+    strong = [
+        bullet for bullet in bullets
+        if METRIC.search(bullet) and 8 <= len(bullet.split()) <= 35 and not bullet.lower().startswith(WEAK_PHRASES)
+    ]
+    record("bullet_quality", 8 * (len(strong) / len(bullets) if bullets else 0), [f"{len(strong)}/{len(bullets)} bullets show action + result"])
+
+    # J) Skills & keywords
+    skills_text = next((content for title, content in sections.items() if "skill" in title), "")
+    skills = [skill.strip() for skill in re.split(r"[,:]", latex_to_text(skills_text)) if skill.strip()]
+    notes = [f"{len(skills)} skills listed"]
+    score = 5 if len(skills) >= 6 else 5 * len(skills) / 6
+    if job_description and skills:
+        job_text = job_description.lower()
+        matched = [skill for skill in skills if skill.lower() in job_text]
+        notes.append(f"{len(matched)} skills appear in the job description")
+        if not matched:
+            score -= 2
+    record("skills", score, notes)
+
+    # K) Education
+    education_text = next((content for title, content in sections.items() if "education" in title), "")
+    has_year = bool(re.search(r"(19|20)\d{2}", education_text))
+    record("education", (1 if education_text else 0) + (1 if has_year else 0), [] if has_year else ["Education entry without a graduation date"])
+
+    total = sum(item["score"] for item in breakdown.values())
+    return {"total": int(max(1, min(100, round(total)))), "breakdown": breakdown}
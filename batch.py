@@ -0,0 +1,61 @@
+import io
+import os
+import re
+import zipfile
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Batch tailoring configuration
+BATCH_MAX_JOBS = int(os.environ.get("BATCH_MAX_JOBS", "50"))
+# Gemini quota is enforced per API key by ratelimit.gemini_rate_limiter inside every call
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "4"))
+
+
+def run_batch(run_one, jobs, max_concurrency=BATCH_MAX_CONCURRENCY):
+    """
+    Runs run_one(job) for every job with bounded concurrency and yields
+    (index, result) pairs as soon as each job finishes. Failed jobs yield an "error" result.
+    Closing the generator (the client disconnected) cancels the jobs that have not started.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="batch")
+    try:
+        futures = {executor.submit(run_one, job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.exception(f"Batch job {index} failed")
+                result = {
+                    "company_name": jobs[index].get("company_name", ""),
+                    "score": 0,
+                    "error": str(e) if str(e) else "Unknown error"
+                }
+            yield index, result
+    except GeneratorExit:
+        # Nobody will read the rest of the batch; don't spend Gemini quota on it
+        logging.info("Batch closed early; cancelling the jobs that have not started")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=False)
+
+
+def rank_results(results):
+    """Sorts batch results by score, best first."""
+    return sorted(results, key=lambda result: result.get("score") or 0, reverse=True)
+
+
+def latex_filename(company_name, index):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", company_name or "").strip("_") or "job"
+    return f"{index + 1:02d}_{slug}.tex"
+
+
+def build_latex_zip(results):
+    """Packs every generated .tex file of a batch into an in-memory zip archive."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for result in results:
+            if result.get("latex_code"):
+                archive.writestr(latex_filename(result.get("company_name"), result.get("index", 0)), result["latex_code"])
+    return buffer.getvalue()
@@ -0,0 +1,334 @@
+"""
+End-to-end benchmark for the Flask routes and pipeline functions, driven by the offline mock
+Gemini backend (mock_genai.py) so it runs without network access or an API key.
+
+    python benchmark.py --requests 50 --concurrency 8 --latency-ms 50
+    python benchmark.py --json baseline.json
+    python benchmark.py --baseline baseline.json   # exits 1 on regression
+    python benchmark.py --streamlit                # Streamlit cold start and per-rerun script time
+
+Reports throughput, p50/p95/p99 latency, traced memory growth and LLM calls per request for
+every scenario. The LLM response cache is disabled unless --cache is given, because the mock's
+deterministic outputs would otherwise turn every downstream call into a cache hit.
+"""
+import gc
+import sys
+import json
+import time
+import uuid
+import random
+import logging
+import argparse
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_genai import MockGenaiClient, LatencyModel, MOCK_LATEX
+
+RESUME_CONTENT = """Jake Ryan
+jake@su.edu | 123-456-7890
+Software Engineer with 4 years of experience building Python and React applications.
+Experience: Southwestern University, Software Engineer, Jun 2020 - Present
+- Built a REST API with Flask and PostgreSQL serving 10k requests per day
+- Reduced page load time by 40% by introducing Redis caching
+Education: Southwestern University, B.S. Computer Science, 2020
+Skills: Python, JavaScript, SQL, Docker, Git"""
+
+JOB_DESCRIPTION = """Backend Engineer. We are looking for an engineer with strong Python, Flask and
+PostgreSQL experience, familiarity with Docker and Kubernetes, and a track record of improving
+service performance. Experience with Terraform and CI/CD pipelines is a plus."""
+
+SKILLS_DATA = {
+    "current_skills_by_category": {"Technical Skills": ["Python", "SQL"], "Cloud & DevOps": ["Docker"]},
+    "recommended_skills_by_category": {"Cloud & DevOps": ["Kubernetes"]},
+    "current_certifications": [],
+    "recommended_certifications": ["CKAD"],
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def unique(text):
+    return f"{text}\n% run {uuid.uuid4().hex}"
+
+
+class FlaskDriver:
+    """Hands out one logged-in Flask test client per worker thread."""
+
+    def __init__(self, app_module):
+        self.app_module = app_module
+        self._local = threading.local()
+
+    def client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self.app_module.app.test_client()
+            client.post("/login", data={"passcode": self.app_module.PASSCODE})
+            self._local.client = client
+        return client
+
+    def post(self, path, **kwargs):
+        response = self.client().post(path, **kwargs)
+        # Drain streamed bodies so the whole pipeline runs inside the timed call
+        body = response.get_data()
+        if response.status_code >= 400:
+            raise RuntimeError(f"{path} returned HTTP {response.status_code}")
+        if response.mimetype == "text/event-stream" and b"event: error" in body:
+            raise RuntimeError(f"{path} streamed an error event")
+        return response
+
+    def get(self, path):
+        response = self.client().get(path)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{path} returned HTTP {response.status_code}")
+        return response
+
+
+def build_scenarios(app_module, mock_client):
+    driver = FlaskDriver(app_module)
+    resume_id = str(uuid.uuid4())
+    app_module.resume_store.save(resume_id, {"latex_code": MOCK_LATEX, "score": 6, "feedback": "Benchmark"})
+
+    return {
+        "route:generate_resume": lambda: driver.post("/generate_resume", data={
+            "resume_content": unique(RESUME_CONTENT), "job_description": JOB_DESCRIPTION, "company_name": "Acme"}),
+        "route:generate_resume_stream": lambda: driver.post("/generate_resume_stream", data={
+            "resume_content": unique(RESUME_CONTENT), "job_description": JOB_DESCRIPTION, "company_name": "Acme"}),
+        "route:reoptimize_resume": lambda: driver.post("/reoptimize_resume", data={
+            "latex_code": unique(MOCK_LATEX), "job_description": JOB_DESCRIPTION, "feedback": "Add metrics"}),
+        "route:reanalyze_skills": lambda: driver.post("/reanalyze_skills", data={
+            "latex_code": unique(MOCK_LATEX), "job_description": JOB_DESCRIPTION}),
+        "route:regenerate_skills_latex": lambda: driver.post("/regenerate_skills_latex", json=SKILLS_DATA),
+        "route:generate_cover_letter": lambda: driver.post("/generate_cover_letter", data={
+            "latex_code": unique(MOCK_LATEX), "company_name": "Acme", "job_description": JOB_DESCRIPTION}),
+        "route:batch_generate": lambda: driver.post("/batch_generate", json={
+            "resume_content": unique(RESUME_CONTENT),
+            "jobs": [{"company_name": f"Company {i}", "job_description": f"{JOB_DESCRIPTION} ({i})"} for i in range(3)]}),
+        "route:download_latex": lambda: driver.get(f"/download_latex/{resume_id}"),
+        "pipeline:process_with_gemini": lambda: app_module.process_with_gemini(
+            mock_client, unique(RESUME_CONTENT), JOB_DESCRIPTION),
+        "pipeline:evaluate_resume_job_match": lambda: app_module.evaluate_resume_job_match(
+            mock_client, unique(MOCK_LATEX), JOB_DESCRIPTION),
+        "pipeline:optimize_resume_for_job": lambda: app_module.optimize_resume_for_job(
+            mock_client, unique(MOCK_LATEX), JOB_DESCRIPTION, "Add metrics"),
+        "pipeline:analyze_skills": lambda: app_module.analyze_skills(
+            mock_client, unique(MOCK_LATEX), JOB_DESCRIPTION),
+        "pipeline:generate_cover_letter": lambda: app_module.generate_cover_letter(
+            mock_client, unique(MOCK_LATEX), "Acme", JOB_DESCRIPTION),
+    }
+
+
+def run_scenario(fn, mock_client, requests, concurrency, warmup):
+    """Runs fn `requests` times across `concurrency` threads and returns its measurements."""
+    for _ in range(warmup):
+        try:
+            fn()
+        except Exception:
+            pass
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def timed_call(_):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    gc.collect()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    calls_before = mock_client.calls
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed_call, range(requests)))
+    wall = time.perf_counter() - start
+    calls = mock_client.calls - calls_before
+    gc.collect()
+    memory_growth = tracemalloc.get_traced_memory()[0] - memory_before
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": len(errors),
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "memory_growth_kib": round(memory_growth / 1024, 1),
+        "llm_calls_per_request": round(calls / requests, 2) if requests else 0.0,
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def measure_streamlit(reruns, script="streamlit_app.py"):
+    """
+    Runs the Streamlit script headless (streamlit.testing) once cold and then `reruns` more times,
+    as a widget change would, and times only the script's own execution. Run it in a fresh process:
+    modules already imported by an earlier scenario would make the cold start look faster.
+    """
+    import os
+    import streamlit
+    from streamlit.testing.v1 import AppTest
+    from streamlit.runtime.scriptrunner import script_runner
+
+    script_times = []
+    run_script = script_runner.exec_func_with_error_handling
+
+    def timed_run_script(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return run_script(*args, **kwargs)
+        finally:
+            script_times.append(time.perf_counter() - start)
+
+    script_runner.exec_func_with_error_handling = timed_run_script
+    modules_before = set(sys.modules)
+    try:
+        app_test = AppTest.from_file(os.path.abspath(script), default_timeout=120)
+        # Time the page a signed-in user reruns, not the login form
+        app_test.session_state["authenticated"] = True
+        for _ in range(reruns + 1):
+            app_test.run()
+            if app_test.exception:
+                raise RuntimeError(f"{script} raised: {app_test.exception[0].message}")
+    finally:
+        script_runner.exec_func_with_error_handling = run_script
+
+    heavy = ("google.genai", "PyPDF2", "docx", "pandas")
+    rerun_times = sorted(script_times[1:])
+    return {
+        "streamlit_version": streamlit.__version__,
+        "cold_run_ms": round(script_times[0] * 1000, 1),
+        "rerun_p50_ms": round(percentile(rerun_times, 50) * 1000, 2),
+        "rerun_p95_ms": round(percentile(rerun_times, 95) * 1000, 2),
+        "reruns": reruns,
+        "heavy_modules_imported": [name for name in heavy if name in sys.modules and name not in modules_before],
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Returns human-readable regressions of results against a baseline report."""
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        current = results.get(name)
+        if not current:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance) + 1:
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if current["llm_calls_per_request"] > base["llm_calls_per_request"] + 0.01:
+            regressions.append(f"{name}: LLM calls/request {base['llm_calls_per_request']} -> {current['llm_calls_per_request']}")
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {current['errors']}")
+    return regressions
+
+
+def print_report(results):
+    header = f"{'scenario':<36}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mem KiB':>10}{'LLM/req':>9}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        print(f"{name:<36}{result['throughput_rps']:>9}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+              f"{result['p99_ms']:>10}{result['memory_growth_kib']:>10}{result['llm_calls_per_request']:>9}{result['errors']:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline against the offline mock Gemini backend.")
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent requests per scenario")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed requests per scenario")
+    parser.add_argument("--latency-ms", type=float, default=50, help="mean mock LLM latency")
+    parser.add_argument("--latency-stddev-ms", type=float, default=15, help="mock LLM latency standard deviation")
+    parser.add_argument("--distribution", choices=("fixed", "normal", "lognormal"), default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock LLM calls that fail with a 503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="keep the LLM response cache enabled")
+    parser.add_argument("--enforce-quota", action="store_true", help="keep the per-key Gemini RPM/TPM limiter (GEMINI_RPM, GEMINI_TPM)")
+    parser.add_argument("--scenarios", help="comma-separated scenario name prefixes to run (default: all)")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's logging (injected errors are logged with tracebacks)")
+    parser.add_argument("--json", dest="json_path", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous --json report and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown against the baseline")
+    parser.add_argument("--streamlit", action="store_true", help="only measure the Streamlit script's cold start and rerun time")
+    parser.add_argument("--reruns", type=int, default=50, help="reruns timed by --streamlit")
+    args = parser.parse_args(argv)
+
+    if args.streamlit:
+        logging.getLogger().setLevel(logging.WARNING if args.verbose else logging.CRITICAL)
+        result = measure_streamlit(args.reruns)
+        print(f"streamlit {result['streamlit_version']}: cold run {result['cold_run_ms']} ms, "
+              f"rerun p50 {result['rerun_p50_ms']} ms, p95 {result['rerun_p95_ms']} ms over {result['reruns']} reruns; "
+              f"heavy modules imported: {', '.join(result['heavy_modules_imported']) or 'none'}")
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as file:
+                json.dump({"streamlit": result}, file, indent=2)
+        return 0
+
+    import app as app_module
+    import client_pool
+    from llm_cache import response_cache
+    from ratelimit import gemini_rate_limiter
+    # The app logs and swallows injected LLM failures; keep the report readable
+    logging.getLogger().setLevel(logging.WARNING if args.verbose else logging.CRITICAL)
+
+    mock_client = MockGenaiClient(
+        latency=LatencyModel(args.latency_ms, args.latency_stddev_ms, args.distribution, rng=random.Random(args.seed)),
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    app_module.HAS_GENAI = True
+    app_module.default_client = mock_client
+    client_pool.client_pool.factory = lambda api_key: mock_client
+    if not args.enforce_quota:
+        # The mock client is one key, so the default 60 RPM would hold every scenario to ~1 req/s
+        gemini_rate_limiter.limits = {}
+    if not args.cache:
+        response_cache.backend = None
+
+    scenarios = build_scenarios(app_module, mock_client)
+    if args.scenarios:
+        prefixes = [prefix.strip() for prefix in args.scenarios.split(",") if prefix.strip()]
+        scenarios = {name: fn for name, fn in scenarios.items() if any(name.startswith(prefix) for prefix in prefixes)}
+
+    tracemalloc.start()
+    results = {}
+    for name, fn in scenarios.items():
+        results[name] = run_scenario(fn, mock_client, args.requests, args.concurrency, args.warmup)
+    tracemalloc.stop()
+
+    print_report(results)
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("json_path", "baseline", "verbose")},
+        "scenarios": results
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
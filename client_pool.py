@@ -0,0 +1,99 @@
+import os
+import time
+import importlib.util
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Client pool configuration
+CLIENT_POOL_MAX_SIZE = int(os.environ.get("CLIENT_POOL_MAX_SIZE", "64"))
+CLIENT_POOL_IDLE_SECONDS = float(os.environ.get("CLIENT_POOL_IDLE_SECONDS", "1800"))
+
+# Set GENAI_BACKEND=mock to serve every request from the offline mock backend (mock_genai.py)
+GENAI_BACKEND = os.environ.get("GENAI_BACKEND", "gemini").lower()
+
+
+def _genai_installed():
+    try:
+        return importlib.util.find_spec("google.genai") is not None
+    except ImportError:
+        return False
+
+
+# Whether the Gemini SDK can be imported, checked once without importing it (the import takes ~0.4 s
+# and happens when the first real client is built)
+GENAI_INSTALLED = _genai_installed()
+
+
+def _create_genai_client(api_key):
+    if GENAI_BACKEND == "mock":
+        from mock_genai import MockGenaiClient
+        return MockGenaiClient()
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
+class ClientPool:
+    """
+    Keeps one genai.Client per API key so requests that reuse a key share its HTTP connection pool.
+    Least recently used clients are dropped past max_size, and idle clients expire after idle_seconds.
+    Dropped clients are not closed explicitly since another request may still be using them.
+    """
+
+    def __init__(self, factory=_create_genai_client, max_size=CLIENT_POOL_MAX_SIZE, idle_seconds=CLIENT_POOL_IDLE_SECONDS):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, api_key):
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+
+        # Build outside the lock; construction can be slow
+        client = self.factory(api_key)
+        with self._lock:
+            existing = self._clients.get(key)
+            if existing is not None:
+                client = existing[0]
+            self._clients[key] = (client, now)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+        return client
+
+    def _expire_idle(self, now):
+        expired = [key for key, (_, last_used) in self._clients.items() if now - last_used > self.idle_seconds]
+        for key in expired:
+            del self._clients[key]
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._clients),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "reuse_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Process-wide pool shared by every route and Streamlit session
+client_pool = ClientPool()
@@ -0,0 +1,143 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+import weakref
+
+# Gemini context caching for the static instructions + LaTeX template prompt prefix
+CONTEXT_CACHE_ENABLED = os.environ.get("CONTEXT_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+CONTEXT_CACHE_TTL_SECONDS = int(os.environ.get("CONTEXT_CACHE_TTL_SECONDS", "3600"))
+# Gemini refuses to cache prompts below a model-specific minimum size; skip those up front
+CONTEXT_CACHE_MIN_TOKENS = int(os.environ.get("CONTEXT_CACHE_MIN_TOKENS", "1024"))
+# After a failed upload, send the full prompt for this long before trying to cache it again
+CONTEXT_CACHE_RETRY_SECONDS = int(os.environ.get("CONTEXT_CACHE_RETRY_SECONDS", "600"))
+
+# Refresh a little before the server-side TTL so a call never references an expired cache
+_EXPIRY_MARGIN_SECONDS = 60
+
+
+def prefix_hash(model, prefix):
+    return hashlib.sha256(f"{model}\0{prefix}".encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(text):
+    # Gemini averages roughly four characters per token for English text
+    return len(text) // 4
+
+
+class PrefixCache:
+    """
+    Registers each static prompt prefix as Gemini cached content once per API key and model, and
+    hands back its resource name so later calls send only the request-specific part of the prompt.
+    Entries are keyed by a hash of the prefix text, so editing a prompt or template file produces a
+    new hash: the stale cached content is deleted and the new prefix is uploaded on the next call.
+    """
+
+    def __init__(self, enabled=CONTEXT_CACHE_ENABLED, ttl=CONTEXT_CACHE_TTL_SECONDS,
+                 min_tokens=CONTEXT_CACHE_MIN_TOKENS, retry_seconds=CONTEXT_CACHE_RETRY_SECONDS):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.retry_seconds = retry_seconds
+        # client.caches resource -> {(model, prefix_name): (hash, cached content name or None, expires_at)}
+        self._entries = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._slot_locks = {}
+        self.created = 0
+        self.reused = 0
+        self.failures = 0
+        self.invalidations = 0
+
+    def _lookup(self, caches, slot):
+        with self._lock:
+            return self._entries.get(caches, {}).get(slot)
+
+    def _store(self, caches, slot, entry):
+        with self._lock:
+            self._entries.setdefault(caches, {})[slot] = entry
+
+    def _slot_lock(self, caches, slot):
+        with self._lock:
+            return self._slot_locks.setdefault((id(caches),) + slot, threading.Lock())
+
+    def get(self, client, model, prefix_name, prefix):
+        """Returns the cached content name for this prefix, uploading it first if needed, or None."""
+        caches = getattr(client, "caches", None)
+        if not self.enabled or caches is None or estimate_tokens(prefix) < self.min_tokens:
+            return None
+
+        slot = (model, prefix_name)
+        digest = prefix_hash(model, prefix)
+        entry = self._lookup(caches, slot)
+        if entry and entry[0] == digest and entry[2] > time.time():
+            if entry[1]:
+                self.reused += 1
+            return entry[1]
+
+        # One upload per prefix even when many requests arrive at once
+        with self._slot_lock(caches, slot):
+            entry = self._lookup(caches, slot)
+            now = time.time()
+            if entry and entry[0] == digest and entry[2] > now:
+                if entry[1]:
+                    self.reused += 1
+                return entry[1]
+
+            if entry and entry[1] and entry[0] != digest:
+                self.invalidations += 1
+                logging.info(f"Prompt prefix '{prefix_name}' changed; replacing cached content {entry[1]}")
+                self._delete(caches, entry[1])
+
+            try:
+                cached_content = caches.create(
+                    model=model,
+                    config={
+                        "contents": [prefix],
+                        "ttl": f"{self.ttl}s",
+                        "display_name": f"{prefix_name}-{digest[:12]}"
+                    }
+                )
+            except Exception as e:
+                self.failures += 1
+                logging.warning(f"Could not cache prompt prefix '{prefix_name}' for {model}, sending it in full: {e}")
+                self._store(caches, slot, (digest, None, now + self.retry_seconds))
+                return None
+
+            self.created += 1
+            logging.info(f"Cached prompt prefix '{prefix_name}' for {model} as {cached_content.name}")
+            self._store(caches, slot, (digest, cached_content.name, now + max(0, self.ttl - _EXPIRY_MARGIN_SECONDS)))
+            return cached_content.name
+
+    def invalidate(self, client, model, prefix_name):
+        """Forgets a cached prefix the API no longer accepts (expired or deleted server-side)."""
+        caches = getattr(client, "caches", None)
+        if caches is None:
+            return
+        with self._lock:
+            entries = self._entries.get(caches)
+            if entries:
+                entries.pop((model, prefix_name), None)
+        self.invalidations += 1
+
+    def _delete(self, caches, name):
+        try:
+            caches.delete(name=name)
+        except Exception as e:
+            logging.warning(f"Could not delete stale cached content {name}: {e}")
+
+    def stats(self):
+        with self._lock:
+            entries = sum(1 for slots in self._entries.values() for entry in slots.values() if entry[1])
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "created": self.created,
+            "reused": self.reused,
+            "failures": self.failures,
+            "invalidations": self.invalidations
+        }
+
+
+# Process-wide registry shared by every Gemini helper
+prefix_cache = PrefixCache()
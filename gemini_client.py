@@ -0,0 +1,202 @@
+import time
+import asyncio
+import logging
+from llm_cache import response_cache, cache_key
+from context_cache import prefix_cache
+from metrics import llm_metrics
+from resilience import gemini_resilience, mark_degraded
+from ratelimit import gemini_rate_limiter
+from pipeline import DeadlineExceeded, current_deadline
+
+# Errors that mean a cached-content reference is no longer usable (expired, deleted, wrong key)
+_STALE_CACHE_CODES = (400, 403, 404)
+
+
+class CachedResponse:
+    """Minimal stand-in for a GenerateContentResponse served from the cache."""
+
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+        self.cached = True
+
+
+def _is_stale_cache_error(error):
+    return getattr(error, "code", None) in _STALE_CACHE_CODES
+
+
+def _bounded(config):
+    """
+    `config` with the time left before the request's deadline (pipeline.bound_by) as the HTTP
+    timeout. Called as each attempt starts, after any quota wait or retry backoff.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return config
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    return {**(config or {}), "http_options": {"timeout": max(1, int(remaining * 1000))}}
+
+
+def _generate(client, model, contents, prompt, prefix, prefix_name, config=None):
+    cached_content = prefix_cache.get(client, model, prefix_name, prefix) if prefix else None
+    if cached_content:
+        try:
+            return gemini_resilience.call(client, lambda: gemini_rate_limiter.call(client, prompt, lambda: client.models.generate_content(
+                model=model, contents=contents, config=_bounded({**(config or {}), "cached_content": cached_content}))))
+        except Exception as e:
+            if not _is_stale_cache_error(e):
+                raise
+            logging.warning(f"Cached prompt prefix {cached_content} was rejected, resending it in full: {e}")
+            prefix_cache.invalidate(client, model, prefix_name)
+    return gemini_resilience.call(client, lambda: gemini_rate_limiter.call(client, prompt, lambda: client.models.generate_content(
+        model=model, contents=prompt, config=_bounded(config))))
+
+
+def _generate_stream(client, model, contents, prompt, prefix, prefix_name, config=None):
+    cached_content = prefix_cache.get(client, model, prefix_name, prefix) if prefix else None
+    if cached_content:
+        started = False
+        try:
+            for response in gemini_resilience.stream(client, lambda: gemini_rate_limiter.stream(client, prompt, lambda: client.models.generate_content_stream(
+                    model=model, contents=contents, config=_bounded({**(config or {}), "cached_content": cached_content})))):
+                started = True
+                yield response
+            return
+        except Exception as e:
+            # Only safe to fall back before anything has been sent to the caller
+            if started or not _is_stale_cache_error(e):
+                raise
+            logging.warning(f"Cached prompt prefix {cached_content} was rejected, resending it in full: {e}")
+            prefix_cache.invalidate(client, model, prefix_name)
+    yield from gemini_resilience.stream(client, lambda: gemini_rate_limiter.stream(client, prompt, lambda: client.models.generate_content_stream(
+        model=model, contents=prompt, config=_bounded(config))))
+
+
+def generate_content(client, model, contents, use_cache=True, prefix=None, prefix_name="prompt", stage="unknown", config=None):
+    """
+    Single entry point for every Gemini generate_content call.
+    Byte-identical (model, prompt) pairs are answered from the shared response cache;
+    pass use_cache=False for calls that are meant to vary (e.g. regeneration).
+    `prefix` is the static start of the prompt (instructions + template). It is registered once as
+    Gemini cached content and referenced by name, so only `contents` is sent on each call.
+    Tokens, latency and outcome are recorded in llm_metrics under `stage`.
+    Transient errors are retried with backoff behind a per-key circuit breaker (resilience.py); a call
+    that still fails or comes back empty marks `stage` as degraded for the current request.
+    Every attempt first queues for the API key's requests/tokens-per-minute quota (ratelimit.py).
+    Inside pipeline.bound_by, each attempt is limited to the time left before the request deadline.
+    `config` (e.g. a JSON response schema) is passed to the API and is part of the cache key.
+    """
+    prompt = prefix + contents if prefix else contents
+    key = cache_key(model, [prompt, config] if config else prompt) if use_cache else None
+    if key:
+        cached_text = response_cache.get(key)
+        if cached_text is not None:
+            logging.info(f"Serving {model} response from cache")
+            llm_metrics.record(model, stage, 0.0, "cache_hit")
+            return CachedResponse(cached_text)
+
+    start = time.perf_counter()
+    try:
+        response = _generate(client, model, contents, prompt, prefix, prefix_name, config)
+    except Exception:
+        llm_metrics.record(model, stage, time.perf_counter() - start, "error")
+        mark_degraded(stage)
+        raise
+    text = response.text if response is not None else None
+    llm_metrics.record(model, stage, time.perf_counter() - start, "ok" if text else "empty", getattr(response, "usage_metadata", None))
+    if not text:
+        mark_degraded(stage)
+
+    if key and text:
+        response_cache.set(key, text)
+    return response
+
+
+def generate_content_stream(client, model, contents, use_cache=True, prefix=None, prefix_name="prompt", stage="unknown", config=None):
+    """
+    Streaming counterpart of generate_content: yields text chunks as the model produces them.
+    A cached response is yielded as a single chunk; the joined stream is cached once it completes.
+    """
+    prompt = prefix + contents if prefix else contents
+    key = cache_key(model, [prompt, config] if config else prompt) if use_cache else None
+    if key:
+        cached_text = response_cache.get(key)
+        if cached_text is not None:
+            logging.info(f"Serving {model} response from cache")
+            llm_metrics.record(model, stage, 0.0, "cache_hit")
+            yield cached_text
+            return
+
+    chunks = []
+    usage_metadata = None
+    outcome = "cancelled"
+    start = time.perf_counter()
+    try:
+        deadline = current_deadline()
+        for response in _generate_stream(client, model, contents, prompt, prefix, prefix_name, config):
+            # The final chunk carries the usage totals for the whole stream
+            usage_metadata = getattr(response, "usage_metadata", None) or usage_metadata
+            if response.text:
+                chunks.append(response.text)
+                yield response.text
+            # The HTTP timeout only bounds each read, so a long stream is cut off here
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded()
+        outcome = "ok" if chunks else "empty"
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        llm_metrics.record(model, stage, time.perf_counter() - start, outcome, usage_metadata)
+        if outcome in ("error", "empty"):
+            mark_degraded(stage)
+
+    if key and chunks:
+        response_cache.set(key, "".join(chunks))
+
+
+async def agenerate_content(client, model, contents, use_cache=True, prefix=None, prefix_name="prompt", stage="unknown", config=None):
+    """
+    Async counterpart of generate_content using the SDK's client.aio, so waiting on Gemini
+    does not hold a thread. Shares the response cache, prompt-prefix cache and metrics.
+    """
+    prompt = prefix + contents if prefix else contents
+    key = cache_key(model, [prompt, config] if config else prompt) if use_cache else None
+    if key:
+        cached_text = await response_cache.aget(key)
+        if cached_text is not None:
+            logging.info(f"Serving {model} response from cache")
+            llm_metrics.record(model, stage, 0.0, "cache_hit")
+            return CachedResponse(cached_text)
+
+    start = time.perf_counter()
+    try:
+        response = None
+        # Uploading the prefix is a blocking call, made at most once per prefix and TTL
+        cached_content = await asyncio.to_thread(prefix_cache.get, client, model, prefix_name, prefix) if prefix else None
+        if cached_content:
+            try:
+                response = await gemini_resilience.acall(client, lambda: gemini_rate_limiter.acall(client, prompt, lambda: client.aio.models.generate_content(
+                    model=model, contents=contents, config=_bounded({**(config or {}), "cached_content": cached_content}))))
+            except Exception as e:
+                if not _is_stale_cache_error(e):
+                    raise
+                logging.warning(f"Cached prompt prefix {cached_content} was rejected, resending it in full: {e}")
+                prefix_cache.invalidate(client, model, prefix_name)
+        if response is None:
+            response = await gemini_resilience.acall(client, lambda: gemini_rate_limiter.acall(client, prompt, lambda: client.aio.models.generate_content(
+                model=model, contents=prompt, config=_bounded(config))))
+    except Exception:
+        llm_metrics.record(model, stage, time.perf_counter() - start, "error")
+        mark_degraded(stage)
+        raise
+    text = response.text if response is not None else None
+    llm_metrics.record(model, stage, time.perf_counter() - start, "ok" if text else "empty", getattr(response, "usage_metadata", None))
+    if not text:
+        mark_degraded(stage)
+
+    if key and text:
+        await response_cache.aset(key, text)
+    return response
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Background jobs for long generations: records live in SQLite so results outlive the worker
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", "jobs.sqlite3")
+JOBS_MAX_WORKERS = int(os.environ.get("JOBS_MAX_WORKERS", "4"))
+# Jobs queued or running in one process before new submissions are refused with 503
+JOBS_MAX_PENDING = int(os.environ.get("JOBS_MAX_PENDING", "100"))
+JOBS_TTL_SECONDS = float(os.environ.get("JOBS_TTL_SECONDS", "86400"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner):
+    """False only when the owning process is known to be gone (same host, pid not running)."""
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit() or os.name == "nt":
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class JobStore:
+    """SQLite-backed job records shared by every worker on the host."""
+
+    def __init__(self, path=JOBS_DB_PATH, ttl=JOBS_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, stage TEXT, "
+                "stages TEXT NOT NULL, result TEXT, error TEXT, owner TEXT NOT NULL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def create(self, job_id, kind):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, stage, stages, owner, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, QUEUED, "[]", _owner(), now, now)
+            )
+            # Finished jobs are kept for ttl seconds so a reloaded page can still fetch the result
+            conn.execute(
+                "DELETE FROM jobs WHERE updated_at < ? AND status IN (?, ?)",
+                (now - self.ttl, SUCCEEDED, FAILED)
+            )
+
+    def add_stage(self, job_id, stage, message):
+        """Appends a progress entry; only the worker running the job writes to it."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row[0])
+            stages.append({"stage": stage, "message": message, "at": now})
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, stages = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, stage, json.dumps(stages), now, job_id)
+            )
+
+    def finish(self, job_id, result):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, result = ?, updated_at = ? WHERE id = ?",
+                (SUCCEEDED, "done", json.dumps(result), time.time(), job_id)
+            )
+
+    def fail(self, job_id, error, only_pending=False):
+        """Marks a job failed; with only_pending, a job that finished in the meantime is left alone."""
+        query = "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?"
+        if only_pending:
+            query += f" AND status IN ('{QUEUED}', '{RUNNING}')"
+        with self._connect() as conn:
+            conn.execute(query, (FAILED, error, time.time(), job_id))
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, stage, stages, result, error, owner, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "stage": row[3],
+            "stages": json.loads(row[4]),
+            "result": json.loads(row[5]) if row[5] else None,
+            "error": row[6],
+            "owner": row[7],
+            "created_at": row[8],
+            "updated_at": row[9],
+        }
+
+
+class JobQueue:
+    """
+    Runs submitted work on a bounded thread pool and records its progress in a JobStore.
+    The submitted function receives a progress(stage, message) callback as its first argument
+    and returns a JSON-serialisable result. A job whose worker process died is reported as
+    failed the next time it is polled, instead of staying "running" forever.
+    """
+
+    def __init__(self, store, max_workers=JOBS_MAX_WORKERS, max_pending=JOBS_MAX_PENDING):
+        self.store = store
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._active = set()
+
+    def submit(self, kind, fn, *args):
+        """Queues fn(progress, *args) and returns the job id, or None when the queue is full."""
+        with self._lock:
+            if len(self._active) >= self.max_pending:
+                return None
+            job_id = str(uuid.uuid4())
+            self._active.add(job_id)
+        try:
+            self.store.create(job_id, kind)
+            self._executor.submit(self._run, job_id, fn, args)
+        except Exception:
+            with self._lock:
+                self._active.discard(job_id)
+            raise
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        def progress(stage, message):
+            try:
+                self.store.add_stage(job_id, stage, message)
+            except Exception:
+                logging.exception(f"Could not record progress for job {job_id}")
+
+        try:
+            result = fn(progress, *args)
+            self.store.finish(job_id, result)
+        except Exception as e:
+            logging.exception(f"Job {job_id} failed")
+            self.store.fail(job_id, str(e) or "An unknown error occurred during processing")
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def get(self, job_id):
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in (QUEUED, RUNNING):
+            return job
+        if job["owner"] == _owner():
+            with self._lock:
+                orphaned = job_id not in self._active
+        else:
+            orphaned = not _owner_alive(job["owner"])
+        if orphaned:
+            logging.warning(f"Job {job_id} was interrupted by a worker restart")
+            self.store.fail(job_id, "The job was interrupted by a server restart. Please submit it again.", only_pending=True)
+            job = self.store.get(job_id)
+        return job
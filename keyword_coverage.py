@@ -0,0 +1,336 @@
+"""
+Local keyword-coverage pre-scorer: how much of a job description's key vocabulary a resume
+already uses, computed in milliseconds without calling Gemini.
+
+Coverage is recorded next to every Gemini evaluation score, and the recorded pairs calibrate
+the threshold above which the Gemini evaluation is skipped. Print the calibration with:
+
+    python keyword_coverage.py [--db coverage.sqlite3]
+"""
+import os
+import re
+import math
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from collections import Counter
+
+# SQLite file holding (coverage, Gemini score) pairs; empty turns recording and skipping off
+COVERAGE_DB_PATH = os.environ.get("COVERAGE_DB_PATH", "coverage.sqlite3")
+# "auto" skips the Gemini evaluation above the calibrated threshold, "off" never skips,
+# a number (0-1) is used as a fixed threshold
+COVERAGE_SKIP_THRESHOLD = os.environ.get("COVERAGE_SKIP_THRESHOLD", "auto")
+# Calibration needs this many recorded scores at or above a threshold before it trusts it ...
+COVERAGE_MIN_SAMPLES = int(os.environ.get("COVERAGE_MIN_SAMPLES", "30"))
+# ... and this share of them must have scored at least the optimization threshold
+COVERAGE_SKIP_PRECISION = float(os.environ.get("COVERAGE_SKIP_PRECISION", "0.95"))
+# Job description terms considered per request (the highest-weighted ones)
+COVERAGE_MAX_TERMS = int(os.environ.get("COVERAGE_MAX_TERMS", "40"))
+
+# Score below which the pipeline optimizes the resume (same cut-off as the generation routes)
+TARGET_SCORE = 8
+# BM25 term-frequency saturation
+BM25_K1 = 1.2
+# Most recent samples used for calibration, and how many new ones trigger a recalibration
+CALIBRATION_WINDOW = 2000
+RECALIBRATE_EVERY = 20
+
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each either else etc ever
+every few for from further had has have having he her here hers him his how i if in into is it its
+itself just least less like may me might more most must my no nor not now of off on once only or
+other our ours out over own per plus same she should so some such than that the their them then
+there these they this those through to too under until up upon us very via was we well were what
+when where whether which while who whom why will with within without would yet you your
+ability able across apply candidate candidates company day days desired duties environment etc
+excellent experience experienced familiarity good great help ideal including job join key
+knowledge looking must new opportunity position preferred preferably proven qualifications
+related required requirements responsibilities role seeking skills strong success successful team
+teams understanding using work working world year years
+""".split())
+
+# Tokens keep the symbols of technology names: c++, c#, node.js, ci/cd, scikit-learn
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+# Phrases do not run across these
+_CLAUSE_BREAK = re.compile(r"[\n;:,()!?•|]|\.(?:\s|$)")
+
+
+def _normalize(token):
+    # Light stemming so "pipelines" matches "pipeline"; technology names are left alone
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss") and token.isalpha():
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Lowercased tokens per clause as (stemmed, as written) pairs; stopwords and numbers are kept
+    as None so phrases do not form across them.
+    """
+    clauses = []
+    for clause in _CLAUSE_BREAK.split((text or "").lower()):
+        tokens = []
+        for token in _TOKEN.findall(clause):
+            token = token.strip("./-")
+            if not token or token in STOPWORDS or not re.search(r"[a-z]", token):
+                tokens.append(None)
+            else:
+                tokens.append((_normalize(token), token))
+        if any(tokens):
+            clauses.append(tokens)
+    return clauses
+
+
+def _terms(clauses):
+    """
+    Unigram and bigram counts (a bigram is two adjacent non-stopword tokens) keyed by stemmed
+    form, and the form each term was first written in.
+    """
+    counts = Counter()
+    written = {}
+    for tokens in clauses:
+        for i, token in enumerate(tokens):
+            if token is None:
+                continue
+            terms = [token]
+            if i + 1 < len(tokens) and tokens[i + 1] is not None:
+                terms.append((f"{token[0]} {tokens[i + 1][0]}", f"{token[1]} {tokens[i + 1][1]}"))
+            for term, as_written in terms:
+                counts[term] += 1
+                written.setdefault(term, as_written)
+    return counts, written
+
+
+def coverage_report(resume_text, job_description, max_terms=COVERAGE_MAX_TERMS):
+    """
+    Weighted share of the job description's key terms that appear in the resume.
+    Term weight is BM25's saturated term frequency in the job description; phrases (bigrams)
+    count only when repeated and weigh 1.5x, and a phrase whose words both appear in the resume
+    (just not side by side) earns half credit. Returns {"coverage": 0-1, "uncovered": [terms,
+    heaviest first], "terms": int, "covered": int}.
+    """
+    job_terms, written = _terms(tokenize(job_description))
+    resume_terms, _ = _terms(tokenize(resume_text))
+
+    weights = {}
+    for term, count in job_terms.items():
+        is_phrase = " " in term
+        if is_phrase and count < 2:
+            continue
+        weight = count * (BM25_K1 + 1) / (count + BM25_K1)
+        weights[term] = weight * 1.5 if is_phrase else weight
+    # Heaviest terms first; ties keep the job description's order
+    ranked = sorted(weights, key=lambda term: -weights[term])[:max_terms]
+
+    total = covered_weight = 0.0
+    covered = 0
+    uncovered = []
+    for term in ranked:
+        total += weights[term]
+        if term in resume_terms:
+            credit = 1.0
+        elif " " in term and all(word in resume_terms for word in term.split()):
+            credit = 0.5
+        else:
+            credit = 0.0
+        covered_weight += weights[term] * credit
+        if credit == 1.0:
+            covered += 1
+        else:
+            uncovered.append(written[term])
+
+    return {
+        "coverage": round(covered_weight / total, 4) if total else 0.0,
+        "uncovered": uncovered,
+        "terms": len(ranked),
+        "covered": covered,
+    }
+
+
+def local_feedback(report, score):
+    """Feedback shown when the score was estimated from coverage instead of by Gemini."""
+    feedback = (f"Estimated {score}/10 from keyword coverage: {report['coverage']:.0%} of the job "
+                f"description's key terms appear in the resume, so the Gemini evaluation was skipped.")
+    if report["uncovered"]:
+        feedback += f" Terms not yet covered: {', '.join(report['uncovered'][:10])}."
+    return feedback
+
+
+def feedback_with_uncovered(feedback, report):
+    """Adds the uncovered job description terms to evaluator feedback for the optimizer."""
+    if not report or not report.get("uncovered"):
+        return feedback
+    missing = ", ".join(report["uncovered"][:15])
+    return f"{feedback or ''}\n\nJob description keywords missing from the resume (work in the ones the candidate's experience supports): {missing}".strip()
+
+
+def calibrate(samples, min_samples=COVERAGE_MIN_SAMPLES, precision=COVERAGE_SKIP_PRECISION, target=TARGET_SCORE):
+    """
+    Lowest coverage threshold at which at least `precision` of the recorded Gemini scores at or
+    above it reached `target`, backed by at least `min_samples` scores. `samples` is a list of
+    (coverage, score). Returns {"threshold" (None when no threshold qualifies), "estimated_score",
+    "precision", "samples_above", "samples", "correlation"}.
+    """
+    samples = sorted(samples)
+    result = {
+        "threshold": None,
+        "estimated_score": None,
+        "precision": None,
+        "samples_above": 0,
+        "samples": len(samples),
+        "correlation": _correlation(samples),
+    }
+    # Walk thresholds from the top down, keeping the lowest one that still qualifies
+    reached = 0
+    for index in range(len(samples) - 1, -1, -1):
+        coverage, score = samples[index]
+        reached += score >= target
+        above = len(samples) - index
+        if index > 0 and samples[index - 1][0] == coverage:
+            continue
+        if above >= min_samples and reached / above >= precision:
+            scores = sorted(score for _, score in samples[index:])
+            result.update({
+                "threshold": coverage,
+                "estimated_score": max(target, scores[len(scores) // 2]),
+                "precision": round(reached / above, 4),
+                "samples_above": above,
+            })
+    return result
+
+
+def _correlation(samples):
+    """Pearson correlation between coverage and score, or None with too little data."""
+    if len(samples) < 3:
+        return None
+    xs = [coverage for coverage, _ in samples]
+    ys = [score for _, score in samples]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    spread = math.sqrt(sum((x - mean_x) ** 2 for x in xs) * sum((y - mean_y) ** 2 for y in ys))
+    return round(cov / spread, 4) if spread else None
+
+
+class CoverageCalibration:
+    """
+    Records (coverage, Gemini score) pairs in SQLite and decides when a resume's coverage is
+    high enough to skip the Gemini evaluation. The calibration is recomputed every
+    RECALIBRATE_EVERY new samples.
+    """
+
+    def __init__(self, path=COVERAGE_DB_PATH, skip_threshold=COVERAGE_SKIP_THRESHOLD):
+        self.path = path
+        self.skip_threshold = skip_threshold
+        self.skipped = 0
+        self.recorded = 0
+        self._calibration = None
+        self._since_calibration = 0
+        self._lock = threading.Lock()
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS coverage_samples ("
+                    "coverage REAL NOT NULL, score INTEGER NOT NULL, created_at REAL NOT NULL)"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def record(self, coverage, score):
+        """Stores the coverage of a resume Gemini has just scored."""
+        if not self.path or score is None:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO coverage_samples (coverage, score, created_at) VALUES (?, ?, ?)",
+                    (coverage, int(score), time.time())
+                )
+        except Exception:
+            logging.exception("Error recording a keyword coverage sample")
+            return
+        with self._lock:
+            self.recorded += 1
+            self._since_calibration += 1
+
+    def samples(self, limit=CALIBRATION_WINDOW):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT coverage, score FROM coverage_samples ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def calibration(self):
+        """Current calibration (see calibrate), refreshed after enough new samples."""
+        if not self.path:
+            return calibrate([])
+        with self._lock:
+            if self._calibration is not None and self._since_calibration < RECALIBRATE_EVERY:
+                return self._calibration
+        try:
+            calibration = calibrate(self.samples())
+        except Exception:
+            logging.exception("Error calibrating keyword coverage")
+            calibration = calibrate([])
+        with self._lock:
+            self._calibration = calibration
+            self._since_calibration = 0
+        return calibration
+
+    def skip_estimate(self, coverage):
+        """Score to report instead of asking Gemini, or None when the evaluation should run."""
+        setting = str(self.skip_threshold).strip().lower()
+        if setting == "off" or not self.path:
+            return None
+        calibration = self.calibration()
+        if setting == "auto":
+            threshold = calibration["threshold"]
+        else:
+            try:
+                threshold = float(setting)
+            except ValueError:
+                logging.warning(f"Ignoring invalid COVERAGE_SKIP_THRESHOLD {self.skip_threshold!r}")
+                return None
+        if threshold is None or coverage < threshold:
+            return None
+        with self._lock:
+            self.skipped += 1
+        return calibration["estimated_score"] or TARGET_SCORE
+
+    def stats(self):
+        calibration = self.calibration()
+        with self._lock:
+            return {
+                "skip_threshold_setting": self.skip_threshold,
+                "evaluations_skipped": self.skipped,
+                "samples_recorded": self.recorded,
+                **calibration,
+            }
+
+
+# Shared by every route in the process; the samples file is shared by every worker on the host
+coverage_calibration = CoverageCalibration()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show how keyword coverage lines up with recorded Gemini scores.")
+    parser.add_argument("--db", default=COVERAGE_DB_PATH, help="coverage samples database (default: %(default)s)")
+    args = parser.parse_args()
+
+    samples = CoverageCalibration(args.db).samples()
+    print(f"{len(samples)} samples")
+    buckets = {}
+    for coverage, score in samples:
+        buckets.setdefault(min(9, int(coverage * 10)), []).append(score)
+    print("coverage    n  mean score  share >= 8")
+    for bucket in sorted(buckets):
+        scores = buckets[bucket]
+        share = sum(score >= TARGET_SCORE for score in scores) / len(scores)
+        print(f"{bucket / 10:.1f}-{(bucket + 1) / 10:.1f} {len(scores):5d} {sum(scores) / len(scores):11.2f} {share:11.0%}")
+    print(calibrate(samples))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Local checks for LaTeX a model returned, run before the document is accepted: unbalanced braces
+and environments, unescaped special characters, macros the template does not know, leftover
+Markdown fences and a truncated ending. What can be fixed without guessing is repaired in place;
+everything else is reported per section, so only the broken sections need another request.
+"""
+import os
+import re
+import logging
+import threading
+from resume_sections import split_sections, splice_sections
+from resume_model import strip_code_fence
+
+# Commands every resume may use, on top of the ones the template itself uses or defines
+BASE_MACROS = frozenset("""
+    begin end section subsection item textbf textit texttt textsc textrm textsf textup emph underline
+    href url small footnotesize scriptsize tiny normalsize large Large LARGE huge Huge scshape bfseries
+    itshape mdseries vspace hspace hfill vfill newline linebreak par noindent centering raggedright
+    raggedleft quad qquad enspace textbar textbullet textendash textemdash textperiodcentered cdot
+    bullet ldots dots textasciitilde textasciicircum textbackslash textdegree color textcolor
+    extracolsep fill textwidth linewidth titlerule LaTeX TeX today and
+""".split())
+
+# Template macros used like \begin / \end; each opener must be closed in the same section
+PAIRED_MACROS = {
+    "resumeSubHeadingListStart": "resumeSubHeadingListEnd",
+    "resumeItemListStart": "resumeItemListEnd",
+}
+# Environments whose & are column separators rather than text
+ALIGNMENT_ENVIRONMENTS = ("tabular", "tabular*", "tabularx", "array", "align", "align*")
+
+_TOKEN = re.compile(r"\\begin\s*\{([^{}]*)\}|\\end\s*\{([^{}]*)\}|\\([a-zA-Z]+)|\\.|([{}])", re.DOTALL)
+_COMMENT = re.compile(r"(?<!\\)%.*")
+_DEFINED = re.compile(r"\\(?:re)?newcommand\*?\s*\{?\\([a-zA-Z]+)|\\def\s*\\([a-zA-Z]+)")
+_LINK_ARG = re.compile(r"\\(?:href|url)\s*\{[^{}]*\}")
+_MATH = re.compile(r"(?<!\\)\$(?:[^$\\\n]|\\.)*?(?<!\\)\$")
+_FENCE_LINE = re.compile(r"^[ \t]*```[a-zA-Z]*[ \t]*\n?", re.MULTILINE)
+# A percent sign straight after a number is a percentage, not the start of a comment
+_PERCENTAGE = re.compile(r"(?<=\d)(?<!\\)%")
+_SPECIAL = re.compile(r"(?<!\\)[&#_]")
+_DOLLAR = re.compile(r"(?<!\\)\$")
+
+
+def _load_template():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "latex_template.tex")
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+    except OSError:
+        logging.error(f"Error loading template file {path} for the LaTeX checks")
+        return ""
+
+
+def macros_in(latex_code):
+    """Names of the commands a LaTeX text uses or defines."""
+    return set(re.findall(r"\\([a-zA-Z]+)", latex_code))
+
+
+TEMPLATE = _load_template()
+TEMPLATE_MACROS = macros_in(TEMPLATE)
+# The template's own \newcommand macros, listed for the model when it has to repair a section
+TEMPLATE_CUSTOM_MACROS = ["\\" + name for name in sorted(
+    set(re.findall(r"\\newcommand\*?\s*\{?\\([a-zA-Z]+)", TEMPLATE)) | set(PAIRED_MACROS) | set(PAIRED_MACROS.values()))]
+TEMPLATE_PREAMBLE = TEMPLATE[:TEMPLATE.find("\\begin{document}")] if "\\begin{document}" in TEMPLATE else ""
+
+
+def _issue(code, message, section=None, line=None):
+    return {"code": code, "message": message, "section": section, "line": line}
+
+
+def _blank(text, pattern):
+    """The text with every match of pattern replaced by spaces, so offsets stay put."""
+    return pattern.sub(lambda match: " " * len(match.group()), text)
+
+
+def _protected(text):
+    """Spans the character checks skip: comments, math, and the URL argument of \\href / \\url."""
+    spans = [match.span() for match in _COMMENT.finditer(text)]
+    spans += [match.span() for match in _MATH.finditer(_blank(text, _COMMENT))]
+    spans += [match.span() for match in _LINK_ARG.finditer(text)]
+    return spans
+
+
+def _alignment_spans(text):
+    spans = []
+    for env in ALIGNMENT_ENVIRONMENTS:
+        for match in re.finditer(r"\\begin\{" + re.escape(env) + r"\}.*?\\end\{" + re.escape(env) + r"\}", text, re.DOTALL):
+            spans.append(match.span())
+    return spans
+
+
+def _inside(position, spans):
+    return any(start <= position < end for start, end in spans)
+
+
+def _line_at(text, position, first_line):
+    return first_line + text.count("\n", 0, position)
+
+
+def _scan_structure(text):
+    """
+    Walks the tokens once and returns (open brace positions, unmatched } positions, environment
+    problems, environments still open at the end as (name, closer), macro names used).
+    """
+    braces, extra_braces, problems, environments, macros = [], [], [], [], set()
+    for match in _TOKEN.finditer(text):
+        begin, end, macro, brace = match.groups()
+        if begin is not None:
+            environments.append((begin, f"\\end{{{begin}}}", match.start()))
+        elif end is not None:
+            if environments and environments[-1][0] == end:
+                environments.pop()
+            else:
+                problems.append((match.start(), f"\\end{{{end}}} does not close "
+                                 + (f"\\begin{{{environments[-1][0]}}}" if environments else "any open environment")))
+        elif macro is not None:
+            macros.add(macro)
+            if macro in PAIRED_MACROS:
+                environments.append((macro, f"\\{PAIRED_MACROS[macro]}", match.start()))
+            elif macro in PAIRED_MACROS.values():
+                if environments and PAIRED_MACROS.get(environments[-1][0]) == macro:
+                    environments.pop()
+                else:
+                    problems.append((match.start(), f"\\{macro} without a matching opener"))
+        elif brace == "{":
+            braces.append(match.start())
+        elif brace == "}":
+            if braces:
+                braces.pop()
+            else:
+                extra_braces.append(match.start())
+    return braces, extra_braces, problems, environments, macros
+
+
+def lint_section(text, key, known_macros, first_line=1):
+    """Problems in one body section (the heading or a \\section), each tagged with the section key."""
+    code = _blank(text, _COMMENT)
+    issues = []
+    braces, extra_braces, problems, environments, macros = _scan_structure(code)
+    for position in braces:
+        issues.append(_issue("unbalanced_braces", "{ is never closed", key, _line_at(code, position, first_line)))
+    for position in extra_braces:
+        issues.append(_issue("unbalanced_braces", "} has no matching {", key, _line_at(code, position, first_line)))
+    for position, message in problems:
+        issues.append(_issue("environment_mismatch", message, key, _line_at(code, position, first_line)))
+    for name, closer, position in environments:
+        issues.append(_issue("unclosed_environment", f"{name} is not closed by {closer}", key, _line_at(code, position, first_line)))
+    for name in sorted(macros - known_macros):
+        position = code.find("\\" + name)
+        issues.append(_issue("unknown_macro", f"\\{name} is not defined by the template", key, _line_at(code, position, first_line)))
+
+    protected = _protected(text)
+    alignment = _alignment_spans(code)
+    for match in _SPECIAL.finditer(text):
+        if _inside(match.start(), protected) or (match.group() == "&" and _inside(match.start(), alignment)):
+            continue
+        issues.append(_issue("unescaped_character", f"{match.group()} must be written \\{match.group()}", key, _line_at(text, match.start(), first_line)))
+    for line_number, line in enumerate(code.split("\n"), first_line):
+        if len(_DOLLAR.findall(line)) % 2:
+            issues.append(_issue("unescaped_character", "$ opens math mode that is never closed (write \\$ for a dollar sign)", key, line_number))
+    return issues
+
+
+def lint_latex(latex_code, known_macros=None):
+    """All problems in a document, without changing it. A section of None means the whole document."""
+    issues = []
+    if "```" in latex_code:
+        issues.append(_issue("code_fence", "Markdown code fence left in the output"))
+    sections = split_sections(latex_code) if "\\documentclass" in latex_code else None
+    if "\\documentclass" not in latex_code:
+        issues.append(_issue("missing_preamble", "No \\documentclass preamble"))
+    if "\\end{document}" not in latex_code:
+        issues.append(_issue("truncated", "The document stops before \\end{document}"))
+    if not sections:
+        if not issues:
+            issues.append(_issue("no_sections", "No \\section found between \\begin{document} and \\end{document}"))
+        return issues
+
+    known = (known_macros or TEMPLATE_MACROS) | BASE_MACROS | {a or b for a, b in _DEFINED.findall(sections[0].text)}
+    preamble = sections[0]
+    if _blank(latex_code[:latex_code.find("\\documentclass")], _COMMENT).strip():
+        issues.append(_issue("surrounding_text", "Text before \\documentclass"))
+    if sections[-1].text.strip() != "\\end{document}":
+        issues.append(_issue("surrounding_text", "Text after \\end{document}"))
+    braces, extra_braces, _, _, _ = _scan_structure(_blank(preamble.text, _COMMENT))
+    if braces or extra_braces:
+        issues.append(_issue("unbalanced_braces", "Unbalanced braces in the preamble", "preamble"))
+
+    line = preamble.text.count("\n") + 1
+    for section in sections[1:-1]:
+        issues.extend(lint_section(section.text, section.key, known, line))
+        line += section.text.count("\n")
+    return issues
+
+
+def _escape_specials(text, fixed, key):
+    """Escapes & # _ and percentages written as plain text; returns the new text."""
+    protected = [match.span() for match in _LINK_ARG.finditer(text)]
+    count = 0
+
+    def escape_percent(match):
+        nonlocal count
+        if _inside(match.start(), protected):
+            return match.group()
+        count += 1
+        return "\\%"
+    text = _PERCENTAGE.sub(escape_percent, text)
+
+    # $ straight before a number on a line with an odd number of $ is a price, not math
+    lines = []
+    for line in text.split("\n"):
+        dollars = [match.start() for match in _DOLLAR.finditer(_blank(line, _COMMENT))]
+        if len(dollars) % 2:
+            price = next((position for position in dollars if line[position + 1:position + 2].isdigit()), None)
+            if price is not None:
+                line = line[:price] + "\\" + line[price:]
+                count += 1
+        lines.append(line)
+    text = "\n".join(lines)
+
+    protected = _protected(text)
+    alignment = _alignment_spans(_blank(text, _COMMENT))
+    parts = []
+    last = 0
+    for match in _SPECIAL.finditer(text):
+        if _inside(match.start(), protected) or (match.group() == "&" and _inside(match.start(), alignment)):
+            continue
+        parts.append(text[last:match.start()] + "\\" + match.group())
+        last = match.end()
+        count += 1
+    text = "".join(parts) + text[last:]
+    if count:
+        fixed.append(_issue("unescaped_character", f"Escaped {count} special character(s)", key))
+    return text
+
+
+def _close_environments(text, fixed, key):
+    """Appends the closers for lists left open at the end of a section, if nothing else is wrong with them."""
+    braces, extra_braces, problems, environments, _ = _scan_structure(_blank(text, _COMMENT))
+    if not environments or braces or extra_braces or problems:
+        return text
+    body = text.rstrip()
+    closers = "".join(f"\n  {closer}" for _, closer, _ in reversed(environments))
+    fixed.append(_issue("unclosed_environment", f"Closed {', '.join(name for name, _, _ in environments)}", key))
+    return body + closers + text[len(body):]
+
+
+def repair_latex(latex_code):
+    """
+    Fixes what has only one sensible fix and checks the result. Returns (latex, report) where
+    report holds the "fixed" and remaining "issues" lists, "broken_sections" (keys of sections
+    that still have problems) and "not_latex" (True when there is no document to repair).
+    """
+    fixed = []
+    text = latex_code or ""
+
+    if "```" in text:
+        text = _FENCE_LINE.sub("", strip_code_fence(text))
+        fixed.append(_issue("code_fence", "Removed Markdown code fences"))
+
+    start = text.find("\\documentclass")
+    # Comment lines before \documentclass (an author banner) are kept; prose around the code is not
+    if start > 0 and _blank(text[:start], _COMMENT).strip():
+        text = text[start:]
+        fixed.append(_issue("surrounding_text", "Removed text before \\documentclass"))
+    end = text.rfind("\\end{document}")
+    if end != -1 and text[end + len("\\end{document}"):].strip():
+        text = text[:end + len("\\end{document}")] + "\n"
+        fixed.append(_issue("surrounding_text", "Removed text after \\end{document}"))
+
+    if start == -1:
+        begin = text.find("\\begin{document}")
+        if begin == -1 and not re.search(r"\\section\*?\{", text):
+            return latex_code, {"fixed": [], "issues": [_issue("not_latex", "The output holds no LaTeX document")],
+                                "broken_sections": [], "not_latex": True}
+        body = text[begin:] if begin != -1 else "\\begin{document}\n" + text.strip() + "\n"
+        text = TEMPLATE_PREAMBLE + body
+        fixed.append(_issue("missing_preamble", "Added the template preamble"))
+
+    truncated = None
+    if "\\end{document}" not in text:
+        body_start = text.find("\\begin{document}") + len("\\begin{document}")
+        braces, _, _, environments, _ = _scan_structure(_blank(text[body_start:], _COMMENT))
+        closers = "}" * len(braces) + "".join(f"\n{closer}" for name, closer, _ in reversed(environments) if name != "document")
+        text = text.rstrip() + closers + "\n\\end{document}\n"
+        fixed.append(_issue("truncated", "Closed the document after it stopped early"))
+        if closers:
+            truncated = True
+
+    sections = split_sections(text)
+    if sections:
+        if truncated:
+            truncated = sections[-2].key
+        # Sections come from the shared parse cache; build the new text instead of editing them
+        parts = [sections[0].text]
+        for section in sections[1:-1]:
+            repaired = _escape_specials(section.text, fixed, section.key)
+            parts.append(_close_environments(repaired, fixed, section.key))
+        parts.append(sections[-1].text)
+        text = "".join(parts)
+
+    issues = lint_latex(text)
+    if truncated:
+        issues.append(_issue("truncated", "The section was cut off when the output stopped early", truncated))
+    return text, _report(fixed, issues)
+
+
+def _report(fixed, issues, rerequested=(), restored=()):
+    broken = []
+    for issue in issues:
+        if issue["section"] and issue["section"] not in broken:
+            broken.append(issue["section"])
+    return {
+        "fixed": fixed,
+        "issues": issues,
+        "broken_sections": broken,
+        "rerequested": list(rerequested),
+        "restored": list(restored),
+        "not_latex": False,
+    }
+
+
+def format_issues(issues):
+    """One line per problem, for the prompt that asks the model to repair the broken sections."""
+    return "\n".join(
+        f"- [{issue['section'] or 'document'}]" + (f" line {issue['line']}" if issue["line"] else "") + f": {issue['message']}"
+        for issue in issues
+    )
+
+
+def apply_section_repairs(latex_code, report, rewrites, previous=None):
+    """
+    Puts repaired sections into the document: a section the model re-sent is used once it checks
+    out, otherwise the previous version of that section (from the document before this model call)
+    when it is clean. Sections with neither stay as they are, so the document is never dropped.
+    Returns (latex, report).
+    """
+    sections = split_sections(latex_code)
+    if not sections:
+        return latex_code, report
+    known = TEMPLATE_MACROS | BASE_MACROS | {a or b for a, b in _DEFINED.findall(sections[0].text)}
+    previous_sections = {section.key: section for section in (split_sections(previous) or [])} if previous else {}
+
+    replacements, rerequested, restored = {}, [], []
+    for key in report["broken_sections"]:
+        fixed = []
+        candidate = rewrites.get(key)
+        if candidate is not None:
+            candidate = _close_environments(_escape_specials(candidate, fixed, key), fixed, key)
+            if not lint_section(candidate, key, known):
+                replacements[key] = candidate
+                rerequested.append(key)
+                continue
+        old = previous_sections.get(key)
+        if old is not None and (key == "preamble" or not lint_section(old.text, key, known)):
+            replacements[key] = old.text.strip()
+            restored.append(key)
+        elif key == "preamble" and TEMPLATE_PREAMBLE:
+            replacements[key] = TEMPLATE_PREAMBLE.strip() + "\n\\begin{document}"
+            restored.append(key)
+
+    latex_code = splice_sections(sections, replacements)
+    return latex_code, _report(report["fixed"], lint_latex(latex_code), rerequested, restored)
+
+
+class LatexValidationStats:
+    """Counts how model output fared in the checks: clean, repaired locally, or needing sections re-sent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.clean = 0
+        self.repaired = 0
+        self.sections_rerequested = 0
+        self.sections_restored = 0
+        self.still_broken = 0
+        self.not_latex = 0
+
+    def record(self, report):
+        with self._lock:
+            self.checked += 1
+            if report["not_latex"]:
+                self.not_latex += 1
+                return
+            if not report["fixed"] and not report["issues"] and not report["rerequested"] and not report["restored"]:
+                self.clean += 1
+            if report["fixed"]:
+                self.repaired += 1
+            self.sections_rerequested += len(report["rerequested"])
+            self.sections_restored += len(report["restored"])
+            if report["issues"]:
+                self.still_broken += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "clean": self.clean,
+                "repaired_locally": self.repaired,
+                "sections_rerequested": self.sections_rerequested,
+                "sections_restored": self.sections_restored,
+                "still_broken": self.still_broken,
+                "not_latex": self.not_latex,
+            }
+
+
+# Shared by every route in the process
+latex_validation_stats = LatexValidationStats()
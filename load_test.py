@@ -0,0 +1,227 @@
+"""
+Concurrency vs. memory load test for the sync Flask routes and the async serving mode
+(async_app.py), driven by the offline mock Gemini backend so it needs no network or API key.
+
+    python load_test.py --concurrency 10,50,100,250 --latency-ms 500
+    python load_test.py --modes async --concurrency 500,1000 --route generate_cover_letter
+
+For each mode and concurrency level, that many requests are started at once and the report
+shows wall time, throughput, p50/p95 latency, the peak number of threads, traced Python heap
+peak and resident memory growth. Sync mode runs one thread per in-flight request (what a
+threaded gunicorn worker needs to hold that many generations); async mode runs all of them as
+coroutines on one event loop.
+"""
+import gc
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_genai import MockGenaiClient, LatencyModel, MOCK_LATEX
+from benchmark import RESUME_CONTENT, JOB_DESCRIPTION, SKILLS_DATA, FlaskDriver, percentile, unique
+
+ROUTES = {
+    "generate_resume": lambda: ("/generate_resume", {"data": {
+        "resume_content": unique(RESUME_CONTENT), "job_description": JOB_DESCRIPTION, "company_name": "Acme"}}),
+    "reoptimize_resume": lambda: ("/reoptimize_resume", {"data": {
+        "latex_code": unique(MOCK_LATEX), "job_description": JOB_DESCRIPTION, "feedback": "Add metrics"}}),
+    "reanalyze_skills": lambda: ("/reanalyze_skills", {"data": {
+        "latex_code": unique(MOCK_LATEX), "job_description": JOB_DESCRIPTION}}),
+    "regenerate_skills_latex": lambda: ("/regenerate_skills_latex", {"json": SKILLS_DATA}),
+    "generate_cover_letter": lambda: ("/generate_cover_letter", {"data": {
+        "latex_code": unique(MOCK_LATEX), "company_name": "Acme", "job_description": JOB_DESCRIPTION}}),
+}
+
+
+def rss_kib():
+    """Resident set size of this process in KiB (Linux only; 0 elsewhere)."""
+    try:
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class ResourceMonitor:
+    """Samples thread count and RSS in the background while a load level runs."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss_kib = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss_kib = max(self.peak_rss_kib, rss_kib())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_sync(app_module, route, concurrency, threads):
+    """Fires `concurrency` requests at the Flask app, one worker thread each unless `threads` is set."""
+    driver = FlaskDriver(app_module)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def timed_call(_):
+        path, kwargs = ROUTES[route]()
+        start = time.perf_counter()
+        try:
+            driver.post(path, **kwargs)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=threads or concurrency) as executor:
+        list(executor.map(timed_call, range(concurrency)))
+    return latencies, errors
+
+
+def run_async(async_module, route, concurrency):
+    """Fires `concurrency` requests at the ASGI app from one event loop."""
+    import httpx
+
+    async def main():
+        transport = httpx.ASGITransport(app=async_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            await client.post("/login", data={"passcode": async_module.flask_module.PASSCODE})
+
+            async def timed_call():
+                path, kwargs = ROUTES[route]()
+                start = time.perf_counter()
+                try:
+                    response = await client.post(path, **kwargs)
+                    error = f"{path} returned HTTP {response.status_code}" if response.status_code >= 400 else None
+                except Exception as e:
+                    error = str(e)
+                return time.perf_counter() - start, error
+
+            outcomes = await asyncio.gather(*(timed_call() for _ in range(concurrency)))
+        return [latency for latency, _ in outcomes], [error for _, error in outcomes if error]
+
+    return asyncio.run(main())
+
+
+def measure(run):
+    """Runs one load level and returns its latency, throughput and memory figures."""
+    gc.collect()
+    tracemalloc.reset_peak()
+    heap_before = tracemalloc.get_traced_memory()[0]
+    rss_before = rss_kib()
+    start = time.perf_counter()
+    with ResourceMonitor() as monitor:
+        latencies, errors = run()
+    wall = time.perf_counter() - start
+    heap_peak = tracemalloc.get_traced_memory()[1]
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "peak_threads": monitor.peak_threads,
+        "heap_peak_kib": round((heap_peak - heap_before) / 1024, 1),
+        "rss_growth_kib": max(0, monitor.peak_rss_kib - rss_before),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def print_report(results):
+    header = f"{'mode':<7}{'conc':>6}{'wall s':>9}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'threads':>9}{'heap KiB':>11}{'RSS KiB':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result['mode']:<7}{result['concurrency']:>6}{result['wall_s']:>9}{result['throughput_rps']:>9}"
+              f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['peak_threads']:>9}"
+              f"{result['heap_peak_kib']:>11}{result['rss_growth_kib']:>10}{result['errors']:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare in-flight capacity and memory of the sync and async serving modes.")
+    parser.add_argument("--modes", default="sync,async", help="comma-separated modes to run: sync, async")
+    parser.add_argument("--concurrency", default="10,50,100,250", help="comma-separated numbers of simultaneous requests")
+    parser.add_argument("--route", choices=sorted(ROUTES), default="generate_resume")
+    parser.add_argument("--sync-threads", type=int, default=0,
+                        help="cap the sync worker threads (like gunicorn --threads); 0 means one per request")
+    parser.add_argument("--latency-ms", type=float, default=500, help="mean mock LLM latency")
+    parser.add_argument("--latency-stddev-ms", type=float, default=100, help="mock LLM latency standard deviation")
+    parser.add_argument("--distribution", choices=("fixed", "normal", "lognormal"), default="lognormal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enforce-quota", action="store_true", help="keep the per-key Gemini RPM/TPM limiter (GEMINI_RPM, GEMINI_TPM)")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's logging")
+    parser.add_argument("--json", dest="json_path", help="write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    import app as app_module
+    import async_app
+    import client_pool
+    from llm_cache import response_cache
+    from ratelimit import gemini_rate_limiter
+    logging.getLogger().setLevel(logging.WARNING if args.verbose else logging.CRITICAL)
+
+    mock_client = MockGenaiClient(
+        latency=LatencyModel(args.latency_ms, args.latency_stddev_ms, args.distribution, rng=random.Random(args.seed)),
+        error_rate=0.0,
+        seed=args.seed
+    )
+    app_module.HAS_GENAI = True
+    app_module.default_client = mock_client
+    client_pool.client_pool.factory = lambda api_key: mock_client
+    # Deterministic mock output would turn downstream calls into cache hits
+    response_cache.backend = None
+    if not args.enforce_quota:
+        # Every simulated user shares the mock key; measure the serving modes, not quota waits
+        gemini_rate_limiter.limits = {}
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    tracemalloc.start()
+    results = []
+    for mode in modes:
+        for concurrency in levels:
+            if mode == "sync":
+                result = measure(lambda: run_sync(app_module, args.route, concurrency, args.sync_threads))
+            elif mode == "async":
+                result = measure(lambda: run_async(async_app, args.route, concurrency))
+            else:
+                parser.error(f"unknown mode: {mode}")
+            results.append({"mode": mode, "concurrency": concurrency, **result})
+    tracemalloc.stop()
+
+    print(f"route: /{args.route}, mock LLM latency {args.latency_ms:g} ms")
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump({"config": {key: value for key, value in vars(args).items() if key not in ("json_path", "verbose")},
+                       "results": results}, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
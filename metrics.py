@@ -0,0 +1,159 @@
+import os
+import json
+import bisect
+import threading
+
+# USD per million tokens as (input, output); cached input tokens are billed at CACHED_INPUT_DISCOUNT
+MODEL_PRICING = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+# Override or extend prices without a deploy, e.g. LLM_PRICING_JSON='{"gemini-2.5-flash": [0.3, 2.5]}'
+MODEL_PRICING.update({model: tuple(prices) for model, prices in json.loads(os.environ.get("LLM_PRICING_JSON", "{}")).items()})
+CACHED_INPUT_DISCOUNT = 0.25
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def call_cost(model, prompt_tokens, output_tokens, cached_tokens=0):
+    """Estimated USD cost of one call; unknown models cost 0."""
+    input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * input_price + cached_tokens * input_price * CACHED_INPUT_DISCOUNT + output_tokens * output_price) / 1_000_000
+
+
+def _usage(usage_metadata):
+    if usage_metadata is None:
+        return 0, 0, 0
+    return (
+        getattr(usage_metadata, "prompt_token_count", None) or 0,
+        getattr(usage_metadata, "candidates_token_count", None) or 0,
+        getattr(usage_metadata, "cached_content_token_count", None) or 0,
+    )
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (Prometheus-style estimate)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+class LLMMetrics:
+    """
+    Process-wide counters and latency histograms for every Gemini call, labelled by model and stage.
+    Rendered in the Prometheus text format by /metrics and summarised in the Streamlit admin panel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}          # (model, stage, outcome) -> count
+        self.tokens = {}         # (model, stage, kind) -> count
+        self.cost = {}           # (model, stage) -> USD
+        self.latency = {}        # (model, stage) -> Histogram
+
+    def record(self, model, stage, latency, outcome="ok", usage_metadata=None):
+        prompt_tokens, output_tokens, cached_tokens = _usage(usage_metadata)
+        with self._lock:
+            key = (model, stage, outcome)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            for kind, count in (("prompt", prompt_tokens), ("output", output_tokens), ("cached", cached_tokens)):
+                if count:
+                    token_key = (model, stage, kind)
+                    self.tokens[token_key] = self.tokens.get(token_key, 0) + count
+            if outcome != "cache_hit":
+                self.cost[(model, stage)] = self.cost.get((model, stage), 0.0) + call_cost(model, prompt_tokens, output_tokens, cached_tokens)
+                self.latency.setdefault((model, stage), Histogram()).observe(latency)
+
+    def render_prometheus(self):
+        with self._lock:
+            lines = [
+                "# HELP llm_calls_total Gemini calls by model, stage and outcome.",
+                "# TYPE llm_calls_total counter",
+            ]
+            for (model, stage, outcome), count in sorted(self.calls.items()):
+                lines.append(f"llm_calls_total{{{_labels(model=model, stage=stage, outcome=outcome)}}} {count}")
+            lines += [
+                "# HELP llm_tokens_total Tokens sent (prompt, of which cached) and received (output).",
+                "# TYPE llm_tokens_total counter",
+            ]
+            for (model, stage, kind), count in sorted(self.tokens.items()):
+                lines.append(f"llm_tokens_total{{{_labels(model=model, stage=stage, type=kind)}}} {count}")
+            lines += [
+                "# HELP llm_cost_usd_total Estimated spend from token usage and MODEL_PRICING.",
+                "# TYPE llm_cost_usd_total counter",
+            ]
+            for (model, stage), cost in sorted(self.cost.items()):
+                lines.append(f"llm_cost_usd_total{{{_labels(model=model, stage=stage)}}} {cost:.8f}")
+            lines += [
+                "# HELP llm_request_duration_seconds Latency of Gemini calls that reached the API.",
+                "# TYPE llm_request_duration_seconds histogram",
+            ]
+            for (model, stage), histogram in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else bound
+                    lines.append(f"llm_request_duration_seconds_bucket{{{_labels(model=model, stage=stage, le=le)}}} {cumulative}")
+                lines.append(f"llm_request_duration_seconds_sum{{{_labels(model=model, stage=stage)}}} {histogram.sum:.6f}")
+                lines.append(f"llm_request_duration_seconds_count{{{_labels(model=model, stage=stage)}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One row per (model, stage), most expensive first."""
+        with self._lock:
+            keys = {(model, stage) for model, stage, _ in self.calls}
+            rows = []
+            for model, stage in keys:
+                histogram = self.latency.get((model, stage), Histogram())
+                calls = sum(count for (m, s, _), count in self.calls.items() if (m, s) == (model, stage))
+                rows.append({
+                    "stage": stage,
+                    "model": model,
+                    "calls": calls,
+                    "errors": self.calls.get((model, stage, "error"), 0),
+                    "cache_hits": self.calls.get((model, stage, "cache_hit"), 0),
+                    "prompt_tokens": self.tokens.get((model, stage, "prompt"), 0),
+                    "cached_tokens": self.tokens.get((model, stage, "cached"), 0),
+                    "output_tokens": self.tokens.get((model, stage, "output"), 0),
+                    "cost_usd": round(self.cost.get((model, stage), 0.0), 6),
+                    "avg_latency_s": round(histogram.sum / histogram.count, 3) if histogram.count else 0.0,
+                    "p95_latency_s": histogram.quantile(0.95),
+                })
+        return sorted(rows, key=lambda row: (row["cost_usd"], row["calls"]), reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.tokens.clear()
+            self.cost.clear()
+            self.latency.clear()
+
+
+# Process-wide metrics shared by every route and Streamlit session
+llm_metrics = LLMMetrics()
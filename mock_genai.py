@@ -0,0 +1,302 @@
+import os
+import re
+import json
+import math
+import time
+import asyncio
+import random
+import threading
+
+# Offline Gemini backend, enabled with GENAI_BACKEND=mock (see client_pool.py)
+MOCK_LATENCY_MS = float(os.environ.get("MOCK_GENAI_LATENCY_MS", "200"))
+MOCK_LATENCY_STDDEV_MS = float(os.environ.get("MOCK_GENAI_LATENCY_STDDEV_MS", "50"))
+MOCK_LATENCY_DISTRIBUTION = os.environ.get("MOCK_GENAI_LATENCY_DISTRIBUTION", "lognormal")
+MOCK_ERROR_RATE = float(os.environ.get("MOCK_GENAI_ERROR_RATE", "0"))
+MOCK_STREAM_CHUNKS = int(os.environ.get("MOCK_GENAI_STREAM_CHUNKS", "8"))
+
+# Marker the mock optimizer adds so the mock evaluator can tell optimized resumes apart
+OPTIMIZED_MARKER = "% mock: optimized"
+# Prompt headings that follow the section block in section-level prompts
+SECTION_BLOCK_ENDS = ("\n\nJob Description:", "\n\nUSER FEEDBACK TO ADDRESS:", "\n\nCRITICAL IMPROVEMENT RULES:")
+
+
+def _load_template():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "latex_template.tex")
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+    except OSError:
+        return "\\documentclass{article}\n\\begin{document}\nMock Resume\n\\end{document}\n"
+
+
+MOCK_LATEX = _load_template()
+
+MOCK_SKILL_RECOMMENDATIONS = json.dumps({
+    "profession_type": "Software Engineer",
+    "recommended_skills": [
+        {"category": "Technical Skills", "skills": ["TypeScript"]},
+        {"category": "Cloud & DevOps", "skills": ["Kubernetes", "Terraform"]},
+    ],
+    "recommended_certifications": ["Certified Kubernetes Application Developer"],
+})
+
+MOCK_COVER_LETTER = """Dear Hiring Manager,
+
+I am excited to apply for this position. My experience building reliable software aligns closely with the requirements of the role.
+
+Sincerely,
+Jake Ryan"""
+
+
+def canned_response(contents, base_score=6, optimized_score=8):
+    """Picks a response in the exact format the caller's parser expects, based on the prompt."""
+    prompt = contents if isinstance(contents, str) else str(contents)
+    if "SCORE: [whole number" in prompt:
+        score = optimized_score if OPTIMIZED_MARKER in prompt else base_score
+        return f"SCORE: {score}\nFEEDBACK: Strong technical match. Add more metrics and mirror the job description keywords in the experience section."
+    if "You are a skilled resume analyzer" in prompt:
+        return MOCK_SKILL_RECOMMENDATIONS
+    if "Return ONLY a single integer" in prompt:
+        return "6"
+    if "CANDIDATE INFORMATION:" in prompt:
+        return MOCK_COVER_LETTER
+    sections = _section_block(prompt)
+    if sections:
+        # Section-level rewrites (resume_sections.py): echo the sections back, marked as optimized
+        return sections.replace("\n", "\n" + OPTIMIZED_MARKER + "\n", 1)
+    if "Current LaTeX Resume to Optimize" in prompt:
+        return MOCK_LATEX.replace("\\begin{document}", "\\begin{document}\n" + OPTIMIZED_MARKER, 1)
+    return MOCK_LATEX
+
+
+def _section_block(prompt):
+    """The marker-delimited sections a section-level prompt asks to rewrite, or None."""
+    start = re.search(r"^%%% SECTION: ", prompt, re.MULTILINE)
+    if not start:
+        return None
+    ends = [prompt.find(label, start.start()) for label in SECTION_BLOCK_ENDS]
+    end = min([index for index in ends if index != -1], default=len(prompt))
+    return prompt[start.start():end].strip()
+
+
+def _count_tokens(text):
+    # Gemini averages roughly four characters per token for English text
+    return max(1, len(text) // 4)
+
+
+class MockUsageMetadata:
+    def __init__(self, prompt_token_count, candidates_token_count, cached_content_token_count=0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = cached_content_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class MockResponse:
+    """Mimics the parts of GenerateContentResponse the app reads: .text and .usage_metadata."""
+
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class MockAPIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+# The SDK's error types are imported when a failure is injected, not with the module, so importing
+# the mock (benchmark.py, GENAI_BACKEND=mock) does not pull in the whole SDK
+def _server_error():
+    try:
+        from google.genai.errors import ServerError
+    except ImportError:
+        return MockAPIError(503, "UNAVAILABLE. Mock backend injected failure")
+    return ServerError(503, {"error": {"code": 503, "message": "Mock backend injected failure", "status": "UNAVAILABLE"}})
+
+
+def _client_error(code, message):
+    try:
+        from google.genai.errors import ClientError
+    except ImportError:
+        return MockAPIError(code, message)
+    return ClientError(code, {"error": {"code": code, "message": message, "status": "INVALID_ARGUMENT" if code == 400 else "NOT_FOUND"}})
+
+
+class LatencyModel:
+    """Samples per-call latency in seconds from a fixed, normal or lognormal distribution."""
+
+    def __init__(self, mean_ms=MOCK_LATENCY_MS, stddev_ms=MOCK_LATENCY_STDDEV_MS, distribution=MOCK_LATENCY_DISTRIBUTION, rng=None):
+        self.mean_ms = mean_ms
+        self.stddev_ms = stddev_ms
+        self.distribution = distribution
+        self.rng = rng or random.Random()
+
+    def sample(self):
+        if self.mean_ms <= 0:
+            return 0.0
+        if self.distribution == "fixed" or self.stddev_ms <= 0:
+            value = self.mean_ms
+        elif self.distribution == "normal":
+            value = self.rng.gauss(self.mean_ms, self.stddev_ms)
+        else:
+            # Lognormal with the requested mean/stddev: long right tail like real API latency
+            variance = (self.stddev_ms / self.mean_ms) ** 2
+            sigma = math.sqrt(math.log(1 + variance))
+            mu = math.log(self.mean_ms) - sigma ** 2 / 2
+            value = self.rng.lognormvariate(mu, sigma)
+        return max(0.0, value) / 1000.0
+
+
+def _config_value(config, name):
+    if config is None:
+        return None
+    return config.get(name) if isinstance(config, dict) else getattr(config, name, None)
+
+
+class MockCachedContent:
+    def __init__(self, name, model, contents, display_name=None):
+        self.name = name
+        self.model = model
+        self.contents = contents
+        self.display_name = display_name
+
+
+class MockCaches:
+    """In-memory stand-in for client.caches; counts uploads so prefix reuse can be verified."""
+
+    def __init__(self, min_tokens=0):
+        self.min_tokens = min_tokens
+        self.created = 0
+        self.deleted = 0
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def create(self, model, config=None):
+        contents = _config_value(config, "contents") or []
+        text = "".join(contents if isinstance(contents, list) else [contents])
+        if _count_tokens(text) < self.min_tokens:
+            raise _client_error(400, f"Cached content is too small. total_token_count={_count_tokens(text)}, min_total_token_count={self.min_tokens}")
+        with self._lock:
+            self.created += 1
+            name = f"cachedContents/mock-{self.created}"
+            self._items[name] = MockCachedContent(name, model, text, _config_value(config, "display_name"))
+        return self._items[name]
+
+    def get(self, name, config=None):
+        with self._lock:
+            item = self._items.get(name)
+        if item is None:
+            raise _client_error(404, f"CachedContent not found: {name}")
+        return item
+
+    def delete(self, name, config=None):
+        with self._lock:
+            if self._items.pop(name, None) is not None:
+                self.deleted += 1
+
+
+class MockModels:
+    def __init__(self, client):
+        self._client = client
+
+    def _resolve(self, contents, config):
+        """Returns (full prompt, cached token count), prepending any referenced cached content."""
+        prompt = str(contents)
+        cached_name = _config_value(config, "cached_content")
+        if not cached_name:
+            return prompt, 0
+        cached = self._client.caches.get(cached_name)
+        return cached.contents + prompt, _count_tokens(cached.contents)
+
+    def generate_content(self, model, contents, config=None):
+        prompt, cached_tokens = self._resolve(contents, config)
+        text = self._client._respond(model, prompt)
+        return MockResponse(text, MockUsageMetadata(_count_tokens(prompt), _count_tokens(text), cached_tokens))
+
+    def generate_content_stream(self, model, contents, config=None):
+        prompt, cached_tokens = self._resolve(contents, config)
+        text = self._client._respond(model, prompt)
+        prompt_tokens = _count_tokens(prompt)
+        chunk_size = max(1, -(-len(text) // max(1, self._client.stream_chunks)))
+        for start in range(0, len(text), chunk_size):
+            chunk = text[start:start + chunk_size]
+            # Like the real API, usage counts are running totals for the stream so far
+            yield MockResponse(chunk, MockUsageMetadata(prompt_tokens, _count_tokens(text[:start + chunk_size]), cached_tokens))
+
+
+class MockAsyncModels:
+    """client.aio.models: same canned responses, but waits with asyncio.sleep instead of blocking."""
+
+    def __init__(self, client, models):
+        self._client = client
+        self._models = models
+
+    async def generate_content(self, model, contents, config=None):
+        prompt, cached_tokens = self._models._resolve(contents, config)
+        delay, failed = self._client._begin(model)
+        if delay:
+            await asyncio.sleep(delay)
+        text = self._client._finish(prompt, failed, model)
+        return MockResponse(text, MockUsageMetadata(_count_tokens(prompt), _count_tokens(text), cached_tokens))
+
+
+class MockAsyncClient:
+    def __init__(self, client):
+        self.models = MockAsyncModels(client, client.models)
+
+
+class MockGenaiClient:
+    """
+    Drop-in stand-in for genai.Client that never touches the network. Every call sleeps for a
+    sampled latency, fails with a 503 ServerError at error_rate, and otherwise returns a canned
+    response in the format the caller's parser expects. Call counts are kept for benchmarking.
+    """
+
+    def __init__(self, latency=None, error_rate=MOCK_ERROR_RATE, base_score=6, optimized_score=8,
+                 stream_chunks=MOCK_STREAM_CHUNKS, responder=None, seed=None, min_cache_tokens=0):
+        self.rng = random.Random(seed)
+        self.latency = latency or LatencyModel(rng=self.rng)
+        self.error_rate = error_rate
+        self.base_score = base_score
+        self.optimized_score = optimized_score
+        self.stream_chunks = stream_chunks
+        self.responder = responder
+        self.models = MockModels(self)
+        self.caches = MockCaches(min_cache_tokens)
+        self.aio = MockAsyncClient(self)
+        self.calls = 0
+        self.errors = 0
+        self.calls_by_model = {}
+        self._lock = threading.Lock()
+
+    def _begin(self, model):
+        """Counts the call and returns (latency to wait, whether it should fail)."""
+        delay = self.latency.sample()
+        with self._lock:
+            self.calls += 1
+            self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+            failed = self.error_rate > 0 and self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return delay, failed
+
+    def _finish(self, contents, failed, model=None):
+        if failed:
+            raise _server_error()
+        if self.responder:
+            return self.responder(model, contents)
+        return canned_response(contents, self.base_score, self.optimized_score)
+
+    def _respond(self, model, contents):
+        delay, failed = self._begin(model)
+        if delay:
+            time.sleep(delay)
+        return self._finish(contents, failed, model)
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.calls_by_model = {}
@@ -0,0 +1,128 @@
+import os
+import time
+import asyncio
+import logging
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Shared worker pool used to fan out independent Gemini calls (evaluation, skills analysis, ...)
+PIPELINE_MAX_WORKERS = int(os.environ.get("PIPELINE_MAX_WORKERS", "16"))
+
+# Per-request deadline (seconds) for the whole generation pipeline
+PIPELINE_DEADLINE_SECONDS = float(os.environ.get("PIPELINE_DEADLINE_SECONDS", "120"))
+
+_executor = ThreadPoolExecutor(max_workers=PIPELINE_MAX_WORKERS, thread_name_prefix="pipeline")
+
+
+class Deadline:
+    """Tracks the time left for a single request."""
+
+    def __init__(self, seconds=None):
+        self.seconds = PIPELINE_DEADLINE_SECONDS if seconds is None else seconds
+        self.expires_at = time.monotonic() + self.seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a Gemini call once the request's deadline has passed."""
+
+    def __init__(self):
+        super().__init__("The request deadline passed before this Gemini call could start")
+
+
+# Deadline of the current request; pool threads and asyncio tasks inherit it with the context
+_request_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def bound_by(deadline):
+    """
+    Bounds every Gemini call made in the block, including those on the pipeline pool, by
+    `deadline`: each call gets the time left as its timeout and none starts once it has passed.
+    """
+    token = _request_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _request_deadline.reset(token)
+
+
+def current_deadline():
+    """The deadline set by bound_by for the current request, or None."""
+    return _request_deadline.get()
+
+
+def submit(fn, *args, **kwargs):
+    """Schedules a single call on the shared pipeline pool and returns its future."""
+    return _executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def run_parallel(tasks, deadline=None, defaults=None):
+    """
+    Runs independent tasks concurrently on the shared pool.
+    `tasks` maps a stage name to a (fn, args) tuple. Stages that fail or do not finish
+    before the deadline are replaced by their entry in `defaults` (partial results).
+    Returns (results, incomplete) where `incomplete` lists the stages that fell back.
+    """
+    deadline = deadline or Deadline()
+    defaults = defaults or {}
+
+    # Each stage runs in a copy of the caller's context so request-scoped state (e.g. the
+    # degraded-stage tracker) follows it onto the pool thread
+    futures = {name: _executor.submit(contextvars.copy_context().run, fn, *args) for name, (fn, args) in tasks.items()}
+    wait(futures.values(), timeout=deadline.remaining())
+
+    results = {}
+    incomplete = []
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            logging.warning(f"Pipeline stage '{name}' missed the request deadline")
+            results[name] = defaults.get(name)
+            incomplete.append(name)
+            continue
+        try:
+            results[name] = future.result()
+        except Exception:
+            logging.exception(f"Pipeline stage '{name}' failed")
+            results[name] = defaults.get(name)
+            incomplete.append(name)
+
+    return results, incomplete
+
+
+async def run_parallel_async(tasks, deadline=None, defaults=None):
+    """
+    asyncio counterpart of run_parallel: `tasks` maps a stage name to a coroutine.
+    Stages still running at the deadline are cancelled and replaced by their default.
+    """
+    deadline = deadline or Deadline()
+    defaults = defaults or {}
+
+    pending = {name: asyncio.ensure_future(coroutine) for name, coroutine in tasks.items()}
+    if pending:
+        await asyncio.wait(pending.values(), timeout=deadline.remaining())
+
+    results = {}
+    incomplete = []
+    for name, task in pending.items():
+        if not task.done():
+            task.cancel()
+            logging.warning(f"Pipeline stage '{name}' missed the request deadline")
+            results[name] = defaults.get(name)
+            incomplete.append(name)
+            continue
+        try:
+            results[name] = task.result()
+        except Exception:
+            logging.exception(f"Pipeline stage '{name}' failed")
+            results[name] = defaults.get(name)
+            incomplete.append(name)
+
+    return results, incomplete
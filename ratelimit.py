@@ -0,0 +1,307 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Gemini quota per API key: requests and tokens per minute (0 turns a limit off)
+GEMINI_RPM = float(os.environ.get("GEMINI_RPM", "60"))
+GEMINI_TPM = float(os.environ.get("GEMINI_TPM", "1000000"))
+# Longest a call waits in the queue for quota before it is refused instead
+GEMINI_RATE_MAX_WAIT_SECONDS = float(os.environ.get("GEMINI_RATE_MAX_WAIT_SECONDS", "60"))
+# Tokens held back for the answer until the call reports its real usage
+GEMINI_RATE_OUTPUT_TOKENS = int(os.environ.get("GEMINI_RATE_OUTPUT_TOKENS", "2048"))
+# SQLite file shared by every worker process on the host; empty keeps the buckets per process
+GEMINI_RATE_LIMIT_DB = os.environ.get("GEMINI_RATE_LIMIT_DB", "")
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of queueing a call whose wait for quota would exceed the maximum."""
+
+    def __init__(self, wait, max_wait):
+        super().__init__(f"Gemini quota for this API key is used up; the next slot is {wait:.0f}s away (max wait {max_wait:.0f}s)")
+        self.wait = wait
+        self.max_wait = max_wait
+
+
+def estimate_tokens(text):
+    # Gemini averages roughly four characters per token for English text
+    return max(1, len(text or "") // 4)
+
+
+def key_id(client):
+    """Stable name for the client's API key (a hash, never the key itself)."""
+    api_key = getattr(getattr(client, "_api_client", None), "api_key", None)
+    if api_key:
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    # Clients without a readable key (the mock backend) are limited per instance
+    return f"client-{id(client)}"
+
+
+def _reserve(levels, updated_at, now, limits, costs, max_wait):
+    """
+    Token-bucket reservation shared by both backends. Each bucket refills at limit/60 per second
+    up to limit; a reservation may drive it negative, and the caller then waits until it is back
+    at zero. Reservations are taken in arrival order, so waiting callers form a FIFO queue.
+    Returns (new levels, wait in seconds), or (None, wait) when the wait exceeds max_wait.
+    """
+    new_levels = {}
+    wait = 0.0
+    for name, limit in limits.items():
+        rate = limit / 60.0
+        level = min(limit, levels.get(name, limit) + max(0.0, now - updated_at.get(name, now)) * rate)
+        # A single request larger than the whole bucket only has to wait for a full bucket
+        level -= min(costs[name], limit)
+        new_levels[name] = level
+        if level < 0:
+            wait = max(wait, -level / rate)
+    if wait > max_wait:
+        return None, wait
+    return new_levels, wait
+
+
+class MemoryBuckets:
+    """Buckets kept in this process only."""
+
+    def __init__(self):
+        self._levels = {}
+        self._updated_at = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key, limits, costs, max_wait):
+        with self._lock:
+            now = time.time()
+            levels = self._levels.setdefault(key, {})
+            updated_at = self._updated_at.setdefault(key, {})
+            new_levels, wait = _reserve(levels, updated_at, now, limits, costs, max_wait)
+            if new_levels is not None:
+                levels.update(new_levels)
+                updated_at.update({name: now for name in new_levels})
+            return new_levels is not None, wait
+
+    def adjust(self, key, name, amount, limit):
+        with self._lock:
+            levels = self._levels.get(key)
+            if levels is not None and name in levels:
+                levels[name] = min(limit, levels[name] + amount)
+
+
+class SQLiteBuckets:
+    """Buckets stored in a SQLite file so every worker process on the host draws from the same quota."""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                "key TEXT NOT NULL, name TEXT NOT NULL, level REAL NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (key, name))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def reserve(self, key, limits, costs, max_wait):
+        conn = self._connect()
+        try:
+            # Take the write lock up front so two processes cannot read the same level
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("SELECT name, level, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchall()
+            now = time.time()
+            levels = {name: level for name, level, _ in rows}
+            updated_at = {name: at for name, _, at in rows}
+            new_levels, wait = _reserve(levels, updated_at, now, limits, costs, max_wait)
+            if new_levels is not None:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rate_buckets (key, name, level, updated_at) VALUES (?, ?, ?, ?)",
+                    [(key, name, level, now) for name, level in new_levels.items()]
+                )
+            conn.execute("COMMIT")
+            return new_levels is not None, wait
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def adjust(self, key, name, amount, limit):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE rate_buckets SET level = MIN(?, level + ?) WHERE key = ? AND name = ?",
+                (limit, amount, key, name)
+            )
+
+
+class KeyState:
+    def __init__(self):
+        self.waiting = 0
+        self.queued = 0
+        self.refused = 0
+        self.wait_seconds = 0.0
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets per API key. A call that would go over
+    the quota is queued (it sleeps until its reservation is due) rather than sent and failed
+    with a 429; if its wait would exceed max_wait it is refused with RateLimitExceeded.
+    Token cost is estimated from the prompt plus output_tokens and corrected from the
+    response's usage metadata once the call returns.
+    """
+
+    def __init__(self, rpm=GEMINI_RPM, tpm=GEMINI_TPM, max_wait=GEMINI_RATE_MAX_WAIT_SECONDS,
+                 output_tokens=GEMINI_RATE_OUTPUT_TOKENS, buckets=None):
+        self.limits = {name: limit for name, limit in (("requests", rpm), ("tokens", tpm)) if limit > 0}
+        self.max_wait = max_wait
+        self.output_tokens = output_tokens
+        self.buckets = buckets or MemoryBuckets()
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def _state(self, key):
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None:
+                state = self._keys[key] = KeyState()
+            return state
+
+    def reserve(self, client, prompt):
+        """Takes quota for one call and returns (key, estimated tokens, seconds to wait first)."""
+        key = key_id(client)
+        tokens = estimate_tokens(prompt) + self.output_tokens
+        if not self.limits:
+            return key, tokens, 0.0
+        state = self._state(key)
+        ok, wait = self.buckets.reserve(key, self.limits, {"requests": 1, "tokens": tokens}, self.max_wait)
+        if not ok:
+            with self._lock:
+                state.refused += 1
+            logging.warning(f"Refusing Gemini call: quota wait of {wait:.1f}s exceeds {self.max_wait:.0f}s")
+            raise RateLimitExceeded(wait, self.max_wait)
+        if wait > 0:
+            with self._lock:
+                state.queued += 1
+                state.wait_seconds += wait
+                depth = state.waiting + 1
+            _report_wait(wait, depth)
+        return key, tokens, wait
+
+    def _begin_wait(self, key):
+        with self._lock:
+            self._keys[key].waiting += 1
+
+    def _end_wait(self, key):
+        with self._lock:
+            self._keys[key].waiting -= 1
+
+    def settle(self, key, estimated_tokens, response):
+        """Gives back (or takes) the difference between the estimated and the reported token usage."""
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "total_token_count", None)
+        if "tokens" in self.limits and isinstance(actual, int):
+            self.buckets.adjust(key, "tokens", estimated_tokens - actual, self.limits["tokens"])
+
+    def call(self, client, prompt, fn):
+        """Waits for quota, then runs fn() (one Gemini request)."""
+        key, tokens, wait = self.reserve(client, prompt)
+        if wait > 0:
+            self._begin_wait(key)
+            try:
+                time.sleep(wait)
+            finally:
+                self._end_wait(key)
+        response = fn()
+        self.settle(key, tokens, response)
+        return response
+
+    async def acall(self, client, prompt, fn):
+        """
+        Async counterpart of call: the queue wait uses asyncio.sleep, and SQLite buckets are
+        updated on a worker thread so the event loop is not blocked on the file lock.
+        """
+        offload = isinstance(self.buckets, SQLiteBuckets)
+        if offload:
+            key, tokens, wait = await asyncio.to_thread(self.reserve, client, prompt)
+        else:
+            key, tokens, wait = self.reserve(client, prompt)
+        if wait > 0:
+            self._begin_wait(key)
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._end_wait(key)
+        response = await fn()
+        if offload:
+            await asyncio.to_thread(self.settle, key, tokens, response)
+        else:
+            self.settle(key, tokens, response)
+        return response
+
+    def stream(self, client, prompt, open_stream):
+        """Waits for quota, then yields from open_stream(); the last chunk's usage settles the tokens."""
+        key, tokens, wait = self.reserve(client, prompt)
+        if wait > 0:
+            self._begin_wait(key)
+            try:
+                time.sleep(wait)
+            finally:
+                self._end_wait(key)
+        last = None
+        for last in open_stream():
+            yield last
+        self.settle(key, tokens, last)
+
+    def stats(self):
+        with self._lock:
+            keys = {key: vars(state).copy() for key, state in self._keys.items()}
+        return {
+            "limits_per_minute": dict(self.limits),
+            "max_wait_seconds": self.max_wait,
+            "shared": isinstance(self.buckets, SQLiteBuckets),
+            "queue_depth": sum(state["waiting"] for state in keys.values()),
+            "queued": sum(state["queued"] for state in keys.values()),
+            "refused": sum(state["refused"] for state in keys.values()),
+            "keys": {key: {**state, "wait_seconds": round(state["wait_seconds"], 2)} for key, state in keys.items()},
+        }
+
+
+# Process-wide limiter shared by every Gemini helper (and, with GEMINI_RATE_LIMIT_DB, every worker)
+gemini_rate_limiter = RateLimiter(buckets=SQLiteBuckets(GEMINI_RATE_LIMIT_DB) if GEMINI_RATE_LIMIT_DB else None)
+
+# Queue waits of the current request
+_quota_report = contextvars.ContextVar("quota_report", default=None)
+
+
+@contextmanager
+def track_quota_wait(on_wait=None):
+    """
+    Collects how long the block's Gemini calls queued for quota and the deepest queue they
+    joined. on_wait(seconds, queue_depth) is called as each wait starts, e.g. to report progress.
+    """
+    report = {"waited_seconds": 0.0, "queue_depth": 0}
+    token = _quota_report.set((report, on_wait))
+    try:
+        yield report
+    finally:
+        _quota_report.reset(token)
+        report["waited_seconds"] = round(report["waited_seconds"], 2)
+
+
+def _report_wait(wait, depth):
+    current = _quota_report.get()
+    if current is None:
+        return
+    report, on_wait = current
+    report["waited_seconds"] += wait
+    report["queue_depth"] = max(report["queue_depth"], depth)
+    if on_wait:
+        try:
+            on_wait(wait, depth)
+        except Exception:
+            logging.exception("Quota wait callback failed")
@@ -0,0 +1,278 @@
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+import contextvars
+from contextlib import contextmanager
+from pipeline import current_deadline
+
+# Retries for transient Gemini failures (429 rate limits, 5xx, timeouts), with jittered exponential backoff
+GEMINI_MAX_RETRIES = int(os.environ.get("GEMINI_MAX_RETRIES", "3"))
+GEMINI_BACKOFF_BASE_SECONDS = float(os.environ.get("GEMINI_BACKOFF_BASE_SECONDS", "1"))
+GEMINI_BACKOFF_MAX_SECONDS = float(os.environ.get("GEMINI_BACKOFF_MAX_SECONDS", "20"))
+# Consecutive transient failures on one API key before its calls fail fast, and how long they do
+GEMINI_BREAKER_FAILURES = int(os.environ.get("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_RESET_SECONDS = float(os.environ.get("GEMINI_BREAKER_RESET_SECONDS", "30"))
+
+RATE_LIMITED = "rate_limited"
+UNAVAILABLE = "unavailable"
+CLIENT_ERROR = "client_error"
+UNKNOWN = "unknown"
+RETRYABLE = (RATE_LIMITED, UNAVAILABLE)
+
+try:
+    import httpx
+    _TRANSPORT_ERRORS = (TimeoutError, ConnectionError, httpx.TransportError)
+except ImportError:
+    _TRANSPORT_ERRORS = (TimeoutError, ConnectionError)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Gemini while the API key's circuit breaker is open."""
+
+    def __init__(self, retry_in):
+        super().__init__(f"Gemini is unavailable for this API key; retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+def classify_error(error):
+    """Sorts an exception from a Gemini call into rate_limited, unavailable, client_error or unknown."""
+    code = getattr(error, "code", None)
+    if code == 429:
+        return RATE_LIMITED
+    if code in (500, 502, 503, 504) or isinstance(error, _TRANSPORT_ERRORS):
+        return UNAVAILABLE
+    if isinstance(code, int) and 400 <= code < 500:
+        return CLIENT_ERROR
+    return UNKNOWN
+
+
+def server_retry_delay(error):
+    """Seconds the API asked us to wait (RetryInfo.retryDelay on a 429), or None."""
+    details = getattr(error, "details", None)
+    if not isinstance(details, dict):
+        return None
+    for item in details.get("error", {}).get("details", []) or []:
+        match = re.fullmatch(r"(\d+(?:\.\d+)?)s", str(item.get("retryDelay", "")))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class CircuitBreaker:
+    """
+    closed -> open after failure_threshold consecutive transient failures; open -> half-open after
+    reset_seconds, when a single probe call is let through. The probe closes the breaker on success
+    and re-opens it on failure.
+    """
+
+    def __init__(self, failure_threshold=GEMINI_BREAKER_FAILURES, reset_seconds=GEMINI_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = None
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "open":
+                if now - self.opened_at < self.reset_seconds:
+                    return False
+                self.state = "half_open"
+                self.probe_started_at = None
+            if self.state == "half_open":
+                # A probe that never reported back (e.g. an abandoned stream) frees the slot after reset_seconds
+                if self.probe_started_at is not None and now - self.probe_started_at < self.reset_seconds:
+                    return False
+                self.probe_started_at = now
+            return True
+
+    def retry_in(self):
+        with self._lock:
+            return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.probe_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                    logging.warning(f"Gemini circuit breaker opened after {self.failures} consecutive failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.probe_started_at = None
+
+
+class Resilience:
+    """
+    Retry and circuit-breaker policy for Gemini calls, with one breaker per API key (per pooled
+    client). Only transient errors are retried and counted against the breaker; client errors
+    such as a bad request or an invalid key are raised straight away.
+    """
+
+    def __init__(self, max_retries=GEMINI_MAX_RETRIES, backoff_base=GEMINI_BACKOFF_BASE_SECONDS,
+                 backoff_max=GEMINI_BACKOFF_MAX_SECONDS, failure_threshold=GEMINI_BREAKER_FAILURES,
+                 reset_seconds=GEMINI_BREAKER_RESET_SECONDS, rng=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.rng = rng or random.Random()
+        self._breakers = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.fast_failures = 0
+
+    def breaker(self, client):
+        if client is None:
+            return CircuitBreaker(self.failure_threshold, self.reset_seconds)
+        with self._lock:
+            breaker = self._breakers.get(client)
+            if breaker is None:
+                breaker = self._breakers[client] = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+            return breaker
+
+    def backoff(self, attempt, error=None):
+        """Full-jitter exponential backoff, stretched to any delay the server asked for."""
+        delay = self.rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        requested = server_retry_delay(error) if error is not None else None
+        if requested:
+            delay = max(delay, min(requested, self.backoff_max))
+        return delay
+
+    def _before_call(self, breaker):
+        if not breaker.allow():
+            with self._lock:
+                self.fast_failures += 1
+            raise CircuitOpenError(breaker.retry_in())
+
+    def _after_failure(self, breaker, error, attempt, started=False):
+        """Updates the breaker and returns the delay before retrying, or None to give up."""
+        kind = classify_error(error)
+        if kind in RETRYABLE:
+            breaker.record_failure()
+        elif kind == CLIENT_ERROR:
+            # The API answered, so the key is reachable even though this request was rejected
+            breaker.record_success()
+        if started or kind not in RETRYABLE or attempt >= self.max_retries or breaker.state == "open":
+            return None
+        delay = self.backoff(attempt, error)
+        deadline = current_deadline()
+        if deadline is not None and delay >= deadline.remaining():
+            # The retry could not start before the request deadline
+            return None
+        with self._lock:
+            self.retries += 1
+        logging.warning(f"Gemini call failed ({kind}: {error}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def call(self, client, fn):
+        """Runs fn() (one Gemini request) with retries, behind the client's circuit breaker."""
+        breaker = self.breaker(client)
+        attempt = 0
+        while True:
+            self._before_call(breaker)
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._after_failure(breaker, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    async def acall(self, client, fn):
+        """Async counterpart of call: fn() returns an awaitable and backoff uses asyncio.sleep."""
+        breaker = self.breaker(client)
+        attempt = 0
+        while True:
+            self._before_call(breaker)
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._after_failure(breaker, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    def stream(self, client, open_stream):
+        """Yields from open_stream(); retries only while nothing has been yielded to the caller."""
+        breaker = self.breaker(client)
+        attempt = 0
+        while True:
+            self._before_call(breaker)
+            started = False
+            try:
+                for item in open_stream():
+                    started = True
+                    yield item
+            except Exception as e:
+                delay = self._after_failure(breaker, e, attempt, started)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return
+
+    def stats(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+            retries, fast_failures = self.retries, self.fast_failures
+        return {
+            "retries": retries,
+            "fast_failures": fast_failures,
+            "breakers": len(breakers),
+            "open_breakers": sum(1 for breaker in breakers if breaker.state == "open"),
+            "times_opened": sum(breaker.times_opened for breaker in breakers),
+        }
+
+
+# Process-wide policy shared by every Gemini helper
+gemini_resilience = Resilience()
+
+# Stages of the current request that fell back instead of getting a real Gemini answer
+_degraded_stages = contextvars.ContextVar("degraded_stages", default=None)
+
+
+@contextmanager
+def track_degraded():
+    """
+    Collects the stages that degraded while the block runs. Work submitted through pipeline.py
+    and asyncio tasks inherit the tracker, so parallel stages are recorded too.
+    """
+    stages = []
+    token = _degraded_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _degraded_stages.reset(token)
+
+
+def mark_degraded(stage):
+    stages = _degraded_stages.get()
+    if stages is not None and stage not in stages:
+        stages.append(stage)
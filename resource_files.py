@@ -0,0 +1,52 @@
+"""
+Resource files read once and read again only when their modification time changes. Streamlit
+re-executes its script on every rerun; loading its stylesheet through this module turns each of
+those reads into a stat() while still picking up an edited file without a restart. The prompts
+and template are read once at import by resume_steps.py, which every app shares.
+"""
+import os
+import re
+import logging
+import threading
+
+_files = {}
+_lock = threading.Lock()
+
+
+def load_text(file_path, kind="resource"):
+    """Contents of file_path, cached until its mtime changes; an empty string if it cannot be read."""
+    try:
+        mtime = os.stat(file_path).st_mtime_ns
+        cached = _files.get(file_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(file_path, 'r', encoding='utf-8') as file:
+            text = file.read()
+    except Exception as e:
+        logging.error(f"Error loading {kind} file {file_path}: {str(e)}")
+        return ""
+    with _lock:
+        _files[file_path] = (mtime, text)
+    if cached:
+        logging.info(f"Reloaded modified {kind} file {file_path}")
+    return text
+
+
+def compact_css(css):
+    """Drops comments and insignificant whitespace from a stylesheet."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return re.sub(r"\s+", " ", css).strip()
+
+
+_styles = {}
+
+
+def load_style_block(file_path):
+    """The stylesheet as a compacted <style> block for st.markdown, rebuilt only when the file changes."""
+    css = load_text(file_path, "stylesheet")
+    block = _styles.get(file_path)
+    if block is None or block[0] is not css:
+        block = (css, f"<style>{compact_css(css)}</style>")
+        _styles[file_path] = block
+    return block[1]
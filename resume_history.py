@@ -0,0 +1,157 @@
+import os
+import json
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Resume versions one Streamlit session keeps; the least recently used is dropped past this
+RESUME_HISTORY_MAX_VERSIONS = int(os.environ.get("RESUME_HISTORY_MAX_VERSIONS", "20"))
+# zlib level for stored text (1 fastest - 9 smallest)
+RESUME_HISTORY_COMPRESSION_LEVEL = int(os.environ.get("RESUME_HISTORY_COMPRESSION_LEVEL", "6"))
+
+# Record fields stored compressed; everything else (score, skills analysis, flags) is kept as is
+COMPRESSED_FIELDS = ("latex_code", "cover_letter", "job_description", "feedback")
+# A delta is kept only while it is at most this fraction of the text compressed on its own;
+# past that the text becomes a new keyframe, so later versions are not coded against a stale base
+KEYFRAME_RATIO = 0.5
+
+
+class ResumeHistory:
+    """
+    Per-session resume versions, used like the plain dict it replaces (history[resume_id] = record,
+    history[resume_id], resume_id in history). Reads return a fresh copy of the record, so a change
+    is kept only once the record is stored again.
+
+    Each text field is stored as a zlib keyframe (the text compressed on its own, shared by every
+    version with identical text) or as a delta: the text compressed with its predecessor's keyframe
+    as the preset dictionary. The predecessor is the earlier version of the same resume when one is
+    re-optimized, otherwise the version saved last. A successive version then costs only the lines
+    that changed, and reading any version takes at most two decompressions.
+    """
+
+    def __init__(self, max_versions=RESUME_HISTORY_MAX_VERSIONS, level=RESUME_HISTORY_COMPRESSION_LEVEL):
+        self.max_versions = max_versions
+        self.level = level
+        self._versions = OrderedDict()
+        # sha256 of a text -> [compressed text, number of field encodings that refer to it]
+        self._keyframes = {}
+        self._last_saved = None
+        self._lock = threading.Lock()
+        self.saves = 0
+        self.evictions = 0
+        self.duplicate_fields = 0
+
+    def __setitem__(self, resume_id, record):
+        with self._lock:
+            predecessor = self._versions.get(resume_id) or self._versions.get(self._last_saved)
+            fields = {}
+            raw_bytes = 0
+            for name in COMPRESSED_FIELDS:
+                text = record.get(name)
+                if isinstance(text, str):
+                    data = text.encode("utf-8")
+                    raw_bytes += len(data)
+                    fields[name] = self._encode(data, predecessor["fields"].get(name) if predecessor else None)
+            rest = {key: value for key, value in record.items() if key not in fields}
+            version = {
+                "fields": fields,
+                "rest": rest,
+                "raw_bytes": raw_bytes,
+                "rest_bytes": len(json.dumps(rest, default=str)),
+            }
+
+            replaced = self._versions.pop(resume_id, None)
+            if replaced:
+                self._release(replaced)
+            self._versions[resume_id] = version
+            self._last_saved = resume_id
+            self.saves += 1
+            while len(self._versions) > self.max_versions:
+                _, evicted = self._versions.popitem(last=False)
+                self._release(evicted)
+                self.evictions += 1
+
+    def __getitem__(self, resume_id):
+        with self._lock:
+            version = self._versions[resume_id]
+            self._versions.move_to_end(resume_id)
+            record = dict(version["rest"])
+            for name, encoding in version["fields"].items():
+                record[name] = self._decode(encoding).decode("utf-8")
+            return record
+
+    def get(self, resume_id, default=None):
+        try:
+            return self[resume_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, resume_id):
+        return resume_id in self._versions
+
+    def __len__(self):
+        return len(self._versions)
+
+    def _encode(self, data, previous):
+        """
+        Encoding of one field: ("keyframe", digest) or ("delta", digest of the base keyframe,
+        delta bytes, digest of the text). previous is the predecessor's encoding of the same field.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if previous and previous[-1] == digest:
+            # Unchanged since the predecessor: share its encoding
+            self.duplicate_fields += 1
+            self._keyframes[previous[1]][1] += 1
+            return previous
+        if digest in self._keyframes:
+            self.duplicate_fields += 1
+            self._keyframes[digest][1] += 1
+            return ("keyframe", digest)
+
+        compressed = zlib.compress(data, self.level)
+        if previous:
+            base = previous[1]
+            compressor = zlib.compressobj(self.level, zdict=zlib.decompress(self._keyframes[base][0]))
+            delta = compressor.compress(data) + compressor.flush()
+            if len(delta) <= len(compressed) * KEYFRAME_RATIO:
+                self._keyframes[base][1] += 1
+                return ("delta", base, delta, digest)
+        self._keyframes[digest] = [compressed, 1]
+        return ("keyframe", digest)
+
+    def _decode(self, encoding):
+        base = zlib.decompress(self._keyframes[encoding[1]][0])
+        if encoding[0] == "keyframe":
+            return base
+        decompressor = zlib.decompressobj(zdict=base)
+        return decompressor.decompress(encoding[2]) + decompressor.flush()
+
+    def _release(self, version):
+        for encoding in version["fields"].values():
+            keyframe = self._keyframes[encoding[1]]
+            keyframe[1] -= 1
+            if keyframe[1] <= 0:
+                del self._keyframes[encoding[1]]
+
+    def memory_report(self):
+        """Sizes of what this session holds: the records as plain text against what is actually stored."""
+        with self._lock:
+            raw = sum(version["raw_bytes"] + version["rest_bytes"] for version in self._versions.values())
+            deltas = [encoding for version in self._versions.values() for encoding in version["fields"].values()
+                      if encoding[0] == "delta"]
+            stored = (sum(len(keyframe[0]) for keyframe in self._keyframes.values())
+                      + sum(len(encoding[2]) for encoding in deltas)
+                      + sum(version["rest_bytes"] for version in self._versions.values()))
+            return {
+                "versions": len(self._versions),
+                "max_versions": self.max_versions,
+                "raw_bytes": raw,
+                "stored_bytes": stored,
+                "compression_ratio": round(raw / stored, 2) if stored else None,
+                "keyframes": len(self._keyframes),
+                "deltas": len(deltas),
+                "duplicate_fields": self.duplicate_fields,
+                "saves": self.saves,
+                "evictions": self.evictions,
+            }
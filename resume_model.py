@@ -0,0 +1,262 @@
+import os
+import re
+import hashlib
+from bisect import bisect_right
+from ats_scorer import STANDARD_SECTIONS, EMAIL, PHONE, MONTH_DATE, NUMERIC_DATE, YEAR_RANGE, latex_to_text
+from llm_cache import MemoryCache, ResponseCache
+
+# Parsed resumes kept in memory, keyed by a hash of the LaTeX (a document never changes under its hash)
+RESUME_PARSE_CACHE_SIZE = int(os.environ.get("RESUME_PARSE_CACHE_SIZE", "256"))
+
+# A \section together with the comment banner lines directly above it
+_SECTION_START = re.compile(r"^(?:[ \t]*%.*\n)*[ \t]*\\section\*?\{([^}]*)\}", re.MULTILINE)
+_COMMENT = re.compile(r"(?<!\\)%.*")
+# Template macros the parser reads, with the number of brace arguments each takes
+MACRO_ARGS = {
+    "section": 1,
+    "section*": 1,
+    "resumeSubheading": 4,
+    "resumeSubSubheading": 2,
+    "resumeProjectHeading": 2,
+    "resumeItem": 1,
+    "resumeSubItem": 2,
+    "href": 2,
+    "textbf": 1,
+}
+_MACRO = re.compile(r"\\(" + "|".join(re.escape(name) for name in sorted(MACRO_ARGS, key=len, reverse=True)) + r")(?![a-zA-Z])")
+_NAME_SIZE = re.compile(r"\\(Huge|huge|LARGE|Large)\b")
+
+
+def strip_code_fence(text):
+    """Strips whitespace and a Markdown code fence (```latex ... ```) around model output."""
+    text = (text or "").strip()
+    text = re.sub(r"^```[a-zA-Z]*", "", text)
+    text = re.sub(r"```$", "", text)
+    return text.strip()
+
+
+class Section:
+    """One contiguous slice of a resume; joining every section's text gives back the document."""
+
+    def __init__(self, key, title, text):
+        self.key = key
+        self.title = title
+        self.text = text
+
+
+def section_key(title):
+    """Maps a \\section title to a stable key: a standard name (ats_scorer.STANDARD_SECTIONS) or a slug."""
+    title = latex_to_text(title).lower()
+    for key, titles in STANDARD_SECTIONS.items():
+        if title in titles:
+            return key
+    for key in ("skills", "experience", "projects", "education", "summary", "certifications"):
+        if key.rstrip("s") in title:
+            return key
+    return re.sub(r"[^a-z0-9]+", "_", title).strip("_") or "section"
+
+
+def _split(latex_code):
+    """Preamble, heading, one Section per \\section and the closing, or None for other shapes."""
+    begin = latex_code.find("\\begin{document}")
+    end = latex_code.rfind("\\end{document}")
+    if begin == -1 or end < begin:
+        return None
+    body_start = begin + len("\\begin{document}")
+    matches = list(_SECTION_START.finditer(latex_code, body_start, end))
+    if not matches:
+        return None
+
+    sections = [
+        Section("preamble", "", latex_code[:body_start]),
+        Section("heading", "", latex_code[body_start:matches[0].start()]),
+    ]
+    seen = {}
+    for i, match in enumerate(matches):
+        key = section_key(match.group(1))
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] > 1:
+            key = f"{key}_{seen[key]}"
+        stop = matches[i + 1].start() if i + 1 < len(matches) else end
+        sections.append(Section(key, match.group(1), latex_code[match.start():stop]))
+    sections.append(Section("closing", "", latex_code[end:]))
+    return sections
+
+
+def _read_args(text, pos, count):
+    """Reads up to `count` brace-delimited arguments starting at pos; returns (args, end position)."""
+    args = []
+    while len(args) < count:
+        start = pos
+        while start < len(text) and text[start].isspace():
+            start += 1
+        if start >= len(text) or text[start] != "{":
+            break
+        depth = 1
+        i = start + 1
+        while i < len(text) and depth:
+            if text[i] == "{" and text[i - 1] != "\\":
+                depth += 1
+            elif text[i] == "}" and text[i - 1] != "\\":
+                depth -= 1
+            i += 1
+        args.append(text[start + 1:i - 1])
+        pos = i
+    return args, pos
+
+
+def _skill_items(text, pos):
+    """Comma-separated items after a skills heading, written {: a, b} or : a, b \\\\; None if absent."""
+    items, end = _read_args(text, pos, 1)
+    if items and items[0].lstrip().startswith(":"):
+        raw = items[0].lstrip()[1:]
+    else:
+        line = re.match(r"[ \t]*:([^\n]*)", text[pos:])
+        if not line:
+            return None
+        raw = line.group(1).split("\\\\")[0]
+    # Commas inside parentheses belong to the item: "SQL (Postgres, MySQL)"
+    parts = re.split(r",(?![^()]*\))", raw)
+    return [item for item in (latex_to_text(part).strip(" .;") for part in parts) if item]
+
+
+def _is_date(text):
+    return bool(MONTH_DATE.search(text) or NUMERIC_DATE.search(text) or YEAR_RANGE.search(text)
+                or re.search(r"\b(19|20)\d{2}\b|\bPresent\b", text))
+
+
+class ResumeDocument:
+    """
+    Indexed model of a LaTeX resume built in one pass over the document: contact details from
+    the heading block, the sections (the same slices resume_sections splices), the
+    \\resumeSubheading / \\resumeProjectHeading entries with their bullets, and their dates.
+    Documents come from parse_resume and are shared between callers, so treat them as read-only.
+    """
+
+    def __init__(self, latex_code, digest=None):
+        self.latex = latex_code
+        self.digest = digest or hashlib.sha256(latex_code.encode("utf-8")).hexdigest()
+        self.sections = _split(latex_code) or []
+        self.section_index = {section.key: section for section in self.sections}
+        # Everything after the preamble: what a prompt that reads the content (not the macros) needs
+        self.content = "".join(section.text for section in self.sections[1:]).strip() if self.sections else latex_code
+        self.text = latex_to_text(_COMMENT.sub("", self.content))
+        self.contact = {"name": None, "email": None, "phone": None, "links": []}
+        self.entries = []
+        self.entries_by_section = {}
+        self.bullets = []
+        self.bullets_by_section = {}
+        self.dates = []
+        # Skills section lines such as \textbf{Languages}{: Java, Python}, by their heading
+        self.skill_lines = {}
+        self._parse()
+
+    def section(self, key):
+        """The Section stored under key ("experience", "skills", "heading", ...) or None."""
+        return self.section_index.get(key)
+
+    def section_text(self, key):
+        """Plain text of a section, or an empty string when the resume has no such section."""
+        section = self.section_index.get(key)
+        return latex_to_text(_COMMENT.sub("", section.text)) if section else ""
+
+    def _parse(self):
+        # Blank out comments without moving anything, so offsets still line up with the sections
+        text = _COMMENT.sub(lambda match: " " * len(match.group()), self.latex)
+        begin = text.find("\\begin{document}")
+        end = text.rfind("\\end{document}")
+        body_start = begin + len("\\begin{document}") if begin != -1 else 0
+        body_end = end if end > body_start else len(text)
+
+        starts, keys = [], []
+        offset = 0
+        for section in self.sections:
+            starts.append(offset)
+            keys.append(section.key)
+            offset += len(section.text)
+        heading_end = starts[2] if len(self.sections) > 2 else body_end
+
+        entry = None
+        pos = body_start
+        while True:
+            match = _MACRO.search(text, pos, body_end)
+            if not match:
+                break
+            macro = match.group(1)
+            args, pos = _read_args(text, match.end(), MACRO_ARGS[macro])
+            if len(args) < MACRO_ARGS[macro]:
+                pos = max(pos, match.end())
+                continue
+            key = keys[bisect_right(starts, match.start()) - 1] if keys else "document"
+
+            if macro in ("section", "section*"):
+                entry = None
+            elif macro == "textbf":
+                if match.start() < heading_end and self.contact["name"] is None and _NAME_SIZE.search(args[0]):
+                    self.contact["name"] = latex_to_text(args[0]) or None
+                if key.startswith("skills") or key.startswith("certifications"):
+                    items = _skill_items(text, pos)
+                    if items is not None:
+                        self.skill_lines[latex_to_text(args[0]).rstrip(":").strip()] = items
+                # Keep scanning inside the argument; it may hold an \href
+                pos = match.end()
+            elif macro == "href":
+                if match.start() < heading_end:
+                    target = args[0].strip()
+                    if target.lower().startswith("mailto:"):
+                        self.contact["email"] = self.contact["email"] or target[len("mailto:"):].strip()
+                    else:
+                        self.contact["links"].append(target)
+            elif macro == "resumeSubheading":
+                # Experience puts the date second ({Title}{Dates}{Company}{Location}), education fourth
+                first, second, third, fourth = (arg.strip() for arg in args)
+                date, location = (second, fourth) if _is_date(latex_to_text(second)) or not _is_date(latex_to_text(fourth)) else (fourth, second)
+                entry = self._add_entry(key, "subheading", first, third, date, location)
+            elif macro in ("resumeSubSubheading", "resumeProjectHeading"):
+                entry = self._add_entry(key, "project" if macro == "resumeProjectHeading" else "subheading", args[0], "", args[1], "")
+            else:
+                latex = args[0] if macro == "resumeItem" else f"{args[0]}: {args[1]}"
+                bullet = {"section": key, "text": latex_to_text(latex), "latex": latex.strip()}
+                if bullet["text"]:
+                    self.bullets.append(bullet)
+                    self.bullets_by_section.setdefault(key, []).append(bullet)
+                    if entry is not None and entry["section"] == key:
+                        entry["bullets"].append(bullet)
+
+        heading = latex_to_text(text[body_start:heading_end])
+        if self.contact["email"] is None:
+            email = EMAIL.search(heading)
+            self.contact["email"] = email.group() if email else None
+        self.contact["phone"] = next(
+            (phone.strip() for phone in PHONE.findall(heading) if len(re.sub(r"\D", "", phone)) >= 10), None)
+
+    def _add_entry(self, key, kind, title, subtitle, date, location):
+        entry = {
+            "section": key,
+            "kind": kind,
+            "title": latex_to_text(title),
+            "subtitle": latex_to_text(subtitle),
+            "date": latex_to_text(date),
+            "location": latex_to_text(location),
+            "bullets": [],
+        }
+        self.entries.append(entry)
+        self.entries_by_section.setdefault(key, []).append(entry)
+        if entry["date"]:
+            self.dates.append(entry["date"])
+        return entry
+
+
+# Shared by every stage; counters show how often a document was parsed only once
+resume_parse_cache = ResponseCache(MemoryCache(max_entries=RESUME_PARSE_CACHE_SIZE, ttl=float("inf")))
+
+
+def parse_resume(latex_code):
+    """Parsed ResumeDocument for the LaTeX, reused for as long as the same text comes back."""
+    latex_code = latex_code or ""
+    digest = hashlib.sha256(latex_code.encode("utf-8")).hexdigest()
+    document = resume_parse_cache.get(digest)
+    if document is None:
+        document = ResumeDocument(latex_code, digest)
+        resume_parse_cache.set(digest, document)
+    return document
@@ -0,0 +1,126 @@
+import re
+from ats_scorer import latex_to_text
+from resume_model import parse_resume, strip_code_fence
+
+# Sections with at most this evaluator score (out of 10) are rewritten in full, whatever the feedback says
+LOW_SCORE = 5
+
+# Rewritten when the feedback does not point at anything more specific
+DEFAULT_SECTIONS = ("summary", "experience", "projects", "skills")
+
+# Words in evaluator or user feedback that point at a section
+SECTION_KEYWORDS = {
+    "heading": ("contact", "header", "heading", "email", "phone", "linkedin", "github"),
+    "summary": ("summary", "objective", "profile"),
+    "education": ("education", "coursework", "degree", "gpa", "university"),
+    "experience": ("experience", "bullet", "accomplishment", "achievement", "metric", "quantif",
+                   "action verb", "impact", "responsibilit", "role"),
+    "projects": ("project",),
+    "skills": ("skill", "keyword", "certification", "technolog", "tool"),
+    "certifications": ("certification",),
+}
+
+# ATS rubric categories (ats_scorer.ATS_CATEGORIES) and the sections that earn their points
+ATS_CATEGORY_SECTIONS = {
+    "contact_info": ("heading",),
+    "quantified_impact": ("experience", "projects"),
+    "action_verbs": ("summary", "experience", "projects"),
+    "filler_words": ("summary", "experience", "projects"),
+    "length": ("summary", "experience", "projects"),
+    "bullet_quality": ("experience", "projects"),
+    "skills": ("skills", "certifications"),
+    "education": ("education",),
+}
+# Categories about the document as a whole; losing points there needs a full rewrite
+DOCUMENT_WIDE_CATEGORIES = ("sections", "formatting", "parsing")
+
+SECTION_MARKER = "%%% SECTION: "
+_MARKER_LINE = re.compile(r"^%%% SECTION: (\S+)[ \t]*$", re.MULTILINE)
+_DOCUMENT_LEVEL = re.compile(r"\\documentclass|\\begin\{document\}|\\end\{document\}")
+
+
+def _base_key(key):
+    # A repeated section (a second Experience) is numbered: experience_2
+    return re.sub(r"_\d+$", "", key)
+
+
+def split_sections(latex_code):
+    """
+    Splits a resume into preamble (up to and including \\begin{document}), heading, one entry
+    per \\section and the closing \\end{document}. Returns None when the document does not have
+    that shape, in which case callers fall back to whole-document processing. The split comes
+    from the shared parse (resume_model), so a resume is only split once.
+    """
+    return list(parse_resume(latex_code).sections) or None
+
+
+def select_sections(sections, feedback="", score=None, ats_report=None):
+    """
+    Keys of the sections worth rewriting, in document order, or None when only a whole-document
+    rewrite can help. Sections are picked from the feedback text, from the ATS categories that
+    lost points, and all default sections are added when the score is low.
+    """
+    available = [section.key for section in sections if section.key not in ("preamble", "closing")]
+    flagged = set()
+
+    if ats_report:
+        lost = [category for category, item in ats_report.get("breakdown", {}).items() if item["score"] < item["max"]]
+        if any(category in DOCUMENT_WIDE_CATEGORIES for category in lost):
+            return None
+        for category in lost:
+            flagged.update(ATS_CATEGORY_SECTIONS.get(category, ()))
+
+    text = (feedback or "").lower()
+    for section in sections:
+        words = SECTION_KEYWORDS.get(_base_key(section.key))
+        if words is None:
+            words = (latex_to_text(section.title).lower(),) if section.title else ()
+        if any(word and word in text for word in words):
+            flagged.add(section.key)
+
+    if (score is not None and score <= LOW_SCORE) or not flagged:
+        flagged.update(DEFAULT_SECTIONS)
+
+    keys = [key for key in available if key in flagged or _base_key(key) in flagged]
+    return keys or None
+
+
+def format_sections(sections, keys):
+    """Renders the chosen sections for a prompt, each introduced by a marker line."""
+    return "\n\n".join(
+        f"{SECTION_MARKER}{section.key}\n{section.text.strip()}"
+        for section in sections if section.key in keys
+    )
+
+
+def parse_section_rewrites(response_text, keys):
+    """
+    Reads marker-delimited sections back from a model response. Unknown keys, empty sections and
+    anything that tries to restructure the document (\\documentclass, \\begin/\\end{document}, a
+    heading that grew a \\section, a section that lost its \\section) are dropped.
+    """
+    parts = _MARKER_LINE.split(strip_code_fence(response_text))
+    rewrites = {}
+    for i in range(1, len(parts) - 1, 2):
+        key, body = parts[i], parts[i + 1].strip()
+        if key not in keys or not body or _DOCUMENT_LEVEL.search(body):
+            continue
+        has_section = re.search(r"\\section\*?\{", body) is not None
+        if has_section != (key != "heading"):
+            continue
+        rewrites[key] = body
+    return rewrites
+
+
+def splice_sections(sections, rewrites):
+    """Joins the document back together, swapping in rewritten sections with their original spacing."""
+    parts = []
+    for section in sections:
+        rewritten = rewrites.get(section.key)
+        if rewritten is None:
+            parts.append(section.text)
+            continue
+        leading = section.text[:len(section.text) - len(section.text.lstrip())]
+        trailing = section.text[len(section.text.rstrip()):]
+        parts.append(leading + rewritten + trailing)
+    return "".join(parts)
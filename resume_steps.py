@@ -0,0 +1,659 @@
+"""
+The Gemini steps of the resume pipeline, shared by the Flask views (app.py), the async routes
+(async_app.py) and the Streamlit app: prompt building, response parsing and what to accept, retry
+or fall back to.
+
+A step is a generator. It yields the keyword arguments of each Gemini call it needs, is sent the
+response back (a failed call is thrown in at the yield instead), and returns its result. Only the
+call itself differs between the serving modes: run_step makes it with gemini_client.generate_content
+and arun_step with agenerate_content. Blocking work such as a SQLite write is yielded as a Blocking
+call, which arun_step runs on a worker thread. Every step takes `ai`, whether a Gemini client is
+available; without one it returns its local fallback and makes no call. The drivers take an
+optional stage -> model map for apps that answer some stages with a different Gemini model.
+"""
+import asyncio
+import logging
+from gemini_client import generate_content, agenerate_content
+from resilience import mark_degraded, track_degraded
+from skills import SKILLS_RECOMMENDATION_CONFIG, local_skills_analysis, merge_recommendations, render_skills_latex
+from resume_model import parse_resume, strip_code_fence
+from keyword_coverage import TARGET_SCORE, coverage_report, coverage_calibration, local_feedback, feedback_with_uncovered
+from resume_sections import split_sections, select_sections, format_sections, parse_section_rewrites, splice_sections
+from resource_files import load_text
+from latex_lint import TEMPLATE_CUSTOM_MACROS, repair_latex, apply_section_repairs, format_issues, latex_validation_stats
+
+# Load the default LaTeX template
+def load_template(file_path):
+    return load_text(file_path, "template")
+
+
+# Load prompt template files
+def load_prompt(file_path):
+    return load_text(file_path, "prompt")
+
+
+# Default LaTeX resume template
+DEFAULT_LATEX_TEMPLATE = load_template("templates/latex_template.tex")
+RESUME_FORMATTER_PROMPT = load_prompt("prompts/resume_formatter.txt")
+RESUME_EVALUATOR_PROMPT = load_prompt("prompts/resume_evaluator.txt")
+RESUME_OPTIMIZER_PROMPT = load_prompt("prompts/resume_optimizer.txt")
+RESUME_SECTION_OPTIMIZER_PROMPT = load_prompt("prompts/resume_section_optimizer.txt")
+COVER_LETTER_PROMPT = load_prompt("prompts/cover_letter_generator.txt")
+LATEX_SECTION_REPAIR_PROMPT = load_prompt("prompts/latex_section_repair.txt")
+
+# Static prompt prefixes (instructions + template), registered once as Gemini cached content
+FORMATTER_PROMPT_PREFIX = f"""
+{RESUME_FORMATTER_PROMPT}
+
+LaTeX Template
+{DEFAULT_LATEX_TEMPLATE}
+"""
+
+OPTIMIZER_PROMPT_PREFIX = f"""
+{RESUME_OPTIMIZER_PROMPT}
+
+LaTeX Template Reference:
+Use the provided LaTeX template for formatting but do not return the template itself. Instead, apply its formatting principles to the user's resume content.
+
+LaTeX Template:
+{DEFAULT_LATEX_TEMPLATE}
+"""
+
+SECTION_OPTIMIZER_PROMPT_PREFIX = f"""
+{RESUME_SECTION_OPTIMIZER_PROMPT}
+
+LaTeX Template (reference for the macros; do not return it):
+{DEFAULT_LATEX_TEMPLATE}
+"""
+
+LATEX_REPAIR_PROMPT_PREFIX = f"""
+{LATEX_SECTION_REPAIR_PROMPT}
+
+Macros the template defines:
+{", ".join(TEMPLATE_CUSTOM_MACROS)}
+"""
+
+
+def mock_process_resume(resume_content, job_description=None):
+    """
+    A mock implementation for when the Gemini API is not available.
+    This function does basic parsing of the resume content and populates the template.
+    If a job description is provided, a tailored note is inserted.
+    """
+    # Very basic parsing - extract name if it appears to be in the first line
+    lines = resume_content.strip().split('\n')
+    name = lines[0] if lines else "Your Name"
+    
+    # Try to extract contact info from first few lines
+    contact_info = {
+        "email": "your.email@example.com",
+        "phone": "Your Phone",
+        "linkedin": "Your LinkedIn",
+        "github": "Your GitHub",
+        "location": "Your Location",
+        "website": "Your Website"
+    }
+    
+    for i in range(min(5, len(lines))):
+        line = lines[i].lower()
+        if '@' in line and '.' in line:
+            contact_info["email"] = lines[i].split()[-1]
+        elif any(word in line for word in ["phone", "tel", "cell"]):
+            contact_info["phone"] = lines[i].split(":")[-1].strip() if ":" in lines[i] else lines[i]
+    
+    # Create a basic LaTeX document with the extracted information
+    latex_code = DEFAULT_LATEX_TEMPLATE.replace("Jake Ryan", name)
+    latex_code = latex_code.replace("jake@su.edu", contact_info["email"])
+    latex_code = latex_code.replace("123-456-7890", contact_info["phone"])
+    
+    # If a job description is provided, insert a tailored note after \begin{document}
+    if job_description:
+        tailored_line = f"\\textit{{Tailored for: {job_description[:100]}{'...' if len(job_description) > 100 else ''}}}\\\\"
+        latex_code = latex_code.replace(r"\begin{document}", r"\begin{document}" + "\n" + tailored_line)
+    
+    return latex_code
+
+
+def build_formatter_prompt(resume_content, job_description=None):
+    """Builds the request-specific part of the formatter prompt; it follows FORMATTER_PROMPT_PREFIX."""
+    # If a job description is provided, include it in the prompt
+    job_desc_section = f"\nHere is the job description to tailor the resume:\n```\n{job_description}\n```" if job_description else ""
+    
+    return f"""
+
+User Resume Content to Format:
+```
+{resume_content}
+```
+
+{job_desc_section}
+
+
+  
+    """
+
+
+def build_section_repair_prompt(sections_text, issues_text):
+    """Builds the request-specific part of the LaTeX repair prompt; it follows LATEX_REPAIR_PROMPT_PREFIX."""
+    return f"""
+LaTeX Problems Found:
+{issues_text}
+
+Sections to Repair:
+{sections_text}
+"""
+
+
+def build_evaluator_prompt(latex_code, job_description):
+    """Builds the prompt that scores how well a LaTeX resume matches the job description."""
+    # The preamble only defines macros; the evaluator needs the content
+    latex_code = parse_resume(latex_code).content
+    return f"""
+{RESUME_EVALUATOR_PROMPT}
+
+JOB DESCRIPTION:
+```
+{job_description}
+```
+LATEX RESUME:
+```
+{latex_code}
+```
+"""
+
+
+def parse_evaluation(response_text):
+    """
+    Extracts (score, feedback) from a SCORE:/FEEDBACK: evaluator response. A missing or unreadable
+    score is None and marks the evaluator as degraded, rather than standing in a made-up number.
+    """
+    response_text = response_text.strip()
+    
+    # Extract score
+    score = None
+    score_line = next((line for line in response_text.split('\n') if line.startswith('SCORE:')), None)
+    if score_line:
+        try:
+            score = int(score_line.split('SCORE:')[1].strip())
+            # Ensure score is within range 1-10
+            score = max(1, min(10, score))
+        except (ValueError, IndexError):
+            pass
+    if score is None:
+        logging.warning("Evaluator response has no readable SCORE line; the score is unknown")
+        mark_degraded("evaluator")
+    
+    # Extract feedback
+    feedback_parts = response_text.split('FEEDBACK:')
+    if len(feedback_parts) > 1:
+        feedback = feedback_parts[1].strip()
+    else:
+        feedback = "No specific feedback available."
+    
+    return score, feedback
+
+
+def build_optimizer_prompt(latex_code, job_description, feedback):
+    """Builds the request-specific part of the optimizer prompt; it follows OPTIMIZER_PROMPT_PREFIX."""
+    return f"""
+Current LaTeX Resume to Optimize:
+{latex_code}
+
+Job Description:
+{job_description}
+
+Previous Evaluation Feedback (If Available):
+{feedback}
+"""
+
+
+def build_section_optimizer_prompt(sections_text, job_description, feedback):
+    """Builds the request-specific part of the section optimizer prompt; it follows SECTION_OPTIMIZER_PROMPT_PREFIX."""
+    return f"""
+Sections to Rewrite:
+{sections_text}
+
+Job Description:
+{job_description}
+
+Previous Evaluation Feedback (If Available):
+{feedback}
+"""
+
+
+def build_cover_letter_prompt(latex_code, company_name, job_description):
+    """Builds the cover letter prompt, pulling the candidate's name and email out of the LaTeX."""
+    resume = parse_resume(latex_code)
+    name = resume.contact["name"] or "Your Name"
+    email = resume.contact["email"] or "your.email@example.com"
+    
+    return f"""
+{COVER_LETTER_PROMPT}
+
+CANDIDATE INFORMATION:
+- Name: {name}
+- Email: {email}
+- Company: {company_name}
+
+RESUME CONTENT (LaTeX format):
+{resume.content}
+
+JOB DESCRIPTION:
+{job_description}
+"""
+
+
+def clean_cover_letter(text):
+    """Strips whitespace and stray code fences from a generated cover letter."""
+    return strip_code_fence(text)
+
+
+def build_skills_analysis_prompt(latex_code, job_description, skills_data):
+    """
+    Builds the prompt for skill and certification recommendations as JSON. Current and missing
+    skills were already found locally (skills.local_skills_analysis), so only those lists and the
+    candidate's roles are sent, not the resume.
+    """
+    roles = "; ".join(
+        f"{entry['title']} ({entry['subtitle']})" if entry["subtitle"] else entry["title"]
+        for entry in parse_resume(latex_code).entries
+    )
+    return f"""
+You are a skilled resume analyzer. The candidate's current skills and the job description's skills missing from the resume have already been extracted. Recommend what the candidate should add.
+
+Respond with a JSON object containing:
+- profession_type: the profession type
+- recommended_skills: skills worth adding, grouped as {{"category": ..., "skills": [...]}} (e.g. Technical Skills, Security Skills, and other categories relevant to the profession). Include the missing skills the candidate's background plausibly supports and other skills standard for the role.
+- recommended_certifications: certifications recommended by the job requirements and industry standards
+
+IMPORTANT INSTRUCTIONS:
+1. Do not recommend a skill or certification the candidate already has
+2. Group skills logically by category
+
+Current Skills: {", ".join(skills_data["current_skills"]) or "None found"}
+Current Certifications: {", ".join(skills_data["current_certifications"]) or "None"}
+Missing Skills (in the job description, not in the resume): {", ".join(skills_data["missing_skills"]) or "None"}
+Candidate Roles: {roles or "Not listed"}
+
+Job Description:
+{job_description}
+"""
+
+
+def skills_error_result(message):
+    """Skills analysis result shown when the analysis could not run."""
+    return {
+        "current_skills": [message],
+        "missing_skills": [],
+        "recommended_skills": [],
+        "current_skills_by_category": {},
+        "recommended_skills_by_category": {},
+        "latex_skills_section": ""
+    }
+
+
+def skills_result(skills_data, latex_skills_section):
+    return {
+        "profession_type": skills_data["profession_type"],
+        "current_skills": skills_data["current_skills"],
+        "missing_skills": skills_data["missing_skills"],
+        "recommended_skills": skills_data["recommended_skills"],
+        "current_skills_by_category": skills_data["current_skills_by_category"],
+        "recommended_skills_by_category": skills_data["recommended_skills_by_category"],
+        "current_certifications": skills_data["current_certifications"],
+        "recommended_certifications": skills_data["recommended_certifications"],
+        "latex_skills_section": latex_skills_section
+    }
+
+
+class Blocking:
+    """A blocking call (e.g. SQLite) yielded by a step; the async driver keeps it off the event loop."""
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+
+def _with_model(call, models):
+    """The call with the model `models` maps its stage to, if any."""
+    model = models.get(call.get("stage")) if models else None
+    return {**call, "model": model} if model else call
+
+
+def run_step(client, step, models=None):
+    """Drives a step with the sync Gemini client and returns its result."""
+    try:
+        call = next(step)
+        while True:
+            try:
+                if isinstance(call, Blocking):
+                    response = call.fn(*call.args)
+                else:
+                    response = generate_content(client, **_with_model(call, models))
+            except Exception as e:
+                call = step.throw(e)
+            else:
+                call = step.send(response)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun_step(client, step, models=None):
+    """Drives a step with the async Gemini client (client.aio) and returns its result."""
+    try:
+        call = next(step)
+        while True:
+            try:
+                if isinstance(call, Blocking):
+                    response = await asyncio.to_thread(call.fn, *call.args)
+                else:
+                    response = await agenerate_content(client, **_with_model(call, models))
+            except Exception as e:
+                call = step.throw(e)
+            else:
+                call = step.send(response)
+    except StopIteration as stop:
+        return stop.value
+
+
+def format_resume(ai, resume_content, job_description=None):
+    """Formats the resume content into LaTeX; the mock formatter stands in without Gemini."""
+    if not ai:
+        logging.warning("Using mock implementation for resume processing")
+        return mock_process_resume(resume_content, job_description)
+
+    try:
+        logging.info("Sending resume content to Gemini AI for processing...")
+        response = yield dict(
+            model="gemini-2.0-flash",
+            contents=build_formatter_prompt(resume_content, job_description),
+            prefix=FORMATTER_PROMPT_PREFIX,
+            prefix_name="resume_formatter",
+            stage="formatter"
+        )
+        if not response.text:
+            logging.error("Error: No response from Gemini AI.")
+            return DEFAULT_LATEX_TEMPLATE
+        logging.info("Gemini AI processing completed.")
+        return (yield from validate_latex(ai, response.text)) or DEFAULT_LATEX_TEMPLATE
+    except Exception:
+        logging.exception("Exception occurred while processing with Gemini AI")
+        return DEFAULT_LATEX_TEMPLATE
+
+
+def repair_sections(ai, latex_code, report):
+    """Asks Gemini to fix only the sections the local checks could not; returns {key: section LaTeX}."""
+    sections = split_sections(latex_code)
+    keys = [key for key in report["broken_sections"] if key not in ("preamble", "closing")]
+    if not sections or not keys or not ai:
+        return {}
+
+    try:
+        logging.info(f"Re-requesting broken LaTeX sections: {', '.join(keys)}")
+        issues = [issue for issue in report["issues"] if issue["section"] in keys]
+        response = yield dict(
+            model="gemini-2.0-flash",
+            contents=build_section_repair_prompt(format_sections(sections, keys), format_issues(issues)),
+            prefix=LATEX_REPAIR_PROMPT_PREFIX,
+            prefix_name="latex_section_repair",
+            stage="latex-repair"
+        )
+        return parse_section_rewrites(response.text, keys) if response.text else {}
+    except Exception:
+        logging.exception("Exception occurred while re-requesting broken LaTeX sections")
+        return {}
+
+
+def validate_latex(ai, latex_code, previous=None):
+    """
+    Checks LaTeX from Gemini before it is accepted (latex_lint.py): fixes what has one sensible fix,
+    re-requests only the sections that are still broken, and falls back section by section to
+    `previous`, the document the call started from. Returns None when the output holds no LaTeX at all.
+    """
+    latex_code, report = repair_latex(latex_code)
+    if report["not_latex"]:
+        latex_validation_stats.record(report)
+        logging.error("Gemini AI returned no LaTeX document")
+        return None
+
+    if report["broken_sections"]:
+        rewrites = yield from repair_sections(ai, latex_code, report)
+        latex_code, report = apply_section_repairs(latex_code, report, rewrites, previous)
+
+    latex_validation_stats.record(report)
+    if report["fixed"]:
+        logging.info(f"Repaired generated LaTeX locally: {'; '.join(issue['message'] for issue in report['fixed'])}")
+    if report["issues"]:
+        logging.warning(f"Generated LaTeX still has problems:\n{format_issues(report['issues'])}")
+    return latex_code
+
+
+def evaluate_match(ai, latex_code, job_description):
+    """
+    Scores how well the resume matches the job description out of 10, with feedback. The score is
+    None when Gemini could not answer or its answer had no readable score.
+    """
+    if not ai:
+        # A mock score when Gemini is not available
+        return 6, "Resume appears well-tailored to the job description."
+
+    try:
+        logging.info("Evaluating resume-job match...")
+        response = yield dict(
+            model="gemini-2.0-flash",
+            contents=build_evaluator_prompt(latex_code, job_description),
+            stage="evaluator"
+        )
+        if not response.text:
+            logging.error("Error: No response from Gemini AI for evaluation.")
+            return None, "Unable to evaluate resume-job match."
+        score, feedback = parse_evaluation(response.text)
+        logging.info(f"Resume evaluation completed. Score: {score}/10")
+        return score, feedback
+    except Exception as e:
+        logging.exception("Exception occurred during resume evaluation")
+        return None, f"Unable to evaluate resume-job match due to an error: {str(e)}"
+
+
+def evaluate_coverage(ai, latex_code, job_description):
+    """
+    Scores keyword coverage locally first and only asks Gemini when the calibrated threshold
+    says the match is not clearly good; every Gemini score is recorded with its coverage to keep
+    the calibration current. Returns (score, feedback, coverage report).
+    """
+    coverage = coverage_report(parse_resume(latex_code).text, job_description)
+    coverage["evaluation_skipped"] = False
+    if not ai:
+        score, feedback = yield from evaluate_match(ai, latex_code, job_description)
+        return score, feedback, coverage
+
+    estimate = yield Blocking(coverage_calibration.skip_estimate, coverage["coverage"])
+    if estimate is not None:
+        logging.info(f"Keyword coverage {coverage['coverage']:.0%} is above the calibrated threshold; skipping the Gemini evaluation")
+        coverage["evaluation_skipped"] = True
+        return estimate, local_feedback(coverage, estimate), coverage
+
+    score, feedback = yield from evaluate_match(ai, latex_code, job_description)
+    yield Blocking(coverage_calibration.record, coverage["coverage"], score)
+    return score, feedback, coverage
+
+
+def needs_optimization(score, incomplete, deadline):
+    """
+    Whether the first draft is rewritten: only for a known score below TARGET_SCORE, from an
+    evaluation that finished, with time left. A draft that needed it but cannot have it is listed
+    in `incomplete` as "optimization".
+    """
+    if score is not None and score < TARGET_SCORE and "evaluation" not in incomplete and not deadline.expired():
+        return True
+    if score is None or score < TARGET_SCORE:
+        incomplete.append("optimization")
+    return False
+
+
+def rewrite_sections(ai, latex_code, job_description, feedback, use_cache=True, score=None):
+    """
+    Rewrites only the sections the feedback (or a low score) points at and splices them back into
+    the document, so the model does not re-emit the preamble and untouched sections.
+    Returns None when the resume cannot be split or the response held no usable section.
+    """
+    sections = split_sections(latex_code)
+    keys = select_sections(sections, feedback, score) if sections else None
+    if not keys:
+        return None
+
+    logging.info(f"Optimizing resume sections: {', '.join(keys)}")
+    response = yield dict(
+        model="gemini-2.0-flash",
+        contents=build_section_optimizer_prompt(format_sections(sections, keys), job_description, feedback),
+        use_cache=use_cache,
+        prefix=SECTION_OPTIMIZER_PROMPT_PREFIX,
+        prefix_name="resume_section_optimizer",
+        stage="optimizer"
+    )
+    rewrites = parse_section_rewrites(response.text, keys) if response.text else {}
+    if not rewrites:
+        logging.warning("Section optimization returned no usable sections")
+        return None
+    return (yield from validate_latex(ai, splice_sections(sections, rewrites), previous=latex_code))
+
+
+def optimize_resume(ai, latex_code, job_description, feedback, use_cache=True, score=None):
+    """
+    Optimizes the resume LaTeX to better match the job description based on feedback. Only the
+    flagged sections are rewritten; the whole document is sent only when that fails. Returns the
+    original LaTeX when Gemini is unavailable or fails.
+    """
+    if not ai:
+        return latex_code
+
+    try:
+        logging.info("Optimizing resume for better job alignment...")
+        optimized_latex = yield from rewrite_sections(ai, latex_code, job_description, feedback, use_cache, score)
+        if optimized_latex:
+            logging.info("Resume optimization completed.")
+            return optimized_latex
+
+        response = yield dict(
+            model="gemini-2.0-flash",
+            contents=build_optimizer_prompt(latex_code, job_description, feedback),
+            use_cache=use_cache,
+            prefix=OPTIMIZER_PROMPT_PREFIX,
+            prefix_name="resume_optimizer",
+            stage="optimizer"
+        )
+        if not response.text:
+            logging.error("Error: No response from Gemini AI for optimization.")
+            return latex_code
+        optimized_latex = (yield from validate_latex(ai, response.text, previous=latex_code)) or latex_code
+        logging.info("Resume optimization completed.")
+        return optimized_latex
+    except Exception:
+        logging.exception("Exception occurred during resume optimization")
+        return latex_code
+
+
+def write_cover_letter(ai, latex_code, company_name, job_description, use_cache=True):
+    """Writes a cover letter from the resume, company name and job description; errors come back as the text."""
+    if not ai:
+        return "AI processing not available. Please set your API key."
+
+    try:
+        logging.info("Generating cover letter with Gemini AI...")
+        response = yield dict(
+            model="gemini-2.0-flash",
+            contents=build_cover_letter_prompt(latex_code, company_name, job_description),
+            use_cache=use_cache,
+            stage="cover-letter"
+        )
+        if response and response.text:
+            logging.info("Cover letter generated successfully")
+            return clean_cover_letter(response.text)
+        logging.error("No response received from Gemini AI for cover letter generation")
+        return "Error: Unable to generate cover letter. Please try again."
+    except Exception as e:
+        logging.exception("Exception occurred while generating cover letter with Gemini AI")
+        return f"Error generating cover letter: {str(e)}"
+
+
+def recommend_skills(ai, latex_code, job_description, use_cache=True, max_categories=None, max_skills_per_category=None):
+    """
+    Current and missing skills come from the local taxonomy; Gemini (one JSON-schema call) only
+    adds the recommendations, and without it the local analysis is returned on its own. The
+    max_* limits cap the rendered LaTeX skills section.
+    """
+    def result(skills_data):
+        return skills_result(skills_data, render_skills_latex(skills_data, max_categories, max_skills_per_category))
+
+    try:
+        skills_data = local_skills_analysis(latex_code, job_description)
+    except Exception as e:
+        logging.exception("Error in analyze_skills")
+        return skills_error_result("Error analyzing skills: " + str(e))
+
+    if not ai:
+        return result(skills_data)
+
+    try:
+        logging.info("Requesting skill recommendations...")
+        analysis_response = yield dict(
+            model="gemini-2.0-flash",
+            contents=build_skills_analysis_prompt(latex_code, job_description, skills_data),
+            use_cache=use_cache,
+            stage="skills-analysis",
+            config=SKILLS_RECOMMENDATION_CONFIG
+        )
+        if analysis_response.text:
+            skills_data = merge_recommendations(skills_data, analysis_response.text)
+        else:
+            logging.error("No response from Gemini AI for skill recommendations")
+    except Exception:
+        logging.exception("Error getting skill recommendations; returning the local analysis")
+    return result(skills_data)
+
+
+def tailor_resume(ai, resume_content, job):
+    """
+    The batch pipeline for one job ({"company_name", "job_description"}): format, evaluate, and
+    optimize once when the score is below TARGET_SCORE. Returns the job's batch result.
+    """
+    job_description = job["job_description"]
+    with track_degraded() as degraded:
+        latex_code = yield from format_resume(ai, resume_content, job_description)
+        score, feedback, coverage = yield from evaluate_coverage(ai, latex_code, job_description)
+
+        optimized = False
+        if score is not None and score < TARGET_SCORE:
+            latex_code = yield from optimize_resume(ai, latex_code, job_description, feedback_with_uncovered(feedback, coverage), score=score)
+            optimized = True
+            score, feedback, coverage = yield from evaluate_coverage(ai, latex_code, job_description)
+
+    return {
+        "company_name": job.get("company_name", ""),
+        "latex_code": latex_code,
+        "score": score,
+        "feedback": feedback,
+        "optimized": optimized,
+        "degraded": bool(degraded)
+    }
+
+
+# Stand-ins for the evaluation and skills analysis when they miss the request deadline
+EVALUATE_AND_ANALYZE_DEFAULTS = {
+    "evaluation": (None, "Unable to evaluate resume-job match before the request deadline.", None),
+    "skills_analysis": None,
+}
+
+
+def evaluate_and_analyze_results(results):
+    """Unpacks the evaluate + analyze stage results into (score, feedback, skills_analysis, coverage)."""
+    score, feedback, coverage = results["evaluation"]
+    skills_analysis = results["skills_analysis"]
+    if not skills_analysis:
+        skills_analysis = {
+            "current_skills": ["Error analyzing skills"],
+            "missing_skills": [],
+            "recommended_skills": [],
+            "latex_skills_section": ""
+        }
+    return score, feedback, skills_analysis, coverage
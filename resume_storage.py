@@ -0,0 +1,59 @@
+import os
+import json
+import asyncio
+import logging
+from llm_cache import MemoryCache, SQLiteCache
+
+# Generated resume storage configuration
+RESUME_STORE_BACKEND = os.environ.get("RESUME_STORE_BACKEND", "memory")  # "memory" or "sqlite"
+RESUME_STORE_MAX_ENTRIES = int(os.environ.get("RESUME_STORE_MAX_ENTRIES", "500"))
+RESUME_STORE_TTL_SECONDS = float(os.environ.get("RESUME_STORE_TTL_SECONDS", "86400"))
+RESUME_STORE_PATH = os.environ.get("RESUME_STORE_PATH", "resume_store.sqlite3")
+
+# Request fields that are never written to the store, even if a caller passes them
+UNPERSISTED_FIELDS = ("api_key",)
+
+
+class ResumeStore:
+    """
+    Bounded store for generated resumes. Entries are evicted once the store holds more than
+    max_entries records or a record is older than ttl seconds. The sqlite backend is shared
+    by every worker on the host, so /download_latex works regardless of which worker answers.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def save(self, resume_id, record):
+        record = {key: value for key, value in record.items() if key not in UNPERSISTED_FIELDS}
+        self.backend.set(resume_id, json.dumps(record))
+
+    async def asave(self, resume_id, record):
+        """Async counterpart of save: the sqlite backend is written on a worker thread, off the event loop."""
+        if isinstance(self.backend, SQLiteCache):
+            return await asyncio.to_thread(self.save, resume_id, record)
+        return self.save(resume_id, record)
+
+    def get(self, resume_id):
+        try:
+            raw = self.backend.get(resume_id)
+        except Exception:
+            logging.exception("Error reading from the resume store")
+            return None
+        return json.loads(raw) if raw else None
+
+    def __contains__(self, resume_id):
+        return self.get(resume_id) is not None
+
+    def __len__(self):
+        return len(self.backend)
+
+
+def create_resume_store(name=RESUME_STORE_BACKEND):
+    if name == "sqlite":
+        backend = SQLiteCache(path=RESUME_STORE_PATH, max_entries=RESUME_STORE_MAX_ENTRIES, ttl=RESUME_STORE_TTL_SECONDS)
+    else:
+        if name != "memory":
+            logging.warning(f"Unknown RESUME_STORE_BACKEND '{name}', using in-memory storage")
+        backend = MemoryCache(max_entries=RESUME_STORE_MAX_ENTRIES, ttl=RESUME_STORE_TTL_SECONDS)
+    return ResumeStore(backend)
@@ -0,0 +1,269 @@
+"""
+Bundled skill and certification dictionary, compiled into one Aho-Corasick automaton so a
+resume and a job description are scanned for every alias in a single pass.
+"""
+import re
+from collections import deque
+
+# Category -> canonical name -> aliases (the canonical name always matches too). Aliases are
+# case-insensitive unless listed in CASE_SENSITIVE_ALIASES.
+SKILL_TAXONOMY = {
+    "Programming Languages": {
+        "Python": ["python3"],
+        "JavaScript": ["js", "ecmascript", "es6"],
+        "TypeScript": [],
+        "Java": [],
+        "C": [],
+        "C++": ["cpp"],
+        "C#": ["csharp", "c sharp"],
+        "Go": ["golang"],
+        "Rust": [],
+        "Ruby": [],
+        "PHP": [],
+        "Kotlin": [],
+        "Swift": [],
+        "Scala": [],
+        "R": [],
+        "MATLAB": [],
+        "SQL": [],
+        "Bash": ["shell scripting", "shell script", "sh scripting"],
+        "PowerShell": [],
+        "HTML": ["html5"],
+        "CSS": ["css3"],
+    },
+    "Frameworks & Libraries": {
+        "React": ["react.js", "reactjs"],
+        "React Native": [],
+        "Angular": ["angularjs", "angular.js"],
+        "Vue.js": ["vue", "vuejs"],
+        "Next.js": ["nextjs"],
+        "Node.js": ["nodejs", "node js"],
+        "Express.js": ["express", "expressjs"],
+        "Django": [],
+        "Flask": [],
+        "FastAPI": [],
+        "Spring Boot": ["springboot", "spring"],
+        "Ruby on Rails": ["rails", "ror"],
+        "Laravel": [],
+        ".NET": ["dotnet", "dot net", ".net core", "asp.net", "asp.net core"],
+        "jQuery": [],
+        "Tailwind CSS": ["tailwind"],
+        "Bootstrap": [],
+        "GraphQL": [],
+        "REST APIs": ["rest", "restful", "rest api", "restful api", "restful apis"],
+        "gRPC": [],
+    },
+    "Databases": {
+        "PostgreSQL": ["postgres", "psql"],
+        "MySQL": [],
+        "SQLite": [],
+        "Microsoft SQL Server": ["sql server", "mssql", "ms sql"],
+        "Oracle Database": ["oracle db", "oracle"],
+        "MongoDB": ["mongo"],
+        "Redis": [],
+        "Elasticsearch": ["elastic search"],
+        "Cassandra": ["apache cassandra"],
+        "DynamoDB": ["dynamo db"],
+        "NoSQL": [],
+        "Snowflake": [],
+        "BigQuery": ["big query"],
+    },
+    "Cloud & DevOps": {
+        "AWS": ["amazon web services"],
+        "Microsoft Azure": ["azure"],
+        "Google Cloud": ["gcp", "google cloud platform"],
+        "Docker": [],
+        "Kubernetes": ["k8s", "kube"],
+        "Terraform": [],
+        "Ansible": [],
+        "Jenkins": [],
+        "GitHub Actions": [],
+        "GitLab CI": ["gitlab ci/cd"],
+        "CI/CD": ["cicd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+        "Git": ["github", "gitlab", "version control"],
+        "Linux": ["unix", "ubuntu", "red hat", "rhel"],
+        "Nginx": [],
+        "Serverless": ["aws lambda", "lambda functions"],
+        "Microservices": ["microservice", "micro-services"],
+        "Prometheus": [],
+        "Grafana": [],
+    },
+    "Data & Machine Learning": {
+        "Machine Learning": ["ml"],
+        "Deep Learning": [],
+        "Natural Language Processing": ["nlp"],
+        "Computer Vision": [],
+        "Large Language Models": ["llm", "llms", "generative ai", "genai"],
+        "TensorFlow": [],
+        "PyTorch": ["torch"],
+        "scikit-learn": ["sklearn", "scikit learn"],
+        "Pandas": [],
+        "NumPy": [],
+        "Apache Spark": ["spark", "pyspark"],
+        "Hadoop": [],
+        "Apache Kafka": ["kafka"],
+        "Apache Airflow": ["airflow"],
+        "RabbitMQ": [],
+        "Tableau": [],
+        "Power BI": ["powerbi"],
+        "Excel": ["microsoft excel", "ms excel"],
+        "Data Analysis": ["data analytics"],
+        "ETL": ["data pipelines", "data pipeline"],
+    },
+    "Testing & Practices": {
+        "Unit Testing": ["unit tests"],
+        "Test Automation": ["automated testing"],
+        "pytest": [],
+        "Jest": [],
+        "Selenium": [],
+        "Cypress": [],
+        "Agile": ["agile methodologies"],
+        "Scrum": [],
+        "Jira": [],
+        "System Design": [],
+        "Object-Oriented Programming": ["oop", "object oriented programming"],
+        "Data Structures & Algorithms": ["data structures", "algorithms"],
+    },
+    "Security": {
+        "Penetration Testing": ["pentesting", "pen testing", "pentest"],
+        "Vulnerability Management": ["vulnerability assessment", "vulnerability scanning"],
+        "Incident Response": [],
+        "SIEM": [],
+        "Splunk": [],
+        "OWASP": ["owasp top 10"],
+        "Wireshark": [],
+        "Nmap": [],
+        "Burp Suite": [],
+        "Identity and Access Management": ["iam"],
+        "Network Security": [],
+        "Cryptography": ["encryption"],
+        "Threat Modeling": [],
+        "Zero Trust": [],
+    },
+    "Certifications": {
+        "AWS Certified Solutions Architect": ["aws solutions architect"],
+        "AWS Certified Cloud Practitioner": ["aws cloud practitioner"],
+        "AWS Certified Developer": [],
+        "Microsoft Certified: Azure Fundamentals": ["az-900", "azure fundamentals"],
+        "Microsoft Certified: Azure Administrator": ["az-104", "azure administrator"],
+        "Google Professional Cloud Architect": ["professional cloud architect"],
+        "Certified Kubernetes Administrator": ["cka"],
+        "Certified Kubernetes Application Developer": ["ckad"],
+        "CISSP": [],
+        "CompTIA Security+": ["security+", "security plus"],
+        "CompTIA Network+": ["network+"],
+        "Certified Ethical Hacker": ["ceh"],
+        "OSCP": [],
+        "CISM": [],
+        "CCNA": [],
+        "PMP": ["project management professional"],
+        "Certified ScrumMaster": ["csm", "scrum master certification"],
+        "Terraform Associate": ["hashicorp certified terraform associate"],
+    },
+}
+
+CERTIFICATION_CATEGORY = "Certifications"
+
+# Aliases that are ordinary words or letters in other cases ("go", "r", "c", "excel in", "rest")
+# and only count when written exactly like this
+CASE_SENSITIVE_ALIASES = frozenset([
+    "C", "R", "Go", "Swift", "Rust", "Scala", "Spring", "Express", "React", "Angular", "Excel",
+    "REST", "ML", "IAM", "Oracle", "Spark", "Rails", "RoR", "CSM", "CKA", "CEH", "Kube",
+])
+
+# A match must not run into a neighbouring word ("java" in "javascript", "c" in "c++")
+_WORD_CHAR = re.compile(r"[a-z0-9+#&]", re.IGNORECASE)
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over every alias of the taxonomy. scan() walks the text once and
+    returns the leftmost-longest whole-word matches as (start, end, canonical name).
+    """
+
+    def __init__(self, taxonomy=SKILL_TAXONOMY, case_sensitive=CASE_SENSITIVE_ALIASES):
+        self.category = {}
+        # Lowercased alias -> the spellings it must be written in
+        self.case_sensitive = {}
+        for alias in case_sensitive:
+            self.case_sensitive.setdefault(alias.lower(), set()).add(alias)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for category, skills in taxonomy.items():
+            for canonical, aliases in skills.items():
+                self.category[canonical] = category
+                for alias in [canonical, *aliases]:
+                    self._add(alias.lower(), canonical)
+        self._build()
+
+    def _add(self, alias, canonical):
+        node = 0
+        for char in alias:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append((len(alias), canonical))
+
+    def _build(self):
+        # Breadth-first failure links; each node also inherits its fallback's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0) if node else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, text):
+        lowered = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates = []
+        node = 0
+        for end, char in enumerate(lowered, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, canonical in out[node]:
+                start = end - length
+                if start > 0 and _WORD_CHAR.match(text[start - 1]):
+                    continue
+                if end < len(text) and _WORD_CHAR.match(text[end]):
+                    continue
+                exact = self.case_sensitive.get(lowered[start:end])
+                if exact and text[start:end] not in exact:
+                    continue
+                candidates.append((start, end, canonical))
+
+        # Leftmost-longest, non-overlapping ("amazon web services" rather than a shorter alias inside it)
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        covered_until = 0
+        for start, end, canonical in candidates:
+            if start >= covered_until:
+                matches.append((start, end, canonical))
+                covered_until = end
+        return matches
+
+    def find(self, text):
+        """Canonical names found in the text, in order of first mention."""
+        return list(dict.fromkeys(canonical for _, _, canonical in self.scan(text or "")))
+
+    def resolve(self, name):
+        """Canonical name for a single skill as written (an alias or a canonical name), or None."""
+        matches = self.scan(name or "")
+        if len(matches) == 1 and matches[0][0] == 0 and matches[0][1] == len(name.strip()):
+            return matches[0][2]
+        return None
+
+
+# Compiled once per process
+skill_matcher = SkillMatcher()
@@ -0,0 +1,222 @@
+import re
+import json
+from resume_model import parse_resume, strip_code_fence
+from skill_taxonomy import skill_matcher, CERTIFICATION_CATEGORY
+
+_STRING_LIST = {"type": "ARRAY", "items": {"type": "STRING"}}
+_CATEGORY_LIST = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"category": {"type": "STRING"}, "skills": _STRING_LIST},
+        "required": ["category", "skills"],
+    },
+}
+
+# Response schema for the skills recommendation call; current and missing skills are found
+# locally (local_skills_analysis), so Gemini only recommends
+SKILLS_RECOMMENDATION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "profession_type": {"type": "STRING"},
+        "recommended_skills": _CATEGORY_LIST,
+        "recommended_certifications": _STRING_LIST,
+    },
+    "required": ["profession_type", "recommended_skills", "recommended_certifications"],
+}
+
+SKILLS_RECOMMENDATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": SKILLS_RECOMMENDATION_SCHEMA,
+}
+
+_LATEX_SPECIALS = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_LATEX_SPECIALS_RE = re.compile("|".join(re.escape(char) for char in _LATEX_SPECIALS))
+
+
+def escape_latex(text):
+    """Escapes the characters LaTeX treats specially in running text."""
+    return _LATEX_SPECIALS_RE.sub(lambda match: _LATEX_SPECIALS[match.group()], str(text))
+
+
+def _clean_list(values):
+    """Stripped, non-empty strings with case-insensitive duplicates removed, in order."""
+    seen = set()
+    cleaned = []
+    if values is None or isinstance(values, (str, dict)):
+        return cleaned
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        if value and value.lower() not in seen:
+            seen.add(value.lower())
+            cleaned.append(value)
+    return cleaned
+
+
+def _by_category(entries):
+    by_category = {}
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        category = str(entry.get("category") or "").strip() or "Other Skills"
+        skills = entry.get("skills") if isinstance(entry.get("skills"), list) else []
+        by_category[category] = _clean_list(by_category.get(category, []) + skills)
+    return by_category
+
+
+def parse_skills_json(response_text):
+    """
+    Parses the JSON skills analysis into the flat lists and per-category dicts the UIs use.
+    Raises ValueError when the response is not a JSON object.
+    """
+    # Tolerate a Markdown code fence around the JSON
+    data = json.loads(strip_code_fence(response_text))
+    if not isinstance(data, dict):
+        raise ValueError("Skills analysis is not a JSON object")
+
+    current_by_category = _by_category(data.get("current_skills"))
+    recommended_by_category = _by_category(data.get("recommended_skills"))
+    return {
+        "profession_type": str(data.get("profession_type") or "").strip(),
+        "skill_categories": _clean_list(list(current_by_category) + list(recommended_by_category)),
+        "current_skills": _clean_list(skill for skills in current_by_category.values() for skill in skills),
+        "current_skills_by_category": current_by_category,
+        "current_certifications": _clean_list(data.get("current_certifications")),
+        "missing_skills": _clean_list(data.get("missing_skills")),
+        "recommended_skills": _clean_list(skill for skills in recommended_by_category.values() for skill in skills),
+        "recommended_skills_by_category": recommended_by_category,
+        "recommended_certifications": _clean_list(data.get("recommended_certifications")),
+    }
+
+
+def local_skills_analysis(latex_code, job_description):
+    """
+    Current and missing skills without Gemini: the bundled taxonomy (skill_taxonomy.py) is
+    matched against the resume text and the job description, aliases resolve to one name
+    ("k8s" -> Kubernetes), and missing skills are the job's skills the resume lacks. Items the
+    resume's skills section lists that the taxonomy does not know are kept under their heading.
+    Returns skills data in parse_skills_json's shape with empty recommendations.
+    """
+    resume = parse_resume(latex_code)
+    current = skill_matcher.find(resume.text)
+    known = set(current)
+    unlisted = {}
+    for heading, items in resume.skill_lines.items():
+        for item in items:
+            if not skill_matcher.find(item):
+                unlisted.setdefault(heading, []).append(item)
+    wanted = skill_matcher.find(job_description)
+
+    def is_certification(skill):
+        return skill_matcher.category[skill] == CERTIFICATION_CATEGORY
+
+    current_by_category = {}
+    for skill in current:
+        if not is_certification(skill):
+            current_by_category.setdefault(skill_matcher.category[skill], []).append(skill)
+    certifications = [skill for skill in current if is_certification(skill)]
+    for heading, items in unlisted.items():
+        if "certif" in heading.lower():
+            certifications.extend(items)
+        else:
+            current_by_category[heading] = _clean_list(current_by_category.get(heading, []) + items)
+
+    return {
+        "profession_type": "",
+        "skill_categories": list(current_by_category),
+        "current_skills": _clean_list(skill for skills in current_by_category.values() for skill in skills),
+        "current_skills_by_category": current_by_category,
+        "current_certifications": _clean_list(certifications),
+        "missing_skills": [skill for skill in wanted if skill not in known and not is_certification(skill)],
+        "recommended_skills": [],
+        "recommended_skills_by_category": {},
+        # Certifications the job asks for are recommended whatever Gemini adds
+        "recommended_certifications": [skill for skill in wanted if skill not in known and is_certification(skill)],
+    }
+
+
+def merge_recommendations(skills_data, response_text):
+    """
+    Adds Gemini's recommendations (SKILLS_RECOMMENDATION_SCHEMA JSON) to local skills data,
+    dropping anything the resume already has. Raises ValueError like parse_skills_json.
+    """
+    recommended = parse_skills_json(response_text)
+    have = {(skill_matcher.resolve(skill) or skill).lower()
+            for skill in skills_data["current_skills"] + skills_data["current_certifications"]}
+
+    def new(items):
+        return [item for item in items if (skill_matcher.resolve(item) or item).lower() not in have]
+
+    by_category = {}
+    for category, skills in recommended["recommended_skills_by_category"].items():
+        skills = new(skills)
+        if skills:
+            by_category[category] = skills
+    return {
+        **skills_data,
+        "profession_type": recommended["profession_type"] or skills_data["profession_type"],
+        "skill_categories": _clean_list(skills_data["skill_categories"] + list(by_category)),
+        "recommended_skills": _clean_list(skill for skills in by_category.values() for skill in skills),
+        "recommended_skills_by_category": by_category,
+        "recommended_certifications": _clean_list(
+            skills_data["recommended_certifications"] + new(recommended["recommended_certifications"])),
+    }
+
+
+def render_skills_latex(skills_data, max_categories=None, max_skills_per_category=None, mark_recommended=False):
+    """
+    Renders the "Professional Skills & Certifications" section from analyzed (or user-edited)
+    skills data. Current and recommended skills are merged per category, current ones first;
+    every skill, category and certification is LaTeX-escaped.
+    """
+    suffix = " (Recommended)" if mark_recommended else ""
+
+    def merge(current, recommended):
+        # Recommended entries already listed as current are dropped
+        current = _clean_list(current)
+        known = {item.lower() for item in current}
+        return [escape_latex(item) for item in current] + [
+            escape_latex(item) + suffix for item in _clean_list(recommended) if item.lower() not in known]
+
+    categories = {}
+    for key in ("current_skills_by_category", "recommended_skills_by_category"):
+        by_category = skills_data.get(key)
+        if not isinstance(by_category, dict):
+            continue
+        for category, skills in by_category.items():
+            name = str(category).strip()
+            if name and isinstance(skills, list):
+                categories.setdefault(name.lower(), (name, {}))[1][key] = skills
+
+    lines = []
+    for name, skills in list(categories.values())[:max_categories]:
+        items = merge(skills.get("current_skills_by_category"), skills.get("recommended_skills_by_category"))
+        if items:
+            lines.append(f"     \\textbf{{{escape_latex(name)}}}{{: {', '.join(items[:max_skills_per_category])}}} \\\\")
+
+    certifications = merge(skills_data.get("current_certifications"), skills_data.get("recommended_certifications"))
+    rendered = ", ".join(certifications) if certifications else "No current certifications"
+    lines.append(f"     \\textbf{{Certifications}}{{: {rendered}}}")
+
+    return "\n".join([
+        "%-----------SKILLS and CERTIFICATIONS-----------",
+        "\\section{Professional Skills \\& Certifications}",
+        " \\begin{itemize}[leftmargin=0.15in, label={}]",
+        "    \\small{\\item{",
+        *lines,
+        "    }}",
+        " \\end{itemize}",
+    ])
@@ -0,0 +1,196 @@
+"""
+Speculative optimization: the first draft usually scores below the optimization threshold, so
+the optimizer can start as soon as the draft exists, alongside the evaluation, instead of after
+it. When the score comes back at or above the threshold the speculative rewrite is cancelled (or
+its result dropped if it already started), which costs its Gemini tokens; when the score is low
+the rewrite is already done or under way and the critical path is shorter by the evaluation time.
+
+Off by default; set SPECULATIVE_OPTIMIZATION=1 to trade the extra tokens for latency.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import wait
+from pipeline import submit
+from resilience import track_degraded, mark_degraded
+from resume_model import parse_resume
+from keyword_coverage import coverage_report, feedback_with_uncovered
+
+# Start the optimizer together with the first evaluation instead of after it
+SPECULATIVE_OPTIMIZATION = os.environ.get("SPECULATIVE_OPTIMIZATION", "0").lower() in ("1", "true", "yes")
+
+# What the optimizer is told before any evaluation exists; the uncovered job terms are appended
+SPECULATIVE_FEEDBACK = ("No evaluation yet. Align the resume with the job description: quantify achievements, "
+                        "mirror its wording in the experience and projects bullets, and surface the relevant skills.")
+
+
+def speculative_feedback(latex_code, job_description):
+    """Feedback for an optimization started before the evaluation: the general brief plus the job terms not yet covered."""
+    return feedback_with_uncovered(SPECULATIVE_FEEDBACK, coverage_report(parse_resume(latex_code).text, job_description))
+
+
+class SpeculationStats:
+    """
+    How speculative optimizations ended: won (the score was low and the result was used),
+    discarded (the score did not need it; "cancelled" counts those stopped before their Gemini call
+    finished) or failed. saved_seconds is the optimizer time that overlapped the evaluation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.won = 0
+        self.discarded = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.saved_seconds = 0.0
+
+    def record(self, outcome, saved_seconds=0.0, cancelled=False):
+        with self._lock:
+            if outcome == "started":
+                self.started += 1
+            elif outcome == "won":
+                self.won += 1
+                self.saved_seconds += saved_seconds
+            elif outcome == "discarded":
+                self.discarded += 1
+                self.cancelled += int(cancelled)
+            else:
+                self.failed += 1
+
+    def stats(self):
+        with self._lock:
+            finished = self.won + self.discarded + self.failed
+            return {
+                "enabled": SPECULATIVE_OPTIMIZATION,
+                "started": self.started,
+                "won": self.won,
+                "discarded": self.discarded,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "win_rate": round(self.won / finished, 3) if finished else None,
+                "saved_seconds": round(self.saved_seconds, 2),
+                "avg_saved_seconds": round(self.saved_seconds / self.won, 2) if self.won else None,
+            }
+
+
+# Shared by every route in the process
+speculation_stats = SpeculationStats()
+
+
+class Speculation:
+    """
+    One optimization running on the pipeline pool ahead of its evaluation. Stages it degrades are
+    held back and reported for the request only if its result is used. A result equal to
+    `baseline` (the optimizer's "nothing changed" fallback) counts as a failure. Call accept() or
+    discard() once; discard() after accept() does nothing, so it can close every path, and
+    accept() after discard() returns None, so a discarded result is never used.
+    """
+
+    def __init__(self, fn, args, baseline=None):
+        self.baseline = baseline
+        self.settled = False
+        self.degraded = []
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.future = submit(self._run, fn, *args)
+        speculation_stats.record("started")
+
+    def _run(self, fn, *args):
+        try:
+            with track_degraded() as degraded:
+                return fn(*args)
+        finally:
+            self.degraded = degraded
+            self.finished_at = time.monotonic()
+
+    def _finish(self, result, needed_at):
+        if result is None or result == self.baseline:
+            speculation_stats.record("failed")
+            return None
+        for stage in self.degraded:
+            mark_degraded(stage)
+        # The optimizer time that overlapped the evaluation is what the request did not wait for
+        saved = min(self.finished_at, needed_at) - self.started_at
+        speculation_stats.record("won", max(0.0, saved))
+        return result
+
+    def accept(self, deadline=None):
+        """Waits for the speculative result within the deadline; None when there is no usable result."""
+        if self.settled:
+            return None
+        self.settled = True
+        needed_at = time.monotonic()
+        wait([self.future], timeout=deadline.remaining() if deadline else None)
+        if not self.future.done():
+            self.future.cancel()
+            logging.warning("Speculative optimization missed the request deadline")
+            speculation_stats.record("failed")
+            return None
+        try:
+            result = self.future.result()
+        except Exception:
+            logging.exception("Speculative optimization failed")
+            speculation_stats.record("failed")
+            return None
+        return self._finish(result, needed_at)
+
+    def discard(self):
+        """Drops the speculation because the draft needs no optimization; a run not yet started is cancelled."""
+        if self.settled:
+            return
+        self.settled = True
+        cancelled = self.future.cancel()
+        speculation_stats.record("discarded", cancelled=cancelled)
+        logging.info("Discarded speculative optimization" + (" before it started" if cancelled else ""))
+
+
+class AsyncSpeculation(Speculation):
+    """Speculation for the asyncio routes: the optimization is a task, and discarding it cancels the Gemini call."""
+
+    def __init__(self, coroutine, baseline=None):
+        self.baseline = baseline
+        self.settled = False
+        self.degraded = []
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.task = asyncio.ensure_future(self._arun(coroutine))
+        speculation_stats.record("started")
+
+    async def _arun(self, coroutine):
+        try:
+            with track_degraded() as degraded:
+                return await coroutine
+        finally:
+            self.degraded = degraded
+            self.finished_at = time.monotonic()
+
+    async def accept(self, deadline=None):
+        if self.settled:
+            return None
+        self.settled = True
+        needed_at = time.monotonic()
+        await asyncio.wait([self.task], timeout=deadline.remaining() if deadline else None)
+        if not self.task.done():
+            self.task.cancel()
+            logging.warning("Speculative optimization missed the request deadline")
+            speculation_stats.record("failed")
+            return None
+        try:
+            result = self.task.result()
+        except Exception:
+            logging.exception("Speculative optimization failed")
+            speculation_stats.record("failed")
+            return None
+        return self._finish(result, needed_at)
+
+    def discard(self):
+        if self.settled:
+            return
+        self.settled = True
+        cancelled = not self.task.done()
+        self.task.cancel()
+        speculation_stats.record("discarded", cancelled=cancelled)
+        logging.info("Discarded speculative optimization" + (" and cancelled its Gemini call" if cancelled else ""))
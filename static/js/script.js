@@ -15,6 +15,8 @@ document.addEventListener('DOMContentLoaded', function() {
     const optimizedBadge = document.getElementById('optimized-badge');
     const companyNameInput = document.getElementById('company-name');
     const mainHeading = document.querySelector('.app-container h2');
+    // Certifications from the last analysis, sent back when the skills LaTeX is regenerated
+    let lastCertifications = { current: [], recommended: [] };
 
     // Function to add a message to the process container
     function addMessage(message, className) {
@@ -28,6 +30,10 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to update skills lists
     function updateSkillsLists(skillsData) {
         console.log('Updating skills with data:', skillsData);  // Debug log
+        lastCertifications = {
+            current: skillsData.current_certifications || [],
+            recommended: skillsData.recommended_certifications || []
+        };
         
         const currentSkillsList = document.getElementById('current-skills-list');
         const missingSkillsList = document.getElementById('missing-skills-list');
@@ -137,6 +143,149 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Show the match score; null means Gemini could not be reached or gave no readable score
+    function showScore(score) {
+        if (score === null || score === undefined) {
+            scoreDisplay.textContent = 'n/a';
+            scoreDisplay.className = 'badge badge-info';
+            return;
+        }
+        scoreDisplay.textContent = score + "/10";
+        if (score >= 8) {
+            scoreDisplay.className = 'badge badge-success';
+        } else if (score >= 6) {
+            scoreDisplay.className = 'badge badge-primary';
+        } else {
+            scoreDisplay.className = 'badge badge-info';
+        }
+    }
+
+    // Warn when some steps fell back because Gemini was unavailable, and report quota waits
+    function reportDegraded(data) {
+        if (data.degraded) {
+            addMessage(`Gemini could not be reached for: ${(data.degraded_stages || []).join(', ')}. Those parts show fallback results; please try again shortly.`, "error-message");
+        }
+        // Long waits in the per-key rate-limit queue explain a slow response
+        if (data.quota_wait && data.quota_wait.waited_seconds >= 1) {
+            addMessage(`Gemini calls waited ${Math.round(data.quota_wait.waited_seconds)}s for quota (up to ${data.quota_wait.queue_depth} queued).`, "system-message");
+        }
+    }
+
+    // Render the final result of a resume generation
+    function renderResumeResult(data) {
+        if (data.error) {
+            addMessage("Error: " + data.error, "error-message");
+            return;
+        }
+        
+        addMessage("Resume processed successfully!", "system-message");
+        
+        // Debug log for skills analysis data
+        console.log('Received skills analysis:', data.skills_analysis);
+        
+        if (data.optimized) {
+            addMessage("Resume was optimized to better match the job description.", "system-message");
+            optimizedBadge.style.display = 'inline-block';
+        } else {
+            optimizedBadge.style.display = 'none';
+        }
+        document.getElementById('optimization-status').textContent = data.optimization_message || '';
+        
+        // Display the results
+        latexCodeContainer.textContent = data.latex_code || 'No LaTeX code generated';
+        feedbackContent.innerHTML = (data.feedback || 'No feedback available').replace(/\n/g, '<br>');
+        showScore(data.score);
+        
+        // Update company name in tab and heading if present
+        if (data.company_name) {
+            companyNameInput.value = data.company_name;
+            updateCompanyNameUI();
+        }
+        
+        // Update skills analysis with better error handling
+        if (data.skills_analysis) {
+            updateSkillsLists(data.skills_analysis);
+            addMessage("Skills analysis completed successfully.", "system-message");
+        } else {
+            console.error('No skills analysis data received');
+            addMessage("Skills analysis data not available.", "error-message");
+        }
+        
+        reportDegraded(data);
+        
+        // Show the result container
+        resultContainer.style.display = 'block';
+        
+        // Show cover letter section if company name and job description are available
+        showCoverLetterSection();
+        
+        // Set up the download link
+        if (data.resume_id) {
+            document.getElementById('download-link').href = '/download_latex/' + data.resume_id;
+        }
+        
+        // Highlight syntax if Prism is available
+        if (typeof Prism !== 'undefined' && latexCodeContainer.textContent) {
+            Prism.highlightElement(latexCodeContainer);
+        }
+        
+        document.getElementById('reoptimize-btn').style.display = 'inline-block';
+    }
+
+    // Id of a generation job still running on the server, kept so a reload picks it back up
+    const PENDING_JOB_KEY = 'pendingResumeJob';
+    const JOB_POLL_INTERVAL_MS = 1500;
+    const JOB_POLL_MAX_FAILURES = 5;
+
+    // Poll a background generation job, reporting each stage as it starts, until it finishes
+    function pollJob(jobId) {
+        let seenStages = 0;
+        let failures = 0;
+        
+        function stop(message) {
+            localStorage.removeItem(PENDING_JOB_KEY);
+            addMessage("Error: " + message, "error-message");
+            resultContainer.style.display = 'none';
+        }
+        
+        function poll() {
+            fetch('/jobs/' + jobId)
+            .then(response => {
+                if (response.status === 404) {
+                    return { status: 'failed', stages: [], error: 'The generation job was not found. Please submit it again.' };
+                }
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(job => {
+                failures = 0;
+                job.stages.slice(seenStages).forEach(stage => addMessage(stage.message, "system-message"));
+                seenStages = Math.max(seenStages, job.stages.length);
+                
+                if (job.status === 'succeeded') {
+                    localStorage.removeItem(PENDING_JOB_KEY);
+                    renderResumeResult(job.result);
+                } else if (job.status === 'failed') {
+                    stop(job.error || 'Failed to process resume. Please try again.');
+                } else {
+                    setTimeout(poll, JOB_POLL_INTERVAL_MS);
+                }
+            })
+            .catch(error => {
+                // The job keeps running on the server; ride out brief network or proxy errors
+                console.error('Error polling job:', error);
+                if (++failures > JOB_POLL_MAX_FAILURES) {
+                    stop(error.message || 'Lost contact with the server. Reload the page to check on your resume.');
+                    return;
+                }
+                setTimeout(poll, JOB_POLL_INTERVAL_MS * failures);
+            });
+        }
+        poll();
+    }
+
     // Tab switching
     latexTab.addEventListener('click', function() {
         latexTab.classList.add('active');
@@ -222,83 +371,22 @@ document.addEventListener('DOMContentLoaded', function() {
         formData.append('company_name', companyName);
         if (apiKey) formData.append('api_key', apiKey);
         
-        // Send the form data to the server
-        fetch('/generate_resume', {
+        // Queue the generation as a background job and poll it, so a dropped connection
+        // or closed tab does not throw the work away
+        fetch('/jobs/generate_resume', {
             method: 'POST',
             body: formData
         })
-        .then(response => {
+        .then(response => response.json().then(data => {
             if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+                throw new Error(data.error || `HTTP error! status: ${response.status}`);
             }
-            return response.json().catch(error => {
-                throw new Error('Invalid JSON response from server');
-            });
-        })
+            return data;
+        }))
         .then(data => {
-            if (data.error) {
-                addMessage("Error: " + data.error, "error-message");
-                return;
-            }
-            
-            addMessage("Resume processed successfully!", "system-message");
-            
-            // Debug log for skills analysis data
-            console.log('Received skills analysis:', data.skills_analysis);
-            
-            if (data.optimized) {
-                addMessage("Resume was optimized to better match the job description.", "system-message");
-                optimizedBadge.style.display = 'inline-block';
-            } else {
-                optimizedBadge.style.display = 'none';
-            }
-            document.getElementById('optimization-status').textContent = data.optimization_message || '';
-            
-            // Display the results
-            latexCodeContainer.textContent = data.latex_code || 'No LaTeX code generated';
-            feedbackContent.innerHTML = (data.feedback || 'No feedback available').replace(/\n/g, '<br>');
-            scoreDisplay.textContent = (data.score || 0) + "/10";
-            
-            // Update company name in tab and heading if present
-            if (data.company_name) {
-                companyNameInput.value = data.company_name;
-                updateCompanyNameUI();
-            }
-            
-            // Update skills analysis with better error handling
-            if (data.skills_analysis) {
-                updateSkillsLists(data.skills_analysis);
-                addMessage("Skills analysis completed successfully.", "system-message");
-            } else {
-                console.error('No skills analysis data received');
-                addMessage("Skills analysis data not available.", "error-message");
-            }
-            
-            if (data.score >= 8) {
-                scoreDisplay.className = 'badge badge-success';
-            } else if (data.score >= 6) {
-                scoreDisplay.className = 'badge badge-primary';
-            } else {
-                scoreDisplay.className = 'badge badge-info';
-            }
-            
-            // Show the result container
-            resultContainer.style.display = 'block';
-            
-            // Show cover letter section if company name and job description are available
-            showCoverLetterSection();
-            
-            // Set up the download link
-            if (data.resume_id) {
-                document.getElementById('download-link').href = '/download_latex/' + data.resume_id;
-            }
-            
-            // Highlight syntax if Prism is available
-            if (typeof Prism !== 'undefined' && latexCodeContainer.textContent) {
-                Prism.highlightElement(latexCodeContainer);
-            }
-            
-            document.getElementById('reoptimize-btn').style.display = 'inline-block';
+            localStorage.setItem(PENDING_JOB_KEY, data.job_id);
+            addMessage("Resume queued for processing...", "system-message");
+            pollJob(data.job_id);
         })
         .catch(error => {
             console.error('Error processing resume:', error);
@@ -370,14 +458,8 @@ document.addEventListener('DOMContentLoaded', function() {
             addMessage("Resume re-optimized!", "system-message");
             latexCodeContainer.textContent = data.latex_code || 'No LaTeX code generated';
             feedbackContent.innerHTML = (data.feedback || 'No feedback available').replace(/\n/g, '<br>');
-            scoreDisplay.textContent = (data.score || 0) + "/10";
-            if (data.score >= 8) {
-                scoreDisplay.className = 'badge badge-success';
-            } else if (data.score >= 6) {
-                scoreDisplay.className = 'badge badge-primary';
-            } else {
-                scoreDisplay.className = 'badge badge-info';
-            }
+            showScore(data.score);
+            reportDegraded(data);
             if (data.resume_id) {
                 document.getElementById('download-link').href = '/download_latex/' + data.resume_id;
             }
@@ -430,6 +512,7 @@ document.addEventListener('DOMContentLoaded', function() {
             if (data.skills_analysis) {
                 updateSkillsLists(data.skills_analysis);
                 addMessage("Skills re-analyzed successfully!", "system-message");
+                reportDegraded(data);
             } else {
                 console.error('No skills analysis data received');
                 addMessage("Skills analysis data not available.", "error-message");
@@ -449,7 +532,7 @@ document.addEventListener('DOMContentLoaded', function() {
         
         // Get current skills data from the UI
         const getSkillsFromCategory = (container) => {
-            const skills = [];
+            const skills = {};
             container.querySelectorAll('.skills-category').forEach(category => {
                 const categoryName = category.querySelector('h4').textContent;
                 const categorySkills = Array.from(category.querySelectorAll('li')).map(li => li.textContent);
@@ -464,12 +547,10 @@ document.addEventListener('DOMContentLoaded', function() {
             current_skills_by_category: getSkillsFromCategory(currentSkillsList),
             recommended_skills_by_category: getSkillsFromCategory(recommendedSkillsList),
             missing_skills: Array.from(missingSkillsList.querySelectorAll('li')).map(li => li.textContent),
-            current_certifications: [], // Add if you have certifications in the UI
-            recommended_certifications: [] // Add if you have certifications in the UI
+            current_certifications: lastCertifications.current,
+            recommended_certifications: lastCertifications.recommended
         };
         
-        const apiKey = apiKeyInput.value;
-        
         addMessage('Regenerating skills LaTeX section...', 'system-message');
         
         fetch('/regenerate_skills_latex', {
@@ -638,6 +719,7 @@ document.addEventListener('DOMContentLoaded', function() {
         formData.append('latex_code', latexCode);
         formData.append('company_name', companyName);
         formData.append('job_description', jobDescription);
+        formData.append('regenerate', 'true');
         if (apiKey) formData.append('api_key', apiKey);
         
         fetch('/generate_cover_letter', {
@@ -667,6 +749,14 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // On page load, resume polling a generation that was still running when the page was left
+    const pendingJobId = localStorage.getItem(PENDING_JOB_KEY);
+    if (pendingJobId) {
+        processContainer.style.display = 'block';
+        addMessage("Resuming your previous resume generation...", "system-message");
+        pollJob(pendingJobId);
+    }
+
     // On page load, fetch saved resume content (if any)
     fetch('/get_main_resume')
         .then(response => response.json())
@@ -4,28 +4,60 @@ import uuid
 import streamlit as st
 from datetime import datetime
 import json
-import PyPDF2
-import docx
+import re
+import hashlib
 from io import BytesIO
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from pipeline import Deadline, bound_by, run_parallel
+from gemini_client import generate_content, generate_content_stream
+from client_pool import client_pool, GENAI_BACKEND, GENAI_INSTALLED
+from ats_scorer import score_resume
+from text_extraction import extract_pdf_text, extract_docx_text
+from metrics import llm_metrics
+from resilience import track_degraded
+from ratelimit import track_quota_wait
+from resume_model import parse_resume
+from keyword_coverage import feedback_with_uncovered
+from resume_sections import split_sections, select_sections, format_sections, parse_section_rewrites, splice_sections
+from resume_steps import (
+    DEFAULT_LATEX_TEMPLATE, FORMATTER_PROMPT_PREFIX, EVALUATE_AND_ANALYZE_DEFAULTS, mock_process_resume, build_formatter_prompt,
+    needs_optimization, run_step,
+    format_resume, validate_latex, evaluate_coverage, optimize_resume, write_cover_letter, recommend_skills, tailor_resume,
+)
+from speculation import SPECULATIVE_OPTIMIZATION, Speculation, speculative_feedback, speculation_stats
+from resource_files import load_style_block
+from resume_history import ResumeHistory
+from batch import BATCH_MAX_JOBS, run_batch, rank_results, build_latex_zip
 
-try:
-    from google import genai
-    HAS_GENAI = True
-except ImportError:
-    HAS_GENAI = False
-    logging.warning("Google Generative AI module not found. Using mock implementation.")
-
-# Configure logging
+# Configure logging before anything is logged, so the first warning does not install the default handler
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# The offline mock backend (GENAI_BACKEND=mock) does not need the SDK. The SDK itself is imported
+# by client_pool when the first real client is built, not on every cold start
+HAS_GENAI = GENAI_BACKEND == "mock" or GENAI_INSTALLED
+if not HAS_GENAI:
+    logging.warning("Google Generative AI module not found. Using mock implementation.")
+
 # Read the default Gemini API key from environment variable (or use a fallback)
 DEFAULT_GENAI_API_KEY = os.environ.get("GENAI_API_KEY", "YOUR_DEFAULT_API_KEY")
 
-# Create a default client using the default API key if the module is available
-if HAS_GENAI:
-    default_client = genai.Client(api_key=DEFAULT_GENAI_API_KEY)
-else:
-    default_client = None
+def get_default_client():
+    """Client for the default API key, built on first use; client_pool keeps it across reruns and sessions."""
+    return client_pool.get(DEFAULT_GENAI_API_KEY) if HAS_GENAI else None
+
+def has_ai(client):
+    """Whether Gemini can be called: a client, the SDK (or mock backend) and an API key from Settings or the environment."""
+    return bool(client) and HAS_GENAI and bool(st.session_state.get('api_key', '') or os.getenv('GENAI_API_KEY', ''))
+
+# The pipeline steps are shared with the Flask app (resume_steps.py); this app answers every stage
+# but the first draft with gemini-2.5-flash
+GEMINI_MODELS = {stage: "gemini-2.5-flash" for stage in ("latex-repair", "evaluator", "optimizer", "cover-letter", "skills-analysis")}
+
+# Set ATS_LLM_SUBJECTIVE=1 to let Gemini re-score the subjective ATS categories (bullet quality)
+ATS_LLM_SUBJECTIVE = os.environ.get("ATS_LLM_SUBJECTIVE", "0") == "1"
+
+# Number of distinct uploads whose extracted text is kept in the shared cache
+EXTRACTION_CACHE_ENTRIES = int(os.environ.get("EXTRACTION_CACHE_ENTRIES", "128"))
 
 # Set the passcode
 PASSCODE = "ibrahim@aplyease4139"
@@ -38,160 +70,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        color: #1f77b4;
-        margin-bottom: 2rem;
-        font-size: 2.5rem;
-        font-weight: bold;
-    }
-    .score-badge {
-        background: linear-gradient(135deg, #28a745, #20c997);
-        color: white;
-        padding: 0.75rem 1.5rem;
-        border-radius: 1.5rem;
-        font-weight: bold;
-        display: inline-block;
-        margin: 0.5rem 0;
-        font-size: 1.2rem;
-        text-align: center;
-        box-shadow: 0 4px 12px rgba(40, 167, 69, 0.3);
-        min-width: 140px;
-        border: 2px solid rgba(255, 255, 255, 0.2);
-    }
-    .score-badge.warning {
-        background: linear-gradient(135deg, #ffc107, #fd7e14);
-        color: white;
-        box-shadow: 0 4px 12px rgba(255, 193, 7, 0.3);
-    }
-    .score-badge.danger {
-        background: linear-gradient(135deg, #dc3545, #e83e8c);
-        box-shadow: 0 4px 12px rgba(220, 53, 69, 0.3);
-    }
-    .optimized-badge {
-        background: linear-gradient(135deg, #17a2b8, #6f42c1);
-        color: white;
-        padding: 0.6rem 1.2rem;
-        border-radius: 1.2rem;
-        font-weight: bold;
-        display: inline-block;
-        margin: 0.5rem 0;
-        font-size: 1rem;
-        text-align: center;
-        box-shadow: 0 3px 10px rgba(23, 162, 184, 0.3);
-        min-width: 120px;
-        border: 2px solid rgba(255, 255, 255, 0.2);
-    }
-    .score-container {
-        display: flex;
-        gap: 1rem;
-        align-items: center;
-        justify-content: center;
-        margin: 1rem 0;
-        flex-wrap: wrap;
-    }
-    .feature-box {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .success-message {
-        background-color: #d4edda;
-        color: #155724;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border: 1px solid #c3e6cb;
-    }
-    .error-message {
-        background-color: #f8d7da;
-        color: #721c24;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border: 1px solid #f5c6cb;
-    }
-    .latex-code {
-        background-color: #f8f9fa;
-        border: 1px solid #dee2e6;
-        border-radius: 0.5rem;
-        padding: 1rem;
-        font-family: 'Courier New', monospace;
-        font-size: 0.9rem;
-        white-space: pre-wrap;
-        max-height: 400px;
-        overflow-y: auto;
-    }
-    .section-header {
-        background: linear-gradient(90deg, #1f77b4, #17a2b8);
-        color: white;
-        padding: 0.5rem 1rem;
-        border-radius: 0.5rem;
-        margin: 1rem 0;
-        font-weight: bold;
-    }
-    .input-section {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 0.5rem;
-        border: 1px solid #dee2e6;
-        margin: 1rem 0;
-    }
-    .results-section {
-        background-color: #ffffff;
-        padding: 1.5rem;
-        border-radius: 0.5rem;
-        border: 1px solid #dee2e6;
-        margin: 1rem 0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .skills-grid {
-        display: grid;
-        grid-template-columns: 1fr 1fr 1fr;
-        gap: 1rem;
-        margin: 1rem 0;
-    }
-    .skill-category {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #1f77b4;
-    }
-    .button-group {
-        display: flex;
-        gap: 0.5rem;
-        margin: 1rem 0;
-    }
-    .stButton > button {
-        width: 100%;
-        border-radius: 0.5rem;
-        font-weight: bold;
-    }
-    .stDownloadButton > button {
-        width: 100%;
-        border-radius: 0.5rem;
-        font-weight: bold;
-    }
-    .stTextArea > div > div > textarea {
-        border-radius: 0.5rem;
-    }
-    .stTextInput > div > div > input {
-        border-radius: 0.5rem;
-    }
-    .stSelectbox > div > div > select {
-        border-radius: 0.5rem;
-    }
-</style>
-""", unsafe_allow_html=True)
-
 # Initialize session state
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
 if 'resume_store' not in st.session_state:
-    st.session_state.resume_store = {}
+    st.session_state.resume_store = ResumeHistory()
 if 'main_resume_content' not in st.session_state:
     st.session_state.main_resume_content = ""
 if 'uploaded_file_name' not in st.session_state:
@@ -204,72 +87,58 @@ if 'uploaded_base_file_name' not in st.session_state:
     st.session_state.uploaded_base_file_name = None
 if 'last_processed_base_file' not in st.session_state:
     st.session_state.last_processed_base_file = None
+if 'batch_results' not in st.session_state:
+    st.session_state.batch_results = []
 
-# Load template and prompt files
-def load_template(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except Exception as e:
-        logging.error(f"Error loading template file {file_path}: {str(e)}")
-        return ""
+# Custom CSS. Streamlit drops elements a rerun does not emit, so the block is sent on every rerun,
+# but it is read and compacted only when the stylesheet changes
+st.markdown(load_style_block("static/css/streamlit.css"), unsafe_allow_html=True)
 
-def load_prompt(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except Exception as e:
-        logging.error(f"Error loading prompt file {file_path}: {str(e)}")
-        return ""
-
-# Load templates and prompts
-DEFAULT_LATEX_TEMPLATE = load_template("templates/latex_template.tex")
-RESUME_FORMATTER_PROMPT = load_prompt("prompts/resume_formatter.txt")
-RESUME_EVALUATOR_PROMPT = load_prompt("prompts/resume_evaluator.txt")
-RESUME_OPTIMIZER_PROMPT = load_prompt("prompts/resume_optimizer.txt")
-COVER_LETTER_PROMPT = load_prompt("prompts/cover_letter_generator.txt")
+# Output instructions for prompts that send only some sections of the resume (resume_sections.py)
+SECTION_OUTPUT_REQUIREMENT = """Return ONLY the sections given above, each starting with its unchanged marker line (for example "%%% SECTION: experience") followed by the improved LaTeX for that section.
+Keep each section's \\section{...} line and the template's LaTeX macros. Do not return the preamble, \\begin{document} or \\end{document}, and do not include explanations."""
 
 # File processing functions
-def extract_text_from_pdf(file_content):
-    """Extract text from PDF file content."""
-    try:
-        pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        st.error(f"Error reading PDF: {str(e)}")
-        return ""
-
-def extract_text_from_docx(file_content):
-    """Extract text from DOCX file content."""
-    try:
-        doc = docx.Document(BytesIO(file_content))
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
-    except Exception as e:
-        st.error(f"Error reading DOCX: {str(e)}")
-        return ""
-
-def process_uploaded_file(uploaded_file):
+SUPPORTED_UPLOAD_TYPES = {
+    "application/pdf": "PDF",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "DOCX",
+    "application/msword": "DOCX",
+}
+
+def upload_hash(uploaded_file):
+    """SHA-256 of the uploaded bytes; identifies the same resume regardless of file name or tab."""
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+@st.cache_data(max_entries=EXTRACTION_CACHE_ENTRIES, show_spinner=False)
+def extract_upload_text(file_hash, file_kind, _file_content):
+    """Extract text from upload bytes. Cached by content hash across reruns, tabs and sessions."""
+    if file_kind == "PDF":
+        return extract_pdf_text(BytesIO(_file_content))
+    return extract_docx_text(BytesIO(_file_content))
+
+def process_uploaded_file(uploaded_file, file_hash=None):
     """Process uploaded file and extract text."""
     if uploaded_file is None:
         return ""
     
-    file_content = uploaded_file.read()
-    
-    if uploaded_file.type == "application/pdf":
-        return extract_text_from_pdf(file_content)
-    elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        return extract_text_from_docx(file_content)
-    elif uploaded_file.type == "application/msword":
-        return extract_text_from_docx(file_content)
-    else:
+    file_kind = SUPPORTED_UPLOAD_TYPES.get(uploaded_file.type)
+    if not file_kind:
         st.error("Unsupported file type. Please upload a PDF or Word document.")
         return ""
+    
+    try:
+        return extract_upload_text(file_hash or upload_hash(uploaded_file), file_kind, uploaded_file.getvalue())
+    except Exception as e:
+        st.error(f"Error reading {file_kind}: {str(e)}")
+        return ""
+
+def with_script_ctx(fn):
+    """Wrap a helper so it can read st.session_state from a pipeline worker thread."""
+    ctx = get_script_run_ctx()
+    def wrapper(*args, **kwargs):
+        add_script_run_ctx(ctx=ctx)
+        return fn(*args, **kwargs)
+    return wrapper
 
 # Authentication function
 def authenticate():
@@ -290,19 +159,13 @@ def authenticate():
         
         st.stop()
 
-# Mock processing function
-def mock_process_resume(resume_content, job_description=None):
-    """Mock implementation for when Gemini API is not available."""
-    return "AI processing not available. Please set your API key in Settings."
+# Report stored when no resume could be scored
+EMPTY_ATS_REPORT = {"total": 0, "breakdown": {}}
 
 def generate_base_resume(client, resume_content):
-    """Generate a high ATS-score base resume without job description."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
-    
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        return "AI processing not available. Please set your API key in Settings.", 0
+    """Generate a high ATS-score base resume without job description, with its ATS report."""
+    if not has_ai(client):
+        return "AI processing not available. Please set your API key in Settings.", EMPTY_ATS_REPORT
     
     try:
         logging.info("Generating base resume with Gemini AI...")
@@ -390,173 +253,143 @@ CRITICAL INSTRUCTIONS:
 OUTPUT FORMAT: Complete LaTeX document starting with \\documentclass and ending with \\end{{document}}
 """
 
-        response = client.models.generate_content(
+        response = generate_content(
+            client,
             model="gemini-2.5-flash",
-            contents=base_resume_prompt
+            contents=base_resume_prompt,
+            stage="formatter"
         )
         
         if response and response.text:
-            latex_code = response.text.strip()
-            
-            # Clean up the response
-            if latex_code.startswith("```latex"):
-                latex_code = latex_code[8:]
-            if latex_code.startswith("```"):
-                latex_code = latex_code[3:]
-            if latex_code.endswith("```"):
-                latex_code = latex_code[:-3]
+            latex_code = validate_latex_output(client, response.text)
             
-            latex_code = latex_code.strip()
-            
-            # Ensure it starts with documentclass
-            if not latex_code.startswith("\\documentclass"):
-                logging.warning("Generated content doesn't start with documentclass, using template")
-                return DEFAULT_LATEX_TEMPLATE, 0
+            if not latex_code:
+                logging.warning("Generated content holds no LaTeX document, using template")
+                return DEFAULT_LATEX_TEMPLATE, EMPTY_ATS_REPORT
             
             # Now evaluate the ATS score
-            ats_score = evaluate_ats_score(client, latex_code, resume_content)
+            ats_report = evaluate_ats_report(client, latex_code, resume_content)
             
-            logging.info(f"Base resume generated successfully with ATS score: {ats_score}")
-            return latex_code, ats_score
+            logging.info(f"Base resume generated successfully with ATS score: {ats_report['total']}")
+            return latex_code, ats_report
         else:
             logging.error("No response received from Gemini AI")
-            return DEFAULT_LATEX_TEMPLATE, 0
+            return DEFAULT_LATEX_TEMPLATE, EMPTY_ATS_REPORT
             
     except Exception as e:
         logging.exception("Exception occurred while generating base resume with Gemini AI")
-        return DEFAULT_LATEX_TEMPLATE, 0
+        return DEFAULT_LATEX_TEMPLATE, EMPTY_ATS_REPORT
 
-def evaluate_ats_score(client, latex_code, original_content):
+def evaluate_ats_score(client, latex_code, original_content, use_llm=None):
     """Evaluate the ATS score of the generated resume."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
+    return evaluate_ats_report(client, latex_code, original_content, use_llm)["total"]
+
+def evaluate_ats_report(client, latex_code, original_content, use_llm=None):
+    """
+    Score the resume locally against the ATS rubric and return the total with a per-category breakdown.
+    When use_llm is set (default: ATS_LLM_SUBJECTIVE), Gemini re-scores only the subjective categories.
+    """
+    report = score_resume(latex_code)
+    if use_llm is None:
+        use_llm = ATS_LLM_SUBJECTIVE
     
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        return 0
+    if not use_llm or not has_ai(client):
+        return report
     
     try:
-        logging.info("Evaluating ATS score...")
+        logging.info("Scoring subjective ATS categories with Gemini...")
         
-        ats_evaluation_prompt = f"""
-You are an ATS (Applicant Tracking System) specialist. Evaluate the LaTeX resume below and return a single integer ATS score from 1–100. Be strict and apply deductions for any ATS parsing risks. If a JOB DESCRIPTION is provided, weight keyword alignment heavily; if not, evaluate based on general ATS best practices and fidelity to the ORIGINAL CONTENT.
-
-ORIGINAL CONTENT (ground truth of facts/keywords; do not reward invented data):
-{original_content}
+        # Only the bullets are rated, so only the bullets are sent
+        bullets = parse_resume(latex_code).bullets
+        resume_bullets = "\n".join(f"- [{bullet['section']}] {bullet['text']}" for bullet in bullets) if bullets else latex_code
+        
+        bullet_quality_prompt = f"""
+You are an ATS (Applicant Tracking System) specialist. Rate ONLY the bullet point quality of the resume bullets below on a scale from 0 to 8.
 
-GENERATED LATEX RESUME (evaluate this):
-{latex_code}
-
-OPTIONAL JOB DESCRIPTION (use for keyword matching if present):
-{job_description if 'job_description' in globals() else ''}
-
-SCORING RUBRIC (Total = 100 points):
-
-A) CONTACT INFO – 8 pts
-- Name, professional email, phone, city/state present and clearly visible in body (not header/footer).
-- Email looks valid; phone has 10+ digits; optional LinkedIn/portfolio is a plus.
-- Deduct for missing items, nonstandard placement, or obfuscation.
-
-B) SECTION PRESENCE & ORDER – 8 pts
-- Standard, ATS-recognizable headings present: Summary/Professional Summary (optional), Work/Professional Experience, Education, Skills; Projects/Certifications if provided.
-- Reverse-chronological order for dated sections.
-- Deduct for quirky/ambiguous headings or missing core sections.
-
-C) FORMATTING & LAYOUT – 10 pts
-- Single-column layout, left-aligned body text, readable font (Arial/Calibri/Times-like), consistent bullets.
-- No graphics, photos, icons, sidebars, text boxes, or multi-column tricks.
-- Deduct for tables used for layout, content inside headers/footers, decorative bullets/symbols, or cramped spacing.
-
-D) PARSING & TECHNICAL COMPATIBILITY – 8 pts
-- Plain text content (not images); consistent Month YYYY–Month YYYY dates; no unusual characters or hidden text.
-- No macros/embedded objects; links are plain text.
-- Deduct for tabular layout that risks out-of-order parsing, inconsistent date formats, missing months, or header/footer text.
-
-E) QUANTIFIED IMPACT (CRITICAL) – 20 pts
-- MANDATORY: Every bullet point should contain specific numbers, percentages, dollar amounts, timeframes, or quantities.
-- Examples: "Increased efficiency by 35%", "Reduced costs by $50K annually", "Managed team of 12 employees", "Processed 500+ documents weekly"
-- Deduct heavily for vague statements without metrics (e.g., "Was responsible for maintaining efficiency" = 0 points)
-- Reward specific, measurable achievements with clear impact
-
-F) AVOID REPETITIVE ACTION VERBS (CRITICAL) – 15 pts
-- NEVER use the same action verb more than 2 times in the entire resume
-- Deduct heavily for repetition: "Managed (4 times)" = -10 points, "Optimized (3 times)" = -8 points
-- Reward diverse action verbs: Achieved, Accelerated, Amplified, Boosted, Delivered, Enhanced, Exceeded, Generated, Improved, Increased, Led, Optimized, Reduced, Streamlined, Transformed, Developed, Implemented, Executed, Coordinated, Facilitated, Spearheaded, Orchestrated, Pioneered, etc.
-- AVOID weak verbs: Was responsible for, Helped with, Assisted in, Worked on, Participated in
-
-G) ELIMINATE FILLER WORDS – 10 pts
-- Remove superfluous words that add no value: "various", "several", "many", "some", "different", "multiple", "numerous", "extensive", "comprehensive", "significant", "substantial", "considerable", "effective", "successful", "excellent", "outstanding", "exceptional", "remarkable", "notable", "important", "valuable", "useful", "beneficial", "helpful", "supportive", "collaborative", "team-oriented", "detail-oriented", "results-driven", "goal-oriented", "customer-focused", "quality-focused", "performance-driven", "innovative", "creative", "strategic", "tactical", "operational", "administrative", "managerial", "leadership", "professional", "experienced", "skilled", "talented", "capable", "competent", "proficient", "expert", "advanced", "intermediate", "beginner", "entry-level", "senior", "junior", "associate", "principal", "lead", "head", "chief", "director", "manager", "supervisor", "coordinator", "specialist", "analyst", "consultant", "advisor", "expert", "professional", "representative", "agent", "executive", "officer", "president", "vice president", "CEO", "CTO", "CFO", "COO", "VP", "SVP", "EVP", "AVP"
-- Be concise and direct: "Led team of 8 developers" instead of "Successfully led a team of 8 skilled developers"
-- Deduct for each filler word found
-
-H) OPTIMAL RESUME LENGTH & DEPTH – 8 pts
-- Target 400-675 words total (not 765+ words)
-- Use 12-20 bullet points maximum (not 24+)
-- Be concise for career level - new job seekers should be brief
-- Focus on quality over quantity
-- Deduct for excessive length or too many bullet points
-
-I) BULLET POINT QUALITY – 8 pts
 - Use CAR (Challenge-Action-Result) or STAR (Situation-Task-Action-Result) method
 - Each bullet should show: What you did + How you did it + What was the measurable result
 - Focus on accomplishments, not just duties
 - Deduct for vague, duty-only descriptions without impact
+- Deduct for facts or metrics that are not supported by the ORIGINAL CONTENT
 
-J) SKILLS & KEYWORDS – 5 pts
-- Skills section includes 6–12 relevant competencies; includes acronyms and their expansions when reasonable (e.g., "SQL (Structured Query Language)").
-- If JOB DESCRIPTION provided: measure alignment (hard skills, tools, certs, domain terms). Reward natural integration across bullets, summary, and skills; penalize keyword stuffing or irrelevant terms.
-- If JD not provided: reward preservation and accurate placement of role-relevant keywords present in ORIGINAL CONTENT.
-
-K) EDUCATION – 2 pts
-- Degree, institution, graduation (or expected) month/year clearly stated; honors/certs if provided.
+ORIGINAL CONTENT:
+{original_content}
 
-BONUS/DEDUCTIONS (already bounded within categories above; do not exceed 100 total):
-- Minor + for concise, high-signal Summary tailored to JD (if provided).
-- Minor − for excessive length (e.g., >2 pages without strong justification), dense walls of text, or obvious keyword dumping.
+GENERATED RESUME BULLETS:
+{resume_bullets}
 
 OUTPUT REQUIREMENT:
-Return ONLY a single integer from 1 to 100. No words, no explanations."""
+Return ONLY a single integer from 0 to 8. No words, no explanations."""
 
-        response = client.models.generate_content(
+        response = generate_content(
+            client,
             model="gemini-2.5-flash",
-            contents=ats_evaluation_prompt
+            contents=bullet_quality_prompt,
+            stage="ats-score"
         )
         
         if response and response.text:
-            score_text = response.text.strip()
-            # Extract number from response
-            import re
-            score_match = re.search(r'\b(\d+)\b', score_text)
+            score_match = re.search(r'\b(\d+)\b', response.text.strip())
             if score_match:
-                score = int(score_match.group(1))
-                return max(1, min(100, score))  # Ensure score is between 1-100
-        
-        return 70  # Default score if evaluation fails
+                category = report["breakdown"]["bullet_quality"]
+                category["score"] = max(0, min(category["max"], int(score_match.group(1))))
+                category["notes"].append("Scored by Gemini")
+                total = sum(item["score"] for item in report["breakdown"].values())
+                report["total"] = int(max(1, min(100, round(total))))
         
     except Exception as e:
         logging.exception("Exception occurred during ATS evaluation")
-        return 70  # Default score
-
-def improve_base_resume_with_feedback(client, latex_code, original_content, user_feedback, current_score):
-    """Improve the base resume based on specific user feedback."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
     
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        return latex_code, current_score
+    return report
+
+def apply_improvement(client, response_text, latex_code, sections, keys):
+    """
+    The resume after an ATS improvement: the returned sections spliced in when sections were sent,
+    otherwise (or when none came back) the response read as a whole document. None when the
+    response holds neither, so the caller keeps the current resume.
+    """
+    if not response_text:
+        logging.error("No response received from Gemini AI for the resume improvement")
+        return None
+    if keys:
+        rewrites = parse_section_rewrites(response_text, keys)
+        if rewrites:
+            logging.info(f"Improved resume sections: {', '.join(rewrites)}")
+            return validate_latex_output(client, splice_sections(sections, rewrites), previous=latex_code)
+        # Sections without their markers cannot be placed, and alone they are not a whole resume
+        if "\\documentclass" not in response_text:
+            logging.warning("Resume improvement returned neither the requested sections nor a whole document")
+            return None
+        logging.warning("Resume improvement returned no usable sections; using the response as the whole document")
+    return validate_latex_output(client, response_text, previous=latex_code)
+
+def improve_base_resume_with_feedback(client, latex_code, original_content, user_feedback, current_report):
+    """Improve the base resume based on specific user feedback and return it with its ATS report."""
+    if not has_ai(client):
+        return latex_code, current_report
     
+    current_score = current_report["total"]
     try:
         logging.info(f"Improving base resume based on user feedback...")
         
+        # Send only the sections the feedback is about; the rest of the document is kept as is
+        sections = split_sections(latex_code)
+        keys = select_sections(sections, user_feedback) if sections else None
+        if keys:
+            resume_block = f"CURRENT LATEX RESUME SECTIONS TO IMPROVE (Score: {current_score}/100):\n{format_sections(sections, keys)}"
+            output_requirement = SECTION_OUTPUT_REQUIREMENT
+        else:
+            resume_block = f"CURRENT LATEX RESUME (Score: {current_score}/100):\n{latex_code}"
+            output_requirement = """Generate an improved LaTeX resume that uses the same LaTeX structure but addresses all the specific issues mentioned in the user feedback.
+Do not include explanations—output only the LaTeX code."""
+        
         feedback_prompt = f"""
 The following resume has an ATS score of {current_score}/100. Based on the specific user feedback provided below, rewrite and improve the resume to address the exact issues mentioned.
 
 ORIGINAL CONTENT (ground truth – do not invent new employers, degrees, or dates):
 {original_content}
 
-CURRENT LATEX RESUME (Score: {current_score}/100):
-{latex_code}
+{resume_block}
 
 USER FEEDBACK TO ADDRESS:
 {user_feedback}
@@ -603,60 +436,56 @@ Based on the user feedback above, make the following improvements:
    - Maintain factual accuracy while improving presentation
 
 OUTPUT REQUIREMENT:
-Generate an improved LaTeX resume that uses the same LaTeX structure but addresses all the specific issues mentioned in the user feedback.
-Do not include explanations—output only the LaTeX code.
+{output_requirement}
 """
 
-        response = client.models.generate_content(
+        response = generate_content(
+            client,
             model="gemini-2.5-flash",
-            contents=feedback_prompt
+            contents=feedback_prompt,
+            stage="ats-improve"
         )
         
-        if response and response.text:
-            improved_latex = response.text.strip()
-            
-            # Clean up the response
-            if improved_latex.startswith("```latex"):
-                improved_latex = improved_latex[8:]
-            if improved_latex.startswith("```"):
-                improved_latex = improved_latex[3:]
-            if improved_latex.endswith("```"):
-                improved_latex = improved_latex[:-3]
-            
-            improved_latex = improved_latex.strip()
-            
-            if improved_latex.startswith("\\documentclass"):
-                # Re-evaluate the improved resume
-                new_score = evaluate_ats_score(client, improved_latex, original_content)
-                logging.info(f"Base resume improved based on feedback. New ATS score: {new_score}")
-                return improved_latex, new_score
+        improved_latex = apply_improvement(client, response.text if response else None, latex_code, sections, keys)
+        if improved_latex:
+            # Re-evaluate the improved resume
+            new_report = evaluate_ats_report(client, improved_latex, original_content)
+            logging.info(f"Base resume improved based on feedback. New ATS score: {new_report['total']}")
+            return improved_latex, new_report
         
-        return latex_code, current_score
+        return latex_code, current_report
         
     except Exception as e:
         logging.exception("Exception occurred during base resume improvement with feedback")
-        return latex_code, current_score
+        return latex_code, current_report
 
-def improve_ats_resume(client, latex_code, original_content, current_score):
-    """Improve the resume to achieve higher ATS score."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
-    
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        return latex_code, current_score
+def improve_ats_resume(client, latex_code, original_content, current_report):
+    """Improve the resume to achieve higher ATS score and return it with its ATS report."""
+    if not has_ai(client):
+        return latex_code, current_report
     
+    current_score = current_report["total"]
     try:
         logging.info(f"Improving resume from ATS score {current_score}...")
         
+        # Send only the sections behind the ATS categories that lost points
+        sections = split_sections(latex_code)
+        keys = select_sections(sections, ats_report=current_report) if sections else None
+        if keys:
+            resume_block = f"CURRENT LATEX RESUME SECTIONS TO IMPROVE (Score: {current_score}/100):\n{format_sections(sections, keys)}"
+            output_requirement = SECTION_OUTPUT_REQUIREMENT
+        else:
+            resume_block = f"CURRENT LATEX RESUME (Score: {current_score}/100):\n{latex_code}"
+            output_requirement = """Generate an improved LaTeX resume that uses the same LaTeX structure but integrates all enhancements above. 
+Do not include explanations—output only the LaTeX code."""
+        
         improvement_prompt = f"""
 The following resume has an ATS score of {current_score}/100. Rewrite and improve it to achieve a target score of 90+ (minimum 80) by applying ATS best practices.
 
 ORIGINAL CONTENT (ground truth – do not invent new employers, degrees, or dates):
 {original_content}
 
-CURRENT LATEX RESUME (Score: {current_score}/100):
-{latex_code}
+{resume_block}
 
 CRITICAL IMPROVEMENT RULES:
 
@@ -733,506 +562,99 @@ CRITICAL IMPROVEMENT RULES:
     - Use terminology naturally in bullets or skills.
 
 OUTPUT REQUIREMENT:
-Generate an improved LaTeX resume that uses the same LaTeX structure but integrates all enhancements above. 
-Do not include explanations—output only the LaTeX code.
+{output_requirement}
 """
 
-        response = client.models.generate_content(
+        response = generate_content(
+            client,
             model="gemini-2.5-flash",
-            contents=improvement_prompt
+            contents=improvement_prompt,
+            stage="ats-improve"
         )
         
-        if response and response.text:
-            improved_latex = response.text.strip()
-            
-            # Clean up the response
-            if improved_latex.startswith("```latex"):
-                improved_latex = improved_latex[8:]
-            if improved_latex.startswith("```"):
-                improved_latex = improved_latex[3:]
-            if improved_latex.endswith("```"):
-                improved_latex = improved_latex[:-3]
-            
-            improved_latex = improved_latex.strip()
-            
-            if improved_latex.startswith("\\documentclass"):
-                # Re-evaluate the improved resume
-                new_score = evaluate_ats_score(client, improved_latex, original_content)
-                logging.info(f"Improved resume ATS score: {new_score}")
-                return improved_latex, new_score
+        improved_latex = apply_improvement(client, response.text if response else None, latex_code, sections, keys)
+        if improved_latex:
+            # Re-evaluate the improved resume
+            new_report = evaluate_ats_report(client, improved_latex, original_content)
+            logging.info(f"Improved resume ATS score: {new_report['total']}")
+            return improved_latex, new_report
         
-        return latex_code, current_score
+        return latex_code, current_report
         
     except Exception as e:
         logging.exception("Exception occurred during resume improvement")
-        return latex_code, current_score
+        return latex_code, current_report
 
-# AI processing functions
+# AI processing functions: the shared steps (resume_steps.py) run with the sync Gemini client
 def process_with_gemini(client, resume_content, job_description=None):
     """Process resume with Gemini AI."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
-    
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        logging.warning("Using mock implementation for resume processing")
-        return mock_process_resume(resume_content, job_description)
-    
-    try:
-        logging.info("Sending resume content to Gemini AI for processing...")
-        job_desc_section = f"\nHere is the job description to tailor the resume:\n```\n{job_description}\n```" if job_description else ""
-        
-        prompt = f"""
-{RESUME_FORMATTER_PROMPT}
-
-LaTeX Template
-{DEFAULT_LATEX_TEMPLATE}
-
-User Resume Content to Format:
-```
-{resume_content}
-```
-
-{job_desc_section}
-"""
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
-
-        if not response.text:
-            logging.error("Error: No response from Gemini AI.")
-            return DEFAULT_LATEX_TEMPLATE
-        
-        logging.info("Gemini AI processing completed.")
-        return response.text.strip()
-
-    except Exception as e:
-        logging.exception("Exception occurred while processing with Gemini AI")
-        return DEFAULT_LATEX_TEMPLATE
-
-def evaluate_resume_job_match(client, latex_code, job_description):
-    """Evaluate resume-job match."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
-    
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        return 6, "Resume appears well-tailored to the job description."
-    
-    try:
-        logging.info("Evaluating resume-job match...")
-        
-        prompt = f"""
-{RESUME_EVALUATOR_PROMPT}
-
-JOB DESCRIPTION:
-```
-{job_description}
-```
-LATEX RESUME:
-```
-{latex_code}
-```
-"""
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", 
-            contents=prompt
-        )
-        
-        if not response.text:
-            logging.error("Error: No response from Gemini AI for evaluation.")
-            return 7, "Unable to evaluate resume-job match."
-        
-        response_text = response.text.strip()
-        
-        # Extract score
-        score_line = next((line for line in response_text.split('\n') if line.startswith('SCORE:')), None)
-        if score_line:
-            try:
-                score = int(score_line.split('SCORE:')[1].strip())
-                score = max(1, min(10, score))
-            except (ValueError, IndexError):
-                score = 7
-        else:
-            score = 7
-        
-        # Extract feedback
-        feedback_parts = response_text.split('FEEDBACK:')
-        if len(feedback_parts) > 1:
-            feedback = feedback_parts[1].strip()
-        else:
-            feedback = "No specific feedback available."
-        
-        logging.info(f"Resume evaluation completed. Score: {score}/10")
-        return score, feedback
-        
-    except Exception as e:
-        logging.exception("Exception occurred during resume evaluation")
-        return 7, f"Unable to evaluate resume-job match due to an error: {str(e)}"
-
-def optimize_resume_for_job(client, latex_code, job_description, feedback):
-    """Optimize resume for better job alignment."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
-    
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        return latex_code
-    
-    try:
-        logging.info("Optimizing resume for better job alignment...")
-        
-        prompt = f"""
-{RESUME_OPTIMIZER_PROMPT}
+    return run_step(client, format_resume(has_ai(client), resume_content, job_description), GEMINI_MODELS)
 
-LaTeX Template Reference:
-Use the provided LaTeX template for formatting but do not return the template itself. Instead, apply its formatting principles to the user's resume content.
+def validate_latex_output(client, latex_code, previous=None):
+    """Check, repair and (section by section) re-request LaTeX from Gemini; None when it holds no LaTeX."""
+    return run_step(client, validate_latex(has_ai(client), latex_code, previous), GEMINI_MODELS)
 
-LaTeX Template:
-{DEFAULT_LATEX_TEMPLATE}
+def evaluate_with_coverage(client, latex_code, job_description):
+    """Keyword coverage first; Gemini only scores resumes that are not clearly a good match. Returns (score, feedback, coverage)."""
+    return run_step(client, evaluate_coverage(has_ai(client), latex_code, job_description), GEMINI_MODELS)
 
-Current LaTeX Resume to Optimize:
-{latex_code}
-
-Job Description:
-{job_description}
-
-Previous Evaluation Feedback (If Available):
-{feedback}
-"""
+def optimize_resume_for_job(client, latex_code, job_description, feedback, use_cache=True, score=None):
+    """Optimize resume for better job alignment, rewriting only the sections the feedback points at."""
+    return run_step(client, optimize_resume(has_ai(client), latex_code, job_description, feedback, use_cache, score), GEMINI_MODELS)
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
-        
-        if not response.text:
-            logging.error("Error: No response from Gemini AI for optimization.")
-            return latex_code
-        
-        optimized_latex = response.text.strip()
-        logging.info("Resume optimization completed.")
-        return optimized_latex
-        
-    except Exception as e:
-        logging.exception("Exception occurred during resume optimization")
-        return latex_code
-
-def generate_cover_letter(client, latex_code, company_name, job_description):
+def generate_cover_letter(client, latex_code, company_name, job_description, use_cache=True):
     """Generate a cover letter based on the resume, company name, and job description."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
-    
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        return "AI processing not available. Please set your API key in Settings."
-    
-    try:
-        logging.info("Generating cover letter with Gemini AI...")
-        
-        # Extract key information from the LaTeX resume
-        lines = latex_code.split('\n')
-        name = "Your Name"
-        email = "your.email@example.com"
-        
-        # Extract name and email from LaTeX code
-        for line in lines:
-            if '\\textbf{\\Huge' in line and 'scshape' in line:
-                # Extract name from LaTeX formatting
-                name_match = line.split('\\textbf{\\Huge \\scshape ')[1].split('}')[0] if '\\textbf{\\Huge \\scshape ' in line else None
-                if name_match:
-                    name = name_match
-            elif 'href{mailto:' in line:
-                # Extract email from LaTeX formatting
-                email_match = line.split('href{mailto:')[1].split('}')[0] if 'href{mailto:' in line else None
-                if email_match:
-                    email = email_match
-        
-        cover_letter_prompt = f"""
-{COVER_LETTER_PROMPT}
-
-CANDIDATE INFORMATION:
-- Name: {name}
-- Email: {email}
-- Company: {company_name}
+    return run_step(client, write_cover_letter(has_ai(client), latex_code, company_name, job_description, use_cache), GEMINI_MODELS)
 
-RESUME CONTENT (LaTeX format):
-{latex_code}
+def analyze_skills(client, latex_code, job_description, use_cache=True):
+    """Current and missing skills locally, recommendations from Gemini; the LaTeX section is kept to 5 categories of 10 skills."""
+    return run_step(client, recommend_skills(has_ai(client), latex_code, job_description, use_cache, 5, 10), GEMINI_MODELS)
 
-JOB DESCRIPTION:
-{job_description}
-"""
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=cover_letter_prompt
-        )
-        
-        if response and response.text:
-            cover_letter = response.text.strip()
-            
-            # Clean up the response
-            if cover_letter.startswith("```"):
-                cover_letter = cover_letter[3:]
-            if cover_letter.endswith("```"):
-                cover_letter = cover_letter[:-3]
-            
-            cover_letter = cover_letter.strip()
-            
-            logging.info("Cover letter generated successfully")
-            return cover_letter
-        else:
-            logging.error("No response received from Gemini AI for cover letter generation")
-            return "Error: Unable to generate cover letter. Please try again."
-            
-    except Exception as e:
-        logging.exception("Exception occurred while generating cover letter with Gemini AI")
-        return f"Error generating cover letter: {str(e)}"
-
-def analyze_skills(client, latex_code, job_description):
-    """Analyze skills and compare with job requirements."""
-    # Check if we have a valid API key
-    api_key = st.session_state.get('api_key', '')
-    env_api_key = os.getenv('GENAI_API_KEY', '')
-    
-    if not client or not HAS_GENAI or (not api_key and not env_api_key):
-        return {
-            "current_skills": ["Unable to analyze skills without AI service"],
-            "missing_skills": [],
-            "recommended_skills": [],
-            "current_skills_by_category": {},
-            "recommended_skills_by_category": {},
-            "latex_skills_section": ""
-        }
+def stream_with_gemini(client, resume_content, job_description=None):
+    """Stream the formatted LaTeX from Gemini chunk by chunk."""
+    if not has_ai(client):
+        logging.warning("Using mock implementation for resume processing")
+        yield mock_process_resume(resume_content, job_description)
+        return
     
+    streamed = False
     try:
-        logging.info("Analyzing skills comparison...")
-        
-        analysis_prompt = f"""
-You are a skilled resume analyzer. Analyze the resume and job description carefully.
-
-Your tasks:
-1. First, identify the profession type and required skill categories
-2. Extract ALL skills from the resume, including those mentioned in project descriptions and experience
-3. Compare with job description requirements
-4. Recommend additional skills based on job market standards
-5. Identify certifications (both current and recommended)
-
-Format your response EXACTLY as follows:
-
-PROFESSION_TYPE:
-[Identify the profession type]
-
-SKILL_CATEGORIES:
-- [List main skill categories relevant to the profession]
-
-CURRENT_SKILLS:
-Technical Skills:
-- [List all technical skills found in resume]
-Security Skills:
-- [List all security-related skills]
-[Other Categories]:
-- [List skills for each relevant category]
-
-CURRENT_CERTIFICATIONS:
-- [List all certifications mentioned in resume]
-
-MISSING_SKILLS:
-- [List skills mentioned in job description but missing from resume]
-
-RECOMMENDED_SKILLS:
-Technical Skills:
-- [List recommended technical skills]
-Security Skills:
-- [List recommended security skills]
-[Other Categories]:
-- [List recommended skills by category]
-
-RECOMMENDED_CERTIFICATIONS:
-- [List recommended certifications based on job requirements and industry standards]
-
-IMPORTANT INSTRUCTIONS:
-1. Include ALL skills mentioned anywhere in the resume
-2. Include skills mentioned in project descriptions and work experience
-3. Do not mark a skill as missing if it's mentioned anywhere in the resume
-4. Group skills logically by category
-5. Be thorough in skill extraction - don't miss any skills
-
-LaTeX Resume:
-{latex_code}
-
-Job Description:
-{job_description}
-"""
-
-        analysis_response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=analysis_prompt
-        )
-        
-        if not analysis_response.text:
-            return {
-                "current_skills": ["Error: No response from AI"],
-                "missing_skills": [],
-                "recommended_skills": [],
-                "current_skills_by_category": {},
-                "recommended_skills_by_category": {},
-                "latex_skills_section": ""
-            }
-        
-        # Parse the analysis response
-        response_text = analysis_response.text.strip()
-        skills_data = {
-            "profession_type": "",
-            "skill_categories": [],
-            "current_skills": [],
-            "current_skills_by_category": {},
-            "current_certifications": [],
-            "missing_skills": [],
-            "recommended_skills": [],
-            "recommended_skills_by_category": {},
-            "recommended_certifications": []
-        }
-        
-        current_section = None
-        current_category = None
-        
-        for line in response_text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            if 'PROFESSION_TYPE:' in line:
-                current_section = "profession_type"
-                skills_data["profession_type"] = line.split('PROFESSION_TYPE:')[1].strip()
-            elif 'SKILL_CATEGORIES:' in line:
-                current_section = "skill_categories"
-            elif 'CURRENT_SKILLS:' in line:
-                current_section = "current_skills"
-                current_category = None
-            elif 'CURRENT_CERTIFICATIONS:' in line:
-                current_section = "current_certifications"
-            elif 'MISSING_SKILLS:' in line:
-                current_section = "missing_skills"
-            elif 'RECOMMENDED_SKILLS:' in line:
-                current_section = "recommended_skills"
-                current_category = None
-            elif 'RECOMMENDED_CERTIFICATIONS:' in line:
-                current_section = "recommended_certifications"
-            elif line.endswith(':') and current_section in ["current_skills", "recommended_skills"]:
-                current_category = line[:-1]
-                if current_section == "current_skills":
-                    skills_data["current_skills_by_category"][current_category] = []
-                else:
-                    skills_data["recommended_skills_by_category"][current_category] = []
-            elif line.startswith('- '):
-                skill = line[2:].strip()
-                if current_section == "skill_categories":
-                    skills_data["skill_categories"].append(skill)
-                elif current_section == "current_skills":
-                    if current_category:
-                        skills_data["current_skills_by_category"][current_category].append(skill)
-                    skills_data["current_skills"].append(skill)
-                elif current_section == "current_certifications":
-                    skills_data["current_certifications"].append(skill)
-                elif current_section == "missing_skills":
-                    skills_data["missing_skills"].append(skill)
-                elif current_section == "recommended_skills":
-                    if current_category:
-                        skills_data["recommended_skills_by_category"][current_category].append(skill)
-                    skills_data["recommended_skills"].append(skill)
-                elif current_section == "recommended_certifications":
-                    skills_data["recommended_certifications"].append(skill)
-
-        # Generate LaTeX skills section
-        latex_template = """%-----------SKILLS and CERTIFICATIONS-----------
-\\section{Professional Skills \\& Certifications}
- \\begin{itemize}[leftmargin=0.15in, label={}]
-    \\small{\\item{
-<SKILLS_BY_CATEGORY>
-     \\textbf{Certifications}{: <CERTS>}
-    }}
- \\end{itemize}"""
-
-        current_skills_text = ""
-        for category, skills in skills_data["current_skills_by_category"].items():
-            if skills:
-                current_skills_text += f"{category}:\n- " + "\n- ".join(skills) + "\n\n"
-
-        recommended_skills_text = ""
-        for category, skills in skills_data["recommended_skills_by_category"].items():
-            if skills:
-                recommended_skills_text += f"{category}:\n- " + "\n- ".join(skills) + " (Recommended)\n\n"
-
-        format_prompt = f"""
-Based on the following skills and certifications analysis for a {skills_data['profession_type']} professional, 
-generate a CONCISE LaTeX skills section using the exact template below.
-
-Current Skills:
-{current_skills_text}
-
-Current Certifications:
-{', '.join(skills_data['current_certifications'])}
-
-Recommended Skills:
-{recommended_skills_text}
-
-Recommended Certifications:
-{', '.join(skills_data['recommended_certifications'])}
-
-Use this exact LaTeX template format:
-{latex_template}
-
-Requirements:
-1. Replace <SKILLS_BY_CATEGORY> with appropriate category sections
-2. For each category, use the format: \\textbf{{Category Name}}{{: skill1, skill2, etc.}} \\\\
-3. Include both current and recommended skills/certifications
-4. Do not mark recommended skills/certifications with any special suffix
-5. Use appropriate line breaks (\\\\) between sections
-6. Escape any special LaTeX characters
-7. ALWAYS include the Certifications section
-8. If no certifications are found, add "No current certifications"
-9. Group similar skills together within each category
-10. Maintain professional formatting and organization
-11. KEEP IT SHORT AND CONCISE - Maximum 4-5  skill categories, 7-10 skills per category
-12. Prioritize the most important/relevant skills for the job
-13. Use abbreviations where appropriate (e.g., "AI/ML" instead of "Artificial Intelligence and Machine Learning")
-14. Focus on key technical skills and certifications only
-15. Avoid redundant or overly detailed skill descriptions
-"""
-
-        latex_response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=format_prompt
-        )
-        
-        if latex_response.text:
-            skills_data["latex_skills_section"] = latex_response.text.strip()
-        else:
-            skills_data["latex_skills_section"] = "Error generating LaTeX skills section"
-
-        return {
-            "current_skills": skills_data["current_skills"],
-            "missing_skills": skills_data["missing_skills"],
-            "recommended_skills": skills_data["recommended_skills"],
-            "current_skills_by_category": skills_data["current_skills_by_category"],
-            "recommended_skills_by_category": skills_data["recommended_skills_by_category"],
-            "latex_skills_section": skills_data["latex_skills_section"]
-        }
-
+        logging.info("Streaming resume content through Gemini AI...")
+        prompt = build_formatter_prompt(resume_content, job_description)
+        for chunk in generate_content_stream(client, model="gemini-2.0-flash", contents=prompt, prefix=FORMATTER_PROMPT_PREFIX, prefix_name="resume_formatter", stage="formatter"):
+            streamed = True
+            yield chunk
+        logging.info("Gemini AI streaming completed.")
     except Exception as e:
-        logging.exception("Error in analyze_skills")
-        return {
-            "current_skills": ["Error analyzing skills: " + str(e)],
-            "missing_skills": [],
-            "recommended_skills": [],
-            "current_skills_by_category": {},
-            "recommended_skills_by_category": {},
-            "latex_skills_section": ""
+        logging.exception("Exception occurred while streaming with Gemini AI")
+    
+    if not streamed:
+        yield DEFAULT_LATEX_TEMPLATE
+
+def write_latex_stream(chunks):
+    """Render streamed LaTeX live with st.write_stream and return the full text."""
+    collected = []
+    def fenced():
+        yield "```latex\n"
+        for chunk in chunks:
+            collected.append(chunk)
+            yield chunk
+        yield "\n```"
+    st.write_stream(fenced())
+    return "".join(collected).strip()
+
+def batch_table(results):
+    """Rows for the batch results table, best score first."""
+    return [
+        {
+            "Rank": rank,
+            "Company": result.get("company_name") or f"Job {result.get('index', 0) + 1}",
+            "Score": result.get("score"),
+            "Optimized": "Yes" if result.get("optimized") else "No",
+            "Feedback": result.get("error") or result.get("feedback", "")
         }
+        for rank, result in enumerate(rank_results(results), start=1)
+    ]
 
 # Main application
 def main():
@@ -1262,6 +684,52 @@ def main():
         st.markdown("---")
         st.markdown("### 📊 App Info")
         st.info("**Developer:** Mohammad Ibrahim Saleem\n\n**Features:**\n- AI-powered resume formatting\n- Job description tailoring\n- Skills analysis\n- LaTeX generation\n- Download functionality")
+        
+        with st.expander("📈 LLM Usage (Admin)"):
+            usage = llm_metrics.summary()
+            if usage:
+                st.metric("Estimated Cost", f"${sum(row['cost_usd'] for row in usage):.4f}")
+                st.metric("Gemini Calls", sum(row["calls"] - row["cache_hits"] for row in usage))
+                st.dataframe(
+                    [
+                        {
+                            "Stage": row["stage"],
+                            "Model": row["model"],
+                            "Calls": row["calls"],
+                            "Cache Hits": row["cache_hits"],
+                            "Errors": row["errors"],
+                            "Tokens In": row["prompt_tokens"],
+                            "Tokens Out": row["output_tokens"],
+                            "Cost ($)": row["cost_usd"],
+                            "Avg (s)": row["avg_latency_s"],
+                            "p95 (s)": row["p95_latency_s"],
+                        }
+                        for row in usage
+                    ],
+                    hide_index=True
+                )
+                if SPECULATIVE_OPTIMIZATION:
+                    speculation_report = speculation_stats.stats()
+                    win_rate = f"{speculation_report['win_rate']:.0%}" if speculation_report["win_rate"] is not None else "n/a"
+                    st.caption(
+                        f"Speculative optimization: {speculation_report['won']} won, {speculation_report['discarded']} discarded, "
+                        f"{speculation_report['failed']} failed (win rate {win_rate}); {speculation_report['saved_seconds']:.1f}s saved"
+                    )
+                if st.button("Reset Counters", key="reset_llm_metrics"):
+                    llm_metrics.reset()
+                    st.rerun()
+            else:
+                st.caption("No Gemini calls recorded yet.")
+        
+        with st.expander("🧠 Session Memory"):
+            memory = st.session_state.resume_store.memory_report()
+            st.metric("Resume Versions", f"{memory['versions']} / {memory['max_versions']}")
+            st.metric("Stored", f"{memory['stored_bytes'] / 1024:.1f} KiB")
+            st.caption(
+                f"Uncompressed: {memory['raw_bytes'] / 1024:.1f} KiB · ratio {memory['compression_ratio'] or '-'}x · "
+                f"{memory['keyframes']} keyframes, {memory['deltas']} deltas, {memory['duplicate_fields']} duplicate fields · "
+                f"{memory['evictions']} versions evicted"
+            )
     
     # Check if API key is properly set
     api_key = st.session_state.get('api_key', '')
@@ -1271,7 +739,7 @@ def main():
         st.stop()
     
     # Main content - Tabbed layout
-    tab1, tab2, tab3 = st.tabs(["📝 Generate Resume", "📊 Skills Analysis", "🎯 Base Resume Generator"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📝 Generate Resume", "📊 Skills Analysis", "🎯 Base Resume Generator", "📦 Batch Tailoring"])
     
     with tab1:
         col1, col2 = st.columns([1, 1])
@@ -1290,16 +758,17 @@ def main():
             
             # Process uploaded file
             if uploaded_file is not None:
-                # Check if this is a new file (not already processed)
-                if not hasattr(st.session_state, 'last_processed_file') or st.session_state.last_processed_file != uploaded_file.name:
+                # Check if this is a new file (by content, not name)
+                file_hash = upload_hash(uploaded_file)
+                if not hasattr(st.session_state, 'last_processed_file') or st.session_state.last_processed_file != file_hash:
                     with st.spinner("Extracting text from uploaded file..."):
-                        extracted_text = process_uploaded_file(uploaded_file)
+                        extracted_text = process_uploaded_file(uploaded_file, file_hash)
                         if extracted_text:
                             st.success(f"✅ Successfully extracted text from {uploaded_file.name}")
                             # Auto-fill the text area with extracted text
                             st.session_state.main_resume_content = extracted_text
                             st.session_state.uploaded_file_name = uploaded_file.name
-                            st.session_state.last_processed_file = uploaded_file.name
+                            st.session_state.last_processed_file = file_hash
                         else:
                             st.error("❌ Failed to extract text from the uploaded file.")
             
@@ -1383,7 +852,7 @@ def main():
                         with st.spinner("🤖 Processing your resume with AI..."):
                             # Set up client
                             if HAS_GENAI:
-                                local_client = genai.Client(api_key=api_key) if api_key else default_client
+                                local_client = client_pool.get(api_key) if api_key else get_default_client()
                                 if not local_client:
                                     st.error("No valid API client available")
                                     st.stop()
@@ -1391,28 +860,54 @@ def main():
                                 local_client = None
                             
                             try:
-                                # Process with Gemini
-                                latex_code = process_with_gemini(local_client, resume_content, job_description)
-                                if not latex_code:
-                                    st.error("Failed to generate LaTeX code")
-                                    st.stop()
-                                
-                                # Evaluate resume
-                                score, feedback = evaluate_resume_job_match(local_client, latex_code, job_description)
-                                
-                                # Analyze skills
-                                skills_analysis = analyze_skills(local_client, latex_code, job_description)
+                                deadline = Deadline()
                                 
-                                optimized = False
-                                optimization_message = ''
+                                def on_quota_wait(seconds, queue_depth):
+                                    st.toast(f"⏳ Waiting {seconds:.0f}s for Gemini quota ({queue_depth} call(s) queued)")
                                 
-                                # Auto-optimize if score is low
-                                if score < 8:
-                                    st.warning(f"Initial score {score}/10 is below threshold. Optimizing resume...")
-                                    latex_code = optimize_resume_for_job(local_client, latex_code, job_description, feedback)
-                                    optimized = True
-                                    optimization_message = 'Optimization was performed automatically because the initial score was low.'
-                                    score, feedback = evaluate_resume_job_match(local_client, latex_code, job_description)
+                                with track_degraded() as degraded, track_quota_wait(on_quota_wait) as quota_wait, bound_by(deadline):
+                                    # Stream the LaTeX from Gemini so it shows up as soon as the first tokens arrive
+                                    latex_code = write_latex_stream(stream_with_gemini(local_client, resume_content, job_description))
+                                    if latex_code and local_client:
+                                        latex_code = validate_latex_output(local_client, latex_code) or latex_code
+                                    if not latex_code:
+                                        st.error("Failed to generate LaTeX code")
+                                        st.stop()
+                                    
+                                    # Optionally start optimizing right away, next to the evaluation (speculation.py)
+                                    speculation = None
+                                    if SPECULATIVE_OPTIMIZATION and has_ai(local_client):
+                                        speculation = Speculation(
+                                            with_script_ctx(optimize_resume_for_job),
+                                            (local_client, latex_code, job_description, speculative_feedback(latex_code, job_description)),
+                                            baseline=latex_code
+                                        )
+                                    
+                                    # Evaluate resume and analyze skills concurrently
+                                    results, incomplete = run_parallel(
+                                        {
+                                            "evaluation": (with_script_ctx(evaluate_with_coverage), (local_client, latex_code, job_description)),
+                                            "skills_analysis": (with_script_ctx(analyze_skills), (local_client, latex_code, job_description)),
+                                        },
+                                        deadline=deadline,
+                                        defaults=EVALUATE_AND_ANALYZE_DEFAULTS
+                                    )
+                                    score, feedback, coverage = results["evaluation"]
+                                    skills_analysis = results["skills_analysis"]
+                                    
+                                    optimized = False
+                                    optimization_message = ''
+                                    
+                                    # Auto-optimize if score is low
+                                    if needs_optimization(score, incomplete, deadline):
+                                        st.warning(f"Initial score {score}/10 is below threshold. Optimizing resume...")
+                                        latex_code = (speculation and speculation.accept(deadline)) or optimize_resume_for_job(
+                                            local_client, latex_code, job_description, feedback_with_uncovered(feedback, coverage), score=score)
+                                        optimized = True
+                                        optimization_message = 'Optimization was performed automatically because the initial score was low.'
+                                        score, feedback, coverage = evaluate_with_coverage(local_client, latex_code, job_description)
+                                    if speculation:
+                                        speculation.discard()
                                 
                                 # Store results
                                 resume_id = str(uuid.uuid4())
@@ -1425,6 +920,8 @@ def main():
                                     "optimization_message": optimization_message,
                                     "company_name": company_name,
                                     "job_description": job_description,
+                                    "degraded_stages": degraded,
+                                    "keyword_coverage": coverage,
                                     "timestamp": datetime.now().isoformat()
                                 }
                                 
@@ -1434,6 +931,18 @@ def main():
                                 if optimized:
                                     st.info("🔄 Resume was automatically optimized to better match the job description.")
                                 
+                                if coverage and coverage["evaluation_skipped"]:
+                                    st.info(f"⚡ Score estimated locally: {coverage['coverage']:.0%} keyword coverage is above the calibrated threshold, so the Gemini evaluation was skipped.")
+                                
+                                if incomplete:
+                                    st.warning(f"⏱️ Some steps did not finish in time and show partial results: {', '.join(incomplete)}")
+                                
+                                if degraded:
+                                    st.warning(f"⚠️ Gemini could not be reached for: {', '.join(degraded)}. Those parts show fallback results; try again shortly.")
+                                
+                                if quota_wait["waited_seconds"] >= 1:
+                                    st.info(f"⏳ Gemini calls waited {quota_wait['waited_seconds']:.0f}s in the rate-limit queue (up to {quota_wait['queue_depth']} queued).")
+                                
                             except Exception as e:
                                 st.error(f"Error processing resume: {str(e)}")
         
@@ -1445,8 +954,10 @@ def main():
                 resume_data = st.session_state.resume_store[st.session_state.current_resume_id]
             
                 # Score and status
-                score = resume_data.get("score", 0)
-                if score >= 8:
+                score = resume_data.get("score")
+                if score is None:
+                    score_class = "score-badge danger"
+                elif score >= 8:
                     score_class = "score-badge"
                 elif score >= 6:
                     score_class = "score-badge warning"
@@ -1457,7 +968,8 @@ def main():
                 col_score, col_status, col_reopt = st.columns([1, 1, 1])
                 
                 with col_score:
-                    st.markdown(f'<div class="{score_class}">Resume Score: {score}/10</div>', unsafe_allow_html=True)
+                    score_text = f"{score}/10" if score is not None else "unavailable"
+                    st.markdown(f'<div class="{score_class}">Resume Score: {score_text}</div>', unsafe_allow_html=True)
                 
                 with col_status:
                     if resume_data.get("optimized"):
@@ -1467,7 +979,7 @@ def main():
                     if st.button("🔄 Re-optimize", key="reoptimize", use_container_width=True):
                         with st.spinner("Re-optimizing resume..."):
                             if HAS_GENAI:
-                                local_client = genai.Client(api_key=api_key) if api_key else default_client
+                                local_client = client_pool.get(api_key) if api_key else get_default_client()
                             else:
                                 local_client = None
                             
@@ -1475,7 +987,8 @@ def main():
                                 local_client, 
                                 resume_data["latex_code"], 
                                 resume_data.get("job_description", ""),
-                                resume_data.get("feedback", "")
+                                resume_data.get("feedback", ""),
+                                use_cache=False
                             )
                             
                             if optimized_latex:
@@ -1537,7 +1050,7 @@ def main():
                             if st.button("🔄 Regenerate Cover Letter", key="regenerate_cover_letter", use_container_width=True):
                                 with st.spinner("🤖 Generating new cover letter..."):
                                     if HAS_GENAI:
-                                        local_client = genai.Client(api_key=api_key) if api_key else default_client
+                                        local_client = client_pool.get(api_key) if api_key else get_default_client()
                                     else:
                                         local_client = None
                                     
@@ -1545,7 +1058,8 @@ def main():
                                         local_client,
                                         latex_code,
                                         resume_data.get('company_name', ''),
-                                        resume_data.get('job_description', '')
+                                        resume_data.get('job_description', ''),
+                                        use_cache=False
                                     )
                                     
                                     if new_cover_letter and not new_cover_letter.startswith("Error"):
@@ -1560,7 +1074,7 @@ def main():
                         if st.button("📝 Generate Cover Letter", key="generate_cover_letter", use_container_width=True):
                             with st.spinner("🤖 Generating cover letter..."):
                                 if HAS_GENAI:
-                                    local_client = genai.Client(api_key=api_key) if api_key else default_client
+                                    local_client = client_pool.get(api_key) if api_key else get_default_client()
                                 else:
                                     local_client = None
                                 
@@ -1614,7 +1128,7 @@ def main():
                         if st.button("🔄 Regenerate Skills", key="regen_skills", use_container_width=True):
                             with st.spinner("Regenerating skills section..."):
                                 if HAS_GENAI:
-                                    local_client = genai.Client(api_key=api_key) if api_key else default_client
+                                    local_client = client_pool.get(api_key) if api_key else get_default_client()
                                 else:
                                     local_client = None
                                 
@@ -1622,11 +1136,13 @@ def main():
                                 new_skills_analysis = analyze_skills(
                                     local_client, 
                                     resume_data.get("latex_code", ""), 
-                                    resume_data.get("job_description", "")
+                                    resume_data.get("job_description", ""),
+                                    use_cache=False
                                 )
                                 
-                                # Update stored data
-                                st.session_state.resume_store[st.session_state.current_resume_id]["skills_analysis"] = new_skills_analysis
+                                # Update stored data (reads return a copy, so store the record again)
+                                resume_data["skills_analysis"] = new_skills_analysis
+                                st.session_state.resume_store[st.session_state.current_resume_id] = resume_data
                                 
                                 st.success("Skills section regenerated successfully!")
                                 st.rerun()
@@ -1698,16 +1214,17 @@ def main():
             
             # Process uploaded file for base resume
             if uploaded_base_file is not None:
-                # Check if this is a new file (not already processed)
-                if not hasattr(st.session_state, 'last_processed_base_file') or st.session_state.last_processed_base_file != uploaded_base_file.name:
+                # Check if this is a new file (by content, not name)
+                base_file_hash = upload_hash(uploaded_base_file)
+                if not hasattr(st.session_state, 'last_processed_base_file') or st.session_state.last_processed_base_file != base_file_hash:
                     with st.spinner("Extracting text from uploaded file..."):
-                        extracted_text = process_uploaded_file(uploaded_base_file)
+                        extracted_text = process_uploaded_file(uploaded_base_file, base_file_hash)
                         if extracted_text:
                             st.success(f"✅ Successfully extracted text from {uploaded_base_file.name}")
                             # Auto-fill the text area with extracted text
                             st.session_state.base_resume_content = extracted_text
                             st.session_state.uploaded_base_file_name = uploaded_base_file.name
-                            st.session_state.last_processed_base_file = uploaded_base_file.name
+                            st.session_state.last_processed_base_file = base_file_hash
                         else:
                             st.error("❌ Failed to extract text from the uploaded file.")
             
@@ -1743,7 +1260,7 @@ def main():
                     with st.spinner("🤖 Creating your optimized base resume..."):
                         # Set up client
                         if HAS_GENAI:
-                            local_client = genai.Client(api_key=api_key) if api_key else default_client
+                            local_client = client_pool.get(api_key) if api_key else get_default_client()
                             if not local_client:
                                 st.error("No valid API client available")
                                 st.stop()
@@ -1751,13 +1268,14 @@ def main():
                             local_client = None
                         
                         # Generate base resume
-                        base_latex_code, ats_score = generate_base_resume(local_client, base_resume_content)
+                        base_latex_code, ats_report = generate_base_resume(local_client, base_resume_content)
                         
                         if base_latex_code and base_latex_code != "AI processing not available. Please set your API key in Settings.":
                             # Check if ATS score is too low and improve if needed
-                            if ats_score < 80:
-                                st.warning(f"⚠️ Initial ATS score: {ats_score}/100. Improving resume...")
-                                base_latex_code, ats_score = improve_ats_resume(local_client, base_latex_code, base_resume_content, ats_score)
+                            if ats_report["total"] < 80:
+                                st.warning(f"⚠️ Initial ATS score: {ats_report['total']}/100. Improving resume...")
+                                base_latex_code, ats_report = improve_ats_resume(local_client, base_latex_code, base_resume_content, ats_report)
+                            ats_score = ats_report["total"]
                             
                             # Store the generated base resume
                             base_resume_id = str(uuid.uuid4())
@@ -1766,6 +1284,7 @@ def main():
                                 "company_name": "base_resume",
                                 "job_description": "Base resume optimized for ATS systems",
                                 "score": ats_score,  # Actual ATS score
+                                "ats_report": ats_report,  # Breakdown behind the score
                                 "feedback": f"Base resume generated with ATS score: {ats_score}/100",
                                 "optimized": ats_score >= 80,
                                 "optimization_message": f"Base resume optimized for ATS systems. Final ATS score: {ats_score}/100",
@@ -1806,6 +1325,14 @@ def main():
                 st.markdown(f'<div class="{score_class}">ATS Score: {ats_score}/100</div>', unsafe_allow_html=True)
                 st.markdown(status_badge, unsafe_allow_html=True)
                 
+                with st.expander("📊 ATS Score Breakdown", expanded=False):
+                    # The stored report is the one the headline score came from; older entries are rescored locally
+                    ats_report = base_resume_data.get("ats_report") or score_resume(base_resume_data.get("latex_code", ""))
+                    for category, details in ats_report["breakdown"].items():
+                        st.markdown(f"**{category.replace('_', ' ').title()}:** {details['score']}/{details['max']}")
+                        for note in details["notes"]:
+                            st.markdown(f"• {note}")
+                
                 # User Feedback Section
                 st.markdown("### 📝 Provide Feedback to Improve Resume")
                 st.markdown("Share specific feedback about the resume (like Resume Worded feedback) and we'll regenerate it to address those issues.")
@@ -1824,7 +1351,7 @@ def main():
                             with st.spinner("🤖 Regenerating resume based on your feedback..."):
                                 # Set up client
                                 if HAS_GENAI:
-                                    local_client = genai.Client(api_key=api_key) if api_key else default_client
+                                    local_client = client_pool.get(api_key) if api_key else get_default_client()
                                     if not local_client:
                                         st.error("No valid API client available")
                                         st.stop()
@@ -1832,18 +1359,20 @@ def main():
                                     local_client = None
                                 
                                 # Regenerate based on feedback
-                                improved_latex, new_score = improve_base_resume_with_feedback(
+                                improved_latex, new_report = improve_base_resume_with_feedback(
                                     local_client, 
                                     base_resume_data["latex_code"], 
                                     st.session_state.get('base_resume_content', ''),
                                     user_feedback,
-                                    base_resume_data.get("score", 0)
+                                    base_resume_data.get("ats_report") or dict(EMPTY_ATS_REPORT, total=base_resume_data.get("score", 0))
                                 )
+                                new_score = new_report["total"]
                                 
-                                if improved_latex:
+                                if improved_latex and improved_latex != base_resume_data["latex_code"]:
                                     # Update the stored resume data
                                     base_resume_data["latex_code"] = improved_latex
                                     base_resume_data["score"] = new_score
+                                    base_resume_data["ats_report"] = new_report
                                     base_resume_data["feedback"] = f"Resume regenerated based on user feedback. New ATS score: {new_score}/100"
                                     base_resume_data["optimization_message"] = f"Resume improved based on your feedback. ATS score improved from {base_resume_data.get('score', 0)} to {new_score}/100"
                                     st.session_state.resume_store[st.session_state.current_base_resume_id] = base_resume_data
@@ -1851,7 +1380,7 @@ def main():
                                     st.success(f"✅ Resume regenerated successfully! New ATS Score: {new_score}/100")
                                     st.rerun()
                                 else:
-                                    st.error("❌ Failed to regenerate resume. Please try again.")
+                                    st.error("❌ The resume could not be regenerated from your feedback, so it is unchanged. Please try again.")
                         else:
                             st.error("Please provide feedback first.")
                 
@@ -1887,6 +1416,77 @@ def main():
             else:
                 st.info("👆 Fill in the form on the left to generate your base resume")
     
+    with tab4:
+        st.markdown("## 📦 Batch Tailoring")
+        st.markdown("Tailor one resume against several job descriptions at once. Results are ranked by match score as they complete.")
+        
+        batch_resume_content = st.text_area(
+            "Resume Content",
+            value=st.session_state.main_resume_content,
+            height=250,
+            placeholder="Paste your resume content here, or upload a file in the Generate Resume tab...",
+            key="batch_resume_content"
+        )
+        
+        st.markdown(f"### 💼 Jobs (up to {BATCH_MAX_JOBS})")
+        batch_jobs = st.data_editor(
+            [{"Company Name": "", "Job Description": ""}],
+            num_rows="dynamic",
+            use_container_width=True,
+            key="batch_jobs_editor"
+        )
+        
+        if st.button("🚀 Tailor for All Jobs", type="primary", key="run_batch", use_container_width=True):
+            jobs = [
+                {"company_name": (row.get("Company Name") or "").strip(), "job_description": (row.get("Job Description") or "").strip()}
+                for row in batch_jobs
+            ]
+            jobs = [job for job in jobs if job["job_description"]]
+            
+            if not batch_resume_content:
+                st.error("Please provide your resume content.")
+            elif not jobs:
+                st.error("Please add at least one job description.")
+            elif len(jobs) > BATCH_MAX_JOBS:
+                st.error(f"A batch can contain at most {BATCH_MAX_JOBS} jobs.")
+            else:
+                if HAS_GENAI:
+                    local_client = client_pool.get(api_key) if api_key else get_default_client()
+                    if not local_client:
+                        st.error("No valid API client available")
+                        st.stop()
+                else:
+                    local_client = None
+                
+                ai = has_ai(local_client)
+                run_one = with_script_ctx(lambda job: run_step(local_client, tailor_resume(ai, batch_resume_content, job), GEMINI_MODELS))
+                progress = st.progress(0.0, text=f"Tailoring 0/{len(jobs)} resumes...")
+                table_placeholder = st.empty()
+                results = []
+                for index, result in run_batch(run_one, jobs):
+                    result["index"] = index
+                    results.append(result)
+                    progress.progress(len(results) / len(jobs), text=f"Tailoring {len(results)}/{len(jobs)} resumes...")
+                    table_placeholder.dataframe(batch_table(results), use_container_width=True, hide_index=True)
+                
+                progress.empty()
+                table_placeholder.empty()
+                st.session_state.batch_results = results
+                st.success(f"✅ Tailored {len(results)} resumes!")
+        
+        if st.session_state.batch_results:
+            st.markdown("### 🏆 Ranked Results")
+            st.dataframe(batch_table(st.session_state.batch_results), use_container_width=True, hide_index=True)
+            
+            st.download_button(
+                label="📥 Download All LaTeX Files (.zip)",
+                data=build_latex_zip(st.session_state.batch_results),
+                file_name="tailored_resumes.zip",
+                mime="application/zip",
+                key="download_batch_zip",
+                use_container_width=True
+            )
+    
     # Footer
     st.markdown("---")
     st.markdown(
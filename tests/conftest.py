@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests run offline: the mock Gemini backend, and no calibration samples written to the repo
+os.environ.setdefault("GENAI_BACKEND", "mock")
+os.environ.setdefault("GENAI_API_KEY", "test")
+os.environ.setdefault("COVERAGE_DB_PATH", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+from ats_scorer import ATS_CATEGORIES, latex_to_text, score_resume
+
+RESUME = r"""
+\documentclass{article}
+% \includegraphics{photo} in a comment is ignored
+\begin{document}
+{\Huge Jane Doe} \\ jane@example.com $|$ 555-123-4567 $|$ \href{https://linkedin.com/in/jane}{linkedin.com/in/jane}
+\section{Experience}
+\resumeItem{Built a billing service in Python that cut invoice errors by 40\% across 3 regions}
+\resumeItem{Led a migration of 12 services to Kubernetes, reducing deploy time from 2 hours to 10 minutes}
+\resumeItem{Designed caching for the search API, serving 5M requests per day at 30 ms p95}
+Jan 2020 -- Present
+\section{Education}
+State University, B.S. Computer Science, May 2019
+\section{Skills}
+Languages: Python, Go, SQL, Kubernetes, Docker, PostgreSQL
+\end{document}
+"""
+
+
+def test_score_is_deterministic_and_complete():
+    first = score_resume(RESUME, "Python and Kubernetes engineer")
+    assert first == score_resume(RESUME, "Python and Kubernetes engineer")
+    assert set(first["breakdown"]) == set(ATS_CATEGORIES)
+    assert 1 <= first["total"] <= 100
+    for category, item in first["breakdown"].items():
+        assert 0 <= item["score"] <= item["max"] == ATS_CATEGORIES[category]
+
+
+def test_contact_sections_and_metrics():
+    breakdown = score_resume(RESUME)["breakdown"]
+    assert breakdown["contact_info"]["score"] == 8
+    assert breakdown["sections"]["score"] == 6
+    assert breakdown["formatting"]["score"] == 10
+    assert breakdown["quantified_impact"]["score"] == 20
+    assert breakdown["education"]["score"] == 2
+
+
+def test_missing_contact_and_sections_are_noted():
+    breakdown = score_resume("\\begin{document}\\section{Hobbies}Chess\\end{document}")["breakdown"]
+    assert breakdown["contact_info"]["score"] == 0
+    assert "No email address found" in breakdown["contact_info"]["notes"]
+    assert "Missing a standard 'Experience' section" in breakdown["sections"]["notes"]
+    assert "Non-standard headings: hobbies" in breakdown["sections"]["notes"]
+
+
+def test_layout_and_date_penalties():
+    latex = RESUME.replace("\\section{Skills}", "\\begin{tabular}{ll}\\end{tabular}\\section{Skills}").replace(
+        "May 2019", "05/2019")
+    breakdown = score_resume(latex)["breakdown"]
+    assert breakdown["formatting"]["score"] == 7
+    assert "Risky layout element: tables used for layout" in breakdown["formatting"]["notes"]
+    assert "Mixed date formats (Month YYYY and MM/YYYY)" in breakdown["parsing"]["notes"]
+
+
+def test_repeated_verbs_and_weak_phrases():
+    bullets = "\n".join(f"\\resumeItem{{Managed the team of {n} engineers}}" for n in range(3))
+    latex = f"\\begin{{document}}\\section{{Experience}}{bullets}\\resumeItem{{Helped with hiring}}\\end{{document}}"
+    item = score_resume(latex)["breakdown"]["action_verbs"]
+    assert item["score"] == 15 - (6 + 2) - 2
+    assert "'Managed' used 3 times" in item["notes"]
+
+
+def test_skills_that_miss_the_job_description_lose_points():
+    assert score_resume(RESUME, "Python engineer")["breakdown"]["skills"]["score"] == 5
+    assert score_resume(RESUME, "Accountant")["breakdown"]["skills"]["score"] == 3
+
+
+def test_empty_resume_only_keeps_the_penalty_based_points():
+    breakdown = score_resume("")["breakdown"]
+    assert breakdown["contact_info"]["score"] == 0
+    assert breakdown["quantified_impact"]["score"] == 0
+    assert breakdown["bullet_quality"]["score"] == 0
+    assert "No dates found" in breakdown["parsing"]["notes"]
+
+
+def test_latex_to_text():
+    assert latex_to_text(r"\textbf{Python} \& Go, 40\% \\ \href{x}{site}") == "Python & Go, 40% site"
@@ -0,0 +1,45 @@
+import time
+import threading
+
+from batch import build_latex_zip, latex_filename, rank_results, run_batch
+
+
+def test_results_and_failures_are_yielded_by_index():
+    def run_one(job):
+        if job["job_description"] == "bad":
+            raise ValueError("boom")
+        return {"company_name": job["company_name"], "score": 7}
+
+    jobs = [{"company_name": "A", "job_description": "ok"}, {"company_name": "B", "job_description": "bad"}]
+    results = dict(run_batch(run_one, jobs, max_concurrency=2))
+    assert results[0] == {"company_name": "A", "score": 7}
+    assert results[1] == {"company_name": "B", "score": 0, "error": "boom"}
+
+
+def test_closing_the_batch_cancels_jobs_that_have_not_started():
+    release = threading.Event()
+    started = []
+
+    def run_one(job):
+        started.append(job)
+        if job != 0:
+            release.wait(5)
+        return {"score": job}
+
+    batch = run_batch(run_one, list(range(10)), max_concurrency=2)
+    assert next(batch) == (0, {"score": 0})
+    batch.close()
+    release.set()
+    time.sleep(0.2)
+    # Job 0 finished and job 1 was running; at most one more worker slot was free before the close
+    assert len(started) <= 3
+
+
+def test_rank_and_zip():
+    results = [{"company_name": "Acme Co", "score": 5, "index": 0, "latex_code": "a"},
+               {"company_name": "", "score": None, "index": 1},
+               {"company_name": "Beta", "score": 9, "index": 2, "latex_code": "b"}]
+    assert [result["index"] for result in rank_results(results)] == [2, 0, 1]
+    assert latex_filename("Acme Co", 0) == "01_Acme_Co.tex"
+    assert latex_filename("", 1) == "02_job.tex"
+    assert build_latex_zip(results).startswith(b"PK")
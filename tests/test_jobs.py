@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(path=str(tmp_path / "jobs.sqlite3"))
+
+
+def wait_for(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] not in (QUEUED, RUNNING):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def set_owner(store, job_id, owner):
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE jobs SET owner = ? WHERE id = ?", (owner, job_id))
+
+
+def test_job_records_progress_and_result(store):
+    queue = JobQueue(store, max_workers=1)
+
+    def work(progress, name):
+        progress("formatting", "Generating LaTeX...")
+        return {"hello": name}
+
+    job = wait_for(queue, queue.submit("test", work, "jane"))
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"hello": "jane"}
+    assert [stage["stage"] for stage in job["stages"]] == ["formatting"]
+
+
+def test_failing_job_reports_the_error(store):
+    queue = JobQueue(store, max_workers=1)
+
+    def work(progress):
+        raise ValueError("bad input")
+
+    job = wait_for(queue, queue.submit("test", work))
+    assert job["status"] == FAILED
+    assert job["error"] == "bad input"
+
+
+def test_full_queue_refuses_new_jobs(store):
+    queue = JobQueue(store, max_workers=1, max_pending=1)
+    release = threading.Event()
+    job_id = queue.submit("test", lambda progress: release.wait(5))
+    try:
+        assert queue.submit("test", lambda progress: None) is None
+    finally:
+        release.set()
+    assert wait_for(queue, job_id)["status"] == SUCCEEDED
+
+
+def test_job_left_by_this_process_is_failed_as_orphaned(store):
+    # A record this process owns but is not running, e.g. from before a restart with the same pid
+    store.create("orphan", "test")
+    job = JobQueue(store).get("orphan")
+    assert job["status"] == FAILED
+    assert "interrupted by a server restart" in job["error"]
+
+
+def test_job_of_a_dead_process_on_this_host_is_failed(store):
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    store.create("dead", "test")
+    set_owner(store, "dead", f"{socket.gethostname()}:{process.pid}")
+    assert JobQueue(store).get("dead")["status"] == FAILED
+
+
+@pytest.mark.skipif(os.name == "nt", reason="owner liveness is not checked on Windows")
+def test_job_of_a_live_process_is_left_running(store):
+    store.create("alive", "test")
+    set_owner(store, "alive", f"{socket.gethostname()}:{os.getppid()}")
+    assert JobQueue(store).get("alive")["status"] == QUEUED
+
+
+def test_job_owned_by_another_host_is_left_running(store):
+    store.create("remote", "test")
+    set_owner(store, "remote", "some-other-host:1")
+    assert JobQueue(store).get("remote")["status"] == QUEUED
+
+
+def test_orphan_check_does_not_overwrite_a_finished_job(store):
+    store.create("done", "test")
+    store.finish("done", {"ok": True})
+    store.fail("done", "interrupted", only_pending=True)
+    job = JobQueue(store).get("done")
+    assert job["status"] == SUCCEEDED
+    assert job["error"] is None
+
+
+def test_expired_finished_jobs_are_purged(tmp_path):
+    store = JobStore(path=str(tmp_path / "jobs.sqlite3"), ttl=0)
+    store.create("old", "test")
+    store.finish("old", {})
+    time.sleep(0.01)
+    store.create("new", "test")
+    assert store.get("old") is None
+    assert store.get("new")["status"] == QUEUED
@@ -0,0 +1,97 @@
+import pytest
+
+from keyword_coverage import (
+    RECALIBRATE_EVERY, TARGET_SCORE, CoverageCalibration, calibrate, coverage_report, feedback_with_uncovered,
+    local_feedback, tokenize,
+)
+
+
+def test_tokens_keep_technology_names():
+    assert [token for clause in tokenize("Node.js, C++ and CI/CD") for token in clause if token] == [
+        ("node.js", "node.js"), ("c++", "c++"), ("ci/cd", "ci/cd")]
+
+
+def test_coverage_counts_the_job_terms_found_in_the_resume():
+    report = coverage_report("Built APIs in Python and Kubernetes", "Python and Kubernetes. Python, Terraform.")
+    assert report["terms"] == 3
+    assert report["covered"] == 2
+    assert report["uncovered"] == ["terraform"]
+    assert 0.5 < report["coverage"] < 1
+
+
+def test_split_phrase_earns_half_credit():
+    # "machine learning" weighs 2.0625, each word 1.375; the phrase only gets half of its weight
+    report = coverage_report("machine and learning", "Machine learning. Machine learning.")
+    assert report["uncovered"] == ["machine learning"]
+    assert report["coverage"] == pytest.approx((2 * 1.375 + 0.5 * 2.0625) / (2 * 1.375 + 2.0625), abs=1e-4)
+
+
+def test_empty_job_description_has_no_coverage():
+    assert coverage_report("Python", "") == {"coverage": 0.0, "uncovered": [], "terms": 0, "covered": 0}
+
+
+def test_feedback_lists_the_uncovered_terms():
+    report = {"coverage": 0.9, "uncovered": ["terraform", "go"]}
+    assert feedback_with_uncovered("Quantify bullets.", report).endswith(": terraform, go")
+    assert feedback_with_uncovered("Quantify bullets.", {"uncovered": []}) == "Quantify bullets."
+    assert local_feedback(report, 9).startswith("Estimated 9/10 from keyword coverage: 90%")
+
+
+def test_calibration_needs_enough_samples():
+    result = calibrate([(0.9, 9)] * 5, min_samples=30)
+    assert result["threshold"] is None
+    assert result["samples"] == 5
+
+
+def test_calibration_picks_the_lowest_precise_threshold():
+    samples = [(0.9, 9)] * 40 + [(0.2, 4)] * 10
+    result = calibrate(samples, min_samples=30, precision=0.95)
+    assert result["threshold"] == 0.9
+    assert result["estimated_score"] == 9
+    assert result["precision"] == 1.0
+    assert result["samples_above"] == 40
+    assert result["correlation"] == pytest.approx(1.0)
+
+
+def test_calibration_rejects_thresholds_below_the_precision():
+    samples = [(0.9, 9)] * 20 + [(0.95, 5)] * 20
+    assert calibrate(samples, min_samples=30, precision=0.95)["threshold"] is None
+
+
+def test_estimated_score_is_at_least_the_target():
+    result = calibrate([(0.9, 10)] * 40, min_samples=30, precision=0.95)
+    assert result["estimated_score"] == 10
+    result = calibrate([(0.9, TARGET_SCORE)] * 40, min_samples=30, precision=0.95)
+    assert result["estimated_score"] == TARGET_SCORE
+
+
+@pytest.fixture
+def calibration(tmp_path):
+    return CoverageCalibration(path=str(tmp_path / "coverage.sqlite3"), skip_threshold="auto")
+
+
+def test_skip_estimate_after_enough_recorded_scores(calibration):
+    assert calibration.skip_estimate(0.95) is None
+    for _ in range(40):
+        calibration.record(0.9, 9)
+    calibration.record(0.9, None)
+    assert calibration.recorded == 40
+    assert calibration.skip_estimate(0.95) == 9
+    assert calibration.skip_estimate(0.5) is None
+    assert calibration.stats()["evaluations_skipped"] == 1
+
+
+def test_calibration_is_refreshed_only_after_new_samples(calibration):
+    first = calibration.calibration()
+    assert calibration.calibration() is first
+    for _ in range(RECALIBRATE_EVERY):
+        calibration.record(0.5, 6)
+    assert calibration.calibration() is not first
+
+
+def test_fixed_and_disabled_thresholds(tmp_path):
+    fixed = CoverageCalibration(path=str(tmp_path / "fixed.sqlite3"), skip_threshold="0.8")
+    assert fixed.skip_estimate(0.85) == TARGET_SCORE
+    assert fixed.skip_estimate(0.75) is None
+    assert CoverageCalibration(path=str(tmp_path / "off.sqlite3"), skip_threshold="off").skip_estimate(1.0) is None
+    assert CoverageCalibration(path="", skip_threshold="0.1").skip_estimate(1.0) is None
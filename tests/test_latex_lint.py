@@ -0,0 +1,102 @@
+from latex_lint import apply_section_repairs, format_issues, lint_latex, repair_latex
+
+DOCUMENT = r"""\documentclass{article}
+\begin{document}
+\section{Experience}
+\begin{itemize}
+\item Cut costs by 40% at R&D_team
+\end{itemize}
+\section{Skills}
+Python
+\end{document}
+"""
+
+CLEAN = DOCUMENT.replace("40%", "40\\%").replace("R&D_team", "R\\&D\\_team")
+
+
+def codes(issues):
+    return [issue["code"] for issue in issues]
+
+
+def test_clean_document_is_left_alone():
+    text, report = repair_latex(CLEAN)
+    assert text == CLEAN
+    assert report["fixed"] == [] and report["issues"] == [] and report["broken_sections"] == []
+    assert lint_latex(CLEAN) == []
+
+
+def test_code_fences_and_surrounding_prose_are_removed():
+    text, report = repair_latex("Here is your resume:\n```latex\n" + DOCUMENT + "```\nGood luck!")
+    assert text == CLEAN
+    assert codes(report["fixed"]) == ["code_fence", "surrounding_text", "surrounding_text", "unescaped_character"]
+    assert report["fixed"][-1]["section"] == "experience"
+    assert report["issues"] == []
+
+
+def test_specials_are_flagged_then_escaped():
+    # A bare % would comment out the rest of the line, so the lint only sees & and _ without it
+    unescaped = CLEAN.replace("R\\&D\\_team", "R&D_team")
+    issues = lint_latex(unescaped)
+    assert codes(issues) == ["unescaped_character", "unescaped_character"]
+    assert {issue["section"] for issue in issues} == {"experience"}
+    assert repair_latex(unescaped)[0] == CLEAN
+
+
+def test_truncated_document_is_closed_and_its_last_section_reported():
+    text, report = repair_latex(DOCUMENT.split("\\end{itemize}")[0])
+    assert text.rstrip().endswith("\\end{itemize}\n\\end{document}")
+    assert "truncated" in codes(report["fixed"])
+    assert report["broken_sections"] == ["experience"]
+
+
+def test_missing_preamble_is_added_from_the_template():
+    text, report = repair_latex("\\section{Skills}\nPython\n\\end{document}\n")
+    assert "\\documentclass" in text
+    assert text.endswith("\\begin{document}\n\\section{Skills}\nPython\n\\end{document}\n")
+    assert "missing_preamble" in codes(report["fixed"])
+
+
+def test_prose_is_not_latex():
+    text, report = repair_latex("I could not format this resume.")
+    assert text == "I could not format this resume."
+    assert report["not_latex"] is True
+    assert codes(report["issues"]) == ["not_latex"]
+
+
+BROKEN = CLEAN.replace("Python", "\\unknownmacro{Python}")
+
+
+def broken_report():
+    text, report = repair_latex(BROKEN)
+    assert text == BROKEN and report["broken_sections"] == ["skills"]
+    return report
+
+
+def test_valid_rewrite_is_spliced_in():
+    latex, report = apply_section_repairs(BROKEN, broken_report(), {"skills": "\\section{Skills}\nPython, Go_lang"})
+    assert "Python, Go\\_lang" in latex and "\\unknownmacro" not in latex
+    assert report["rerequested"] == ["skills"] and report["restored"] == []
+    assert report["issues"] == []
+
+
+def test_invalid_rewrite_falls_back_to_the_previous_section():
+    rewrites = {"skills": "\\section{Skills}\n\\stillunknown{Python}"}
+    latex, report = apply_section_repairs(BROKEN, broken_report(), rewrites, previous=CLEAN)
+    assert latex == CLEAN
+    assert report["rerequested"] == [] and report["restored"] == ["skills"]
+    assert report["issues"] == []
+
+
+def test_section_without_a_fix_stays_and_is_still_reported():
+    latex, report = apply_section_repairs(BROKEN, broken_report(), {})
+    assert latex == BROKEN
+    assert report["rerequested"] == [] and report["restored"] == []
+    assert report["broken_sections"] == ["skills"]
+
+
+def test_format_issues_names_section_and_line():
+    lines = format_issues(lint_latex(BROKEN)).splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith("- [skills] line ")
+    assert "\\unknownmacro is not defined by the template" in lines[0]
+    assert format_issues([{"code": "truncated", "message": "Cut off", "section": None, "line": None}]) == "- [document]: Cut off"
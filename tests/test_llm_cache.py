@@ -0,0 +1,102 @@
+import pytest
+
+import llm_cache
+from llm_cache import MemoryCache, ResponseCache, SQLiteCache, cache_key
+
+
+class Clock:
+    """Replaces the time module in llm_cache so entries can be aged without sleeping."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path, clock):
+    def create(max_entries=3, ttl=60):
+        if request.param == "sqlite":
+            return SQLiteCache(path=str(tmp_path / "cache.sqlite3"), max_entries=max_entries, ttl=ttl)
+        return MemoryCache(max_entries=max_entries, ttl=ttl)
+    return create
+
+
+def test_cache_key_depends_on_model_and_contents():
+    assert cache_key("flash", "prompt") == cache_key("flash", "prompt")
+    assert cache_key("flash", "prompt") != cache_key("pro", "prompt")
+    assert cache_key("flash", {"b": 1, "a": 2}) == cache_key("flash", {"a": 2, "b": 1})
+
+
+def test_memory_cache_evicts_the_least_recently_used_entry(clock):
+    cache = MemoryCache(max_entries=3, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+    assert cache.get("a") == "A"
+    cache.set("d", "D")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["A", "C", "D"]
+    cache.set("e", "E")
+    assert cache.get("a") is None and len(cache) == 3
+
+
+def test_sqlite_cache_evicts_the_oldest_entry(tmp_path, clock):
+    cache = SQLiteCache(path=str(tmp_path / "cache.sqlite3"), max_entries=2, ttl=60)
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        cache.set(key, key.upper())
+    assert cache.get("a") is None
+    assert [cache.get(key) for key in ("b", "c")] == ["B", "C"] and len(cache) == 2
+
+
+def test_entries_expire_after_the_ttl(backend, clock):
+    cache = backend(ttl=60)
+    cache.set("key", "value")
+    clock.now += 60
+    assert cache.get("key") == "value"
+    clock.now += 1
+    assert cache.get("key") is None
+
+
+def test_sqlite_cache_is_shared_through_the_file(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path=path).set("key", "value")
+    assert SQLiteCache(path=path).get("key") == "value"
+
+
+def test_response_cache_counts_hits_and_misses(backend):
+    cache = ResponseCache(backend())
+    assert cache.get("key") is None
+    cache.set("key", "value")
+    cache.set("empty", "")
+    assert cache.get("key") == "value"
+    assert cache.get("empty") is None
+    assert cache.stats() == {"backend": type(cache.backend).__name__, "hits": 1, "misses": 2, "hit_rate": 0.3333, "entries": 1}
+
+
+def test_backend_errors_count_as_misses():
+    class Broken:
+        def get(self, key):
+            raise OSError("disk full")
+
+        def __len__(self):
+            return 0
+
+    cache = ResponseCache(Broken())
+    assert cache.get("key") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_disabled_cache_counts_nothing():
+    cache = ResponseCache(None)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+    assert cache.stats() == {"backend": "disabled", "hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
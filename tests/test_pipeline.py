@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from gemini_client import generate_content
+from pipeline import Deadline, DeadlineExceeded, bound_by, current_deadline, run_parallel, submit
+from resilience import Resilience
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class Models:
+    def __init__(self):
+        self.configs = []
+
+    def generate_content(self, model, contents, config=None):
+        self.configs.append(config)
+        return Response("ok")
+
+
+class Client:
+    def __init__(self):
+        self.models = Models()
+
+
+class APIError(Exception):
+    code = 503
+
+
+def test_run_parallel_falls_back_for_stages_that_miss_the_deadline():
+    results, incomplete = run_parallel(
+        {"fast": (lambda: "done", ()), "slow": (time.sleep, (1,))},
+        deadline=Deadline(0.1),
+        defaults={"slow": "fallback"}
+    )
+    assert results == {"fast": "done", "slow": "fallback"}
+    assert incomplete == ["slow"]
+
+
+def test_bound_by_follows_work_onto_the_pool():
+    deadline = Deadline(60)
+    with bound_by(deadline):
+        assert submit(current_deadline).result() is deadline
+    assert current_deadline() is None
+
+
+def test_calls_get_the_time_left_as_their_timeout():
+    client = Client()
+    generate_content(client, "model", "prompt", use_cache=False)
+    assert client.models.configs[-1] is None
+
+    with bound_by(Deadline(30)):
+        generate_content(client, "model", "prompt", use_cache=False, config={"temperature": 0})
+    config = client.models.configs[-1]
+    assert config["temperature"] == 0
+    assert 29000 <= config["http_options"]["timeout"] <= 30000
+
+
+def test_no_call_starts_after_the_deadline():
+    client = Client()
+    with bound_by(Deadline(0)):
+        with pytest.raises(DeadlineExceeded):
+            generate_content(client, "model", "prompt", use_cache=False)
+    assert client.models.configs == []
+
+
+def test_retries_stop_when_the_backoff_would_outlast_the_deadline(monkeypatch):
+    policy = Resilience(max_retries=5, backoff_base=10, backoff_max=10, failure_threshold=100)
+    monkeypatch.setattr(policy, "backoff", lambda attempt, error=None: 10.0)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise APIError()
+
+    with bound_by(Deadline(5)):
+        with pytest.raises(APIError):
+            policy.call(Client(), fn)
+    assert len(calls) == 1 and policy.retries == 0
@@ -0,0 +1,82 @@
+import pytest
+
+from ratelimit import MemoryBuckets, RateLimiter, RateLimitExceeded, SQLiteBuckets, _reserve, estimate_tokens, track_quota_wait
+
+LIMITS = {"requests": 60, "tokens": 6000}
+
+
+def test_fresh_bucket_starts_full():
+    levels, wait = _reserve({}, {}, 0.0, LIMITS, {"requests": 1, "tokens": 1000}, 60)
+    assert levels == {"requests": 59, "tokens": 5000}
+    assert wait == 0
+
+
+def test_empty_bucket_waits_for_its_refill():
+    # 60 requests per minute refill one per second
+    levels, wait = _reserve({"requests": 0}, {"requests": 10.0}, 10.0, {"requests": 60}, {"requests": 1}, 60)
+    assert levels == {"requests": -1}
+    assert wait == pytest.approx(1.0)
+
+
+def test_queued_reservations_wait_in_arrival_order():
+    levels, wait = _reserve({"requests": -1}, {"requests": 10.0}, 10.0, {"requests": 60}, {"requests": 1}, 60)
+    assert levels == {"requests": -2}
+    assert wait == pytest.approx(2.0)
+
+
+def test_refill_is_capped_at_the_limit():
+    levels, wait = _reserve({"requests": 30}, {"requests": 0.0}, 3600.0, {"requests": 60}, {"requests": 1}, 60)
+    assert levels == {"requests": 59}
+    assert wait == 0
+
+
+def test_wait_is_the_slowest_bucket():
+    levels, wait = _reserve({"requests": 10, "tokens": 0}, {"requests": 0.0, "tokens": 0.0}, 0.0, LIMITS,
+                            {"requests": 1, "tokens": 500}, 60)
+    assert levels == {"requests": 9, "tokens": -500}
+    assert wait == pytest.approx(5.0)
+
+
+def test_request_larger_than_the_bucket_waits_for_a_full_bucket():
+    levels, wait = _reserve({"tokens": 0}, {"tokens": 0.0}, 0.0, {"tokens": 6000}, {"tokens": 50000}, 120)
+    assert levels == {"tokens": -6000}
+    assert wait == pytest.approx(60.0)
+
+
+def test_wait_over_the_maximum_is_refused():
+    levels, wait = _reserve({"requests": -100}, {"requests": 0.0}, 0.0, {"requests": 60}, {"requests": 1}, 60)
+    assert levels is None
+    assert wait == pytest.approx(101.0)
+
+
+@pytest.mark.parametrize("make_buckets", [lambda tmp_path: MemoryBuckets(), lambda tmp_path: SQLiteBuckets(str(tmp_path / "rate.sqlite3"))])
+def test_buckets_keep_levels_per_key(tmp_path, make_buckets):
+    buckets = make_buckets(tmp_path)
+    assert buckets.reserve("a", {"requests": 2}, {"requests": 1}, 60) == (True, 0.0)
+    assert buckets.reserve("a", {"requests": 2}, {"requests": 1}, 60) == (True, 0.0)
+    ok, wait = buckets.reserve("a", {"requests": 2}, {"requests": 1}, 60)
+    assert ok and wait == pytest.approx(30.0, abs=0.1)
+    assert buckets.reserve("b", {"requests": 2}, {"requests": 1}, 60) == (True, 0.0)
+
+
+def test_limiter_refuses_and_reports_waits():
+    limiter = RateLimiter(rpm=1, tpm=0, max_wait=90)
+    client = object()
+    with track_quota_wait() as report:
+        limiter.reserve(client, "prompt")
+        _, _, wait = limiter.reserve(client, "prompt")
+    assert wait == pytest.approx(60.0, abs=0.1)
+    assert report["queue_depth"] == 1
+    with pytest.raises(RateLimitExceeded):
+        limiter.reserve(client, "prompt")
+
+
+def test_disabled_limiter_never_waits():
+    limiter = RateLimiter()
+    limiter.limits = {}
+    assert all(limiter.reserve(object(), "prompt")[2] == 0 for _ in range(100))
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 100
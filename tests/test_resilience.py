@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import resilience
+from resilience import (
+    CLIENT_ERROR, RATE_LIMITED, UNAVAILABLE, CircuitBreaker, CircuitOpenError, Resilience, classify_error,
+    mark_degraded, server_retry_delay, track_degraded,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class APIError(Exception):
+    def __init__(self, code, details=None):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+        self.details = details
+
+
+class Client:
+    pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+    return clock
+
+
+def test_breaker_opens_after_the_failure_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_in() == 30
+    assert breaker.times_opened == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_seconds=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.times_opened == 2
+    assert not breaker.allow()
+
+
+def test_abandoned_probe_frees_the_slot_after_reset_seconds(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+
+
+def test_classify_error():
+    assert classify_error(APIError(429)) == RATE_LIMITED
+    assert classify_error(APIError(503)) == UNAVAILABLE
+    assert classify_error(TimeoutError()) == UNAVAILABLE
+    assert classify_error(APIError(400)) == CLIENT_ERROR
+
+
+def test_server_retry_delay():
+    details = {"error": {"details": [{"@type": "RetryInfo", "retryDelay": "7s"}]}}
+    assert server_retry_delay(APIError(429, details)) == 7.0
+    assert server_retry_delay(APIError(429)) is None
+
+
+def test_call_retries_transient_errors(clock):
+    policy = Resilience(max_retries=3, failure_threshold=10)
+    outcomes = [APIError(503), APIError(429), "ok"]
+
+    def fn():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert policy.call(Client(), fn) == "ok"
+    assert policy.retries == 2
+
+
+def test_counters_add_up_across_threads(clock):
+    policy = Resilience(max_retries=1, failure_threshold=10 ** 6)
+
+    def flaky():
+        attempts = []
+
+        def fn():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise APIError(503)
+            return "ok"
+        return policy.call(Client(), fn)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(lambda _: flaky(), range(400))) == ["ok"] * 400
+    assert policy.stats()["retries"] == 400
+
+
+def test_call_raises_client_errors_without_retrying(clock):
+    policy = Resilience(max_retries=3)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise APIError(400)
+
+    with pytest.raises(APIError):
+        policy.call(Client(), fn)
+    assert len(calls) == 1
+
+
+def test_open_breaker_fails_fast(clock):
+    policy = Resilience(max_retries=5, failure_threshold=2, reset_seconds=30)
+    client = Client()
+
+    def fn():
+        raise APIError(503)
+
+    with pytest.raises(APIError):
+        policy.call(client, fn)
+    with pytest.raises(CircuitOpenError):
+        policy.call(client, fn)
+    assert policy.fast_failures == 1
+    assert policy.stats()["open_breakers"] == 1
+
+
+def test_track_degraded_collects_each_stage_once():
+    with track_degraded() as degraded:
+        mark_degraded("evaluator")
+        mark_degraded("evaluator")
+        mark_degraded("optimizer")
+    assert degraded == ["evaluator", "optimizer"]
+    mark_degraded("outside")
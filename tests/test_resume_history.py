@@ -0,0 +1,92 @@
+import pytest
+
+from resume_history import ResumeHistory
+
+BULLETS = "\n".join(f"\\resumeItem{{Shipped feature {n} for the billing platform, cutting errors by {n}\\%}}" for n in range(60))
+LATEX = f"\\documentclass{{article}}\n\\begin{{document}}\n{BULLETS}\n\\end{{document}}\n"
+
+
+def record(latex, score=6):
+    return {"latex_code": latex, "feedback": "Quantify more bullets.", "score": score, "optimized": False}
+
+
+def kinds(history, resume_id, field="latex_code"):
+    return history._versions[resume_id]["fields"][field][0]
+
+
+def test_records_roundtrip():
+    history = ResumeHistory()
+    history["a"] = record(LATEX)
+    assert history["a"] == record(LATEX)
+    assert "a" in history and "b" not in history
+    assert history.get("b") is None
+    with pytest.raises(KeyError):
+        history["b"]
+
+
+def test_reads_are_copies():
+    history = ResumeHistory()
+    history["a"] = record(LATEX)
+    history["a"]["score"] = 9
+    assert history["a"]["score"] == 6
+
+
+def test_small_edit_is_stored_as_a_delta_against_the_keyframe():
+    history = ResumeHistory()
+    history["a"] = record(LATEX)
+    edited = LATEX.replace("feature 7 ", "feature seven ")
+    history["b"] = record(edited, score=8)
+    assert kinds(history, "a") == "keyframe"
+    assert kinds(history, "b") == "delta"
+    assert history["b"]["latex_code"] == edited
+    assert history["a"]["latex_code"] == LATEX
+    report = history.memory_report()
+    assert report["stored_bytes"] < report["raw_bytes"]
+
+
+def test_unrelated_text_becomes_a_new_keyframe():
+    history = ResumeHistory()
+    history["a"] = record(LATEX)
+    other = "".join(chr(0x4e00 + (n * 7919) % 20000) for n in range(3000))
+    history["b"] = record(other)
+    assert kinds(history, "b") == "keyframe"
+    assert history["b"]["latex_code"] == other
+
+
+def test_identical_text_shares_one_keyframe():
+    history = ResumeHistory()
+    history["a"] = record(LATEX)
+    history["b"] = record(LATEX, score=7)
+    assert history._versions["a"]["fields"]["latex_code"] == history._versions["b"]["fields"]["latex_code"]
+    assert history.duplicate_fields == 2
+    assert history["b"]["score"] == 7
+
+
+def test_least_recently_used_version_is_evicted():
+    history = ResumeHistory(max_versions=2)
+    history["a"] = record(LATEX)
+    history["b"] = record(LATEX.replace("feature 1 ", "feature one "))
+    history["a"]
+    history["c"] = record(LATEX.replace("feature 2 ", "feature two "))
+    assert "b" not in history
+    assert len(history) == 2
+    assert history.evictions == 1
+    assert history["c"]["latex_code"] == LATEX.replace("feature 2 ", "feature two ")
+
+
+def test_keyframes_are_freed_once_nothing_refers_to_them():
+    history = ResumeHistory(max_versions=1)
+    history["a"] = record(LATEX)
+    history["b"] = record("\\documentclass{article}\\begin{document}Short\\end{document}")
+    # Only b's own texts remain: its LaTeX and the shared feedback
+    assert len(history._keyframes) <= 2
+    assert history["b"]["feedback"] == "Quantify more bullets."
+
+
+def test_resaving_a_version_replaces_it():
+    history = ResumeHistory()
+    history["a"] = record(LATEX)
+    history["a"] = record(LATEX.replace("feature 3 ", "feature three "), score=9)
+    assert len(history) == 1
+    assert history["a"]["score"] == 9
+    assert "feature three" in history["a"]["latex_code"]
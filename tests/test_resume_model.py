@@ -0,0 +1,91 @@
+from resume_model import parse_resume, section_key, strip_code_fence
+
+RESUME = r"""\documentclass{article}
+\begin{document}
+\begin{center}
+\textbf{\Huge Jane Doe} \\ 555-123-4567 $|$ \href{mailto:jane@example.com}{jane@example.com} $|$
+\href{https://github.com/jane}{github.com/jane}
+\end{center}
+
+%-----------EXPERIENCE-----------
+\section{Experience}
+\resumeSubheading{Software Engineer}{Jan 2020 -- Present}{Acme Corp}{Remote}
+\resumeItem{Cut invoice errors by 40\%}
+\resumeItem{Led a migration to Kubernetes}
+
+\section{Projects}
+\resumeProjectHeading{\textbf{Resume Tool} $|$ Python}{2023}
+\resumeItem{Parses LaTeX resumes}
+
+\section{Education}
+\resumeSubheading{State University}{Springfield}{B.S. Computer Science}{May 2019}
+
+\section{Technical Skills}
+\textbf{Languages}{: Python, Go} \\
+\textbf{Tools}{: Docker, Git}
+\end{document}
+"""
+
+
+def test_contact_details_come_from_the_heading():
+    contact = parse_resume(RESUME).contact
+    assert contact["name"] == "Jane Doe"
+    assert contact["email"] == "jane@example.com"
+    assert contact["phone"] == "555-123-4567"
+    assert contact["links"] == ["https://github.com/jane"]
+
+
+def test_sections_are_indexed_and_roundtrip():
+    document = parse_resume(RESUME)
+    assert [section.key for section in document.sections] == [
+        "preamble", "heading", "experience", "projects", "education", "skills", "closing"]
+    assert "".join(section.text for section in document.sections) == RESUME
+    # The comment banner belongs to the section below it
+    assert document.section("experience").text.startswith("%-----------EXPERIENCE")
+    assert document.section("awards") is None
+    assert document.section_text("awards") == ""
+
+
+def test_entries_bullets_and_dates():
+    document = parse_resume(RESUME)
+    job, project, school = document.entries
+    assert (job["title"], job["subtitle"], job["date"], job["location"]) == (
+        "Software Engineer", "Acme Corp", "Jan 2020 -- Present", "Remote")
+    assert [bullet["text"] for bullet in job["bullets"]] == ["Cut invoice errors by 40%", "Led a migration to Kubernetes"]
+    assert project["kind"] == "project" and project["date"] == "2023"
+    # Education puts the date last
+    assert (school["date"], school["location"]) == ("May 2019", "Springfield")
+    assert len(document.bullets_by_section["experience"]) == 2
+    assert document.dates == ["Jan 2020 -- Present", "2023", "May 2019"]
+
+
+def test_skill_lines():
+    assert parse_resume(RESUME).skill_lines == {"Languages": ["Python", "Go"], "Tools": ["Docker", "Git"]}
+
+
+def test_content_drops_the_preamble():
+    document = parse_resume(RESUME)
+    assert "\\documentclass" not in document.content
+    assert "Cut invoice errors by 40%" in document.text
+
+
+def test_parse_is_cached_by_content():
+    assert parse_resume(RESUME) is parse_resume(RESUME)
+    assert parse_resume(RESUME + " ") is not parse_resume(RESUME)
+
+
+def test_plain_text_is_one_unsplit_document():
+    document = parse_resume("Jane Doe\nPython developer")
+    assert document.sections == []
+    assert document.content == "Jane Doe\nPython developer"
+
+
+def test_section_key():
+    assert section_key("Professional Experience") == "experience"
+    assert section_key("Technical Skills \\& Certifications") == "skills"
+    assert section_key("Volunteer Work") == "volunteer_work"
+
+
+def test_strip_code_fence():
+    assert strip_code_fence("```latex\n\\section{A}\n```") == "\\section{A}"
+    assert strip_code_fence(None) == ""
@@ -0,0 +1,95 @@
+from resume_sections import (
+    DEFAULT_SECTIONS, SECTION_MARKER, format_sections, parse_section_rewrites, select_sections, splice_sections,
+    split_sections,
+)
+
+RESUME = r"""\documentclass{article}
+\newcommand{\resumeItem}[1]{\item{#1}}
+\begin{document}
+\begin{center}{\Huge Jane Doe} \\ jane@example.com\end{center}
+
+\section{Experience}
+\resumeItem{Built a billing service}
+
+\section{Technical Skills}
+Python, Go
+
+\section{Hobbies}
+Chess
+
+\section{Experience}
+\resumeItem{Ran the on-call rotation}
+
+\end{document}
+"""
+
+
+def keys(sections):
+    return [section.key for section in sections]
+
+
+def test_split_into_preamble_heading_sections_and_closing():
+    sections = split_sections(RESUME)
+    assert keys(sections) == ["preamble", "heading", "experience", "skills", "hobbies", "experience_2", "closing"]
+    assert "".join(section.text for section in sections) == RESUME
+
+
+def test_split_returns_none_without_a_document():
+    assert split_sections("Jane Doe, Python developer") is None
+
+
+def test_select_sections_from_feedback_keywords_and_titles():
+    sections = split_sections(RESUME)
+    assert select_sections(sections, "Quantify the bullets", score=7) == ["experience", "experience_2"]
+    assert select_sections(sections, "Drop the hobbies section", score=7) == ["hobbies"]
+
+
+def test_select_sections_adds_the_defaults_for_a_low_score_or_vague_feedback():
+    sections = split_sections(RESUME)
+    expected = [key for key in keys(sections) if key.split("_")[0] in DEFAULT_SECTIONS]
+    assert select_sections(sections, "Looks fine", score=7) == expected
+    assert select_sections(sections, "Mention the hobbies", score=3) == [
+        key for key in keys(sections) if key in expected or key == "hobbies"]
+
+
+def test_select_sections_from_ats_categories():
+    sections = split_sections(RESUME)
+    report = {"breakdown": {"skills": {"score": 2, "max": 5}, "education": {"score": 2, "max": 2}}}
+    assert select_sections(sections, "", score=7, ats_report=report) == ["skills"]
+    report["breakdown"]["formatting"] = {"score": 7, "max": 10}
+    assert select_sections(sections, "", score=7, ats_report=report) is None
+
+
+def test_format_and_parse_roundtrip():
+    sections = split_sections(RESUME)
+    prompt = format_sections(sections, ["experience", "skills"])
+    assert prompt.startswith(SECTION_MARKER + "experience\n\\section{Experience}")
+    assert parse_section_rewrites(prompt, ["experience", "skills"]) == {
+        "experience": "\\section{Experience}\n\\resumeItem{Built a billing service}",
+        "skills": "\\section{Technical Skills}\nPython, Go",
+    }
+
+
+def test_parse_drops_unknown_empty_and_restructuring_sections():
+    response = "\n".join([
+        "```latex",
+        SECTION_MARKER + "experience",
+        "\\section{Experience}\n\\resumeItem{Cut costs 20\\%}",
+        SECTION_MARKER + "education",
+        "\\section{Education}\nState University",
+        SECTION_MARKER + "skills",
+        "Python, Go",
+        SECTION_MARKER + "heading",
+        "\\end{document}",
+        "```",
+    ])
+    assert parse_section_rewrites(response, ["experience", "skills", "heading"]) == {
+        "experience": "\\section{Experience}\n\\resumeItem{Cut costs 20\\%}",
+    }
+
+
+def test_splice_keeps_untouched_sections_and_spacing():
+    sections = split_sections(RESUME)
+    rewritten = splice_sections(sections, {"skills": "\\section{Technical Skills}\nPython, Go, SQL"})
+    assert rewritten == RESUME.replace("Python, Go\n", "Python, Go, SQL\n")
+    assert splice_sections(sections, {}) == RESUME
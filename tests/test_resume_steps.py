@@ -0,0 +1,63 @@
+import pytest
+
+import resume_steps
+from resume_steps import evaluate_match, optimize_resume, run_step, tailor_resume
+
+RESUME = r"""\documentclass{article}
+\begin{document}
+\section{Experience}
+\begin{itemize}
+\item Built a billing service
+\end{itemize}
+\section{Skills}
+Python
+\end{document}
+"""
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Answers each call with the next scripted text and records the calls made."""
+    calls = []
+    answers = []
+
+    def generate_content(client, **call):
+        calls.append(call)
+        return Response(answers.pop(0))
+    monkeypatch.setattr(resume_steps, "generate_content", generate_content)
+    return calls, answers
+
+
+def test_models_map_overrides_the_model_per_stage(gemini):
+    calls, answers = gemini
+    answers += ["SCORE: 7\nFEEDBACK: Fine."]
+    assert run_step(object(), evaluate_match(True, RESUME, "Python"), {"evaluator": "other-model"}) == (7, "Fine.")
+    assert calls[0]["model"] == "other-model" and calls[0]["stage"] == "evaluator"
+
+
+def test_unreadable_score_is_none(gemini):
+    _, answers = gemini
+    answers += ["Looks good to me."]
+    assert run_step(object(), evaluate_match(True, RESUME, "Python")) == (None, "No specific feedback available.")
+
+
+def test_optimize_falls_back_to_the_whole_document(gemini):
+    calls, answers = gemini
+    answers += ["no section markers here", RESUME.replace("billing", "payments")]
+    latex = run_step(object(), optimize_resume(True, RESUME, "Python", "Improve the experience section", score=5))
+    assert "payments service" in latex
+    assert [call["prefix_name"] for call in calls] == ["resume_section_optimizer", "resume_optimizer"]
+
+
+def test_tailor_resume_without_gemini_uses_the_local_fallbacks():
+    result = run_step(None, tailor_resume(False, "Jane Doe\njane@example.com", {"company_name": "Acme", "job_description": "Python"}))
+    assert result["company_name"] == "Acme"
+    assert "\\documentclass" in result["latex_code"] and "jane@example.com" in result["latex_code"]
+    assert result["score"] == 6 and result["optimized"] is True
+    assert result["degraded"] is False
@@ -0,0 +1,36 @@
+import pytest
+
+from llm_cache import MemoryCache, SQLiteCache
+from resume_storage import ResumeStore, create_resume_store
+
+RECORD = {"latex_code": "\\documentclass{article}", "score": 8, "feedback": "Good match."}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return ResumeStore(SQLiteCache(path=str(tmp_path / "resumes.sqlite3"), max_entries=10, ttl=60))
+    return ResumeStore(MemoryCache(max_entries=10, ttl=60))
+
+
+def test_saved_records_round_trip(store):
+    store.save("id", RECORD)
+    assert store.get("id") == RECORD
+    assert "id" in store and "other" not in store and len(store) == 1
+
+
+def test_api_key_is_never_persisted(store):
+    store.save("id", dict(RECORD, api_key="AIza-secret"))
+    assert store.get("id") == RECORD
+    assert "AIza-secret" not in store.backend.get("id")
+
+
+def test_records_are_evicted_past_the_size_cap():
+    store = ResumeStore(MemoryCache(max_entries=2, ttl=60))
+    for resume_id in ("a", "b", "c"):
+        store.save(resume_id, RECORD)
+    assert "a" not in store and len(store) == 2
+
+
+def test_unknown_backend_falls_back_to_memory():
+    assert isinstance(create_resume_store("redis").backend, MemoryCache)
@@ -0,0 +1,63 @@
+from skill_taxonomy import SKILL_TAXONOMY, SkillMatcher, skill_matcher
+
+TAXONOMY = {
+    "Languages": {
+        "JavaScript": ["js"],
+        "Java": [],
+        "C": [],
+        "C++": ["cpp"],
+        "Go": ["golang"],
+    },
+    "Cloud": {
+        "AWS": ["amazon web services", "amazon"],
+    },
+}
+
+
+def matcher():
+    return SkillMatcher(TAXONOMY, case_sensitive=frozenset(["C", "Go"]))
+
+
+def test_aliases_resolve_to_the_canonical_name():
+    assert matcher().find("Shipped services in golang and JS on Amazon Web Services") == ["Go", "JavaScript", "AWS"]
+
+
+def test_matches_are_whole_words():
+    assert matcher().find("JavaScript, c++ and cppcheck") == ["JavaScript", "C++"]
+
+
+def test_leftmost_longest_match_wins():
+    assert matcher().scan("amazon web services") == [(0, 19, "AWS")]
+
+
+def test_case_sensitive_aliases_must_be_written_exactly():
+    assert matcher().find("Let's go build it in c") == []
+    assert matcher().find("Go and C") == ["Go", "C"]
+    assert matcher().find("GOLANG") == ["Go"]
+
+
+def test_find_keeps_first_mention_order_without_duplicates():
+    assert matcher().find("Java, golang, Go, java") == ["Java", "Go"]
+    assert matcher().find(None) == []
+
+
+def test_resolve_only_accepts_a_single_whole_skill():
+    m = matcher()
+    assert m.resolve("golang") == "Go"
+    assert m.resolve("Amazon Web Services") == "AWS"
+    assert m.resolve("Java and Go") is None
+    assert m.resolve("Cobol") is None
+
+
+def test_category_of_each_canonical_name():
+    m = matcher()
+    assert m.category["AWS"] == "Cloud"
+    assert m.category["C++"] == "Languages"
+
+
+def test_bundled_taxonomy_aliases():
+    assert skill_matcher.resolve("python3") == "Python"
+    assert skill_matcher.resolve("csharp") == "C#"
+    assert skill_matcher.find("Experience with R and Python") == ["R", "Python"]
+    assert skill_matcher.find("r and python") == ["Python"]
+    assert all(canonical in skill_matcher.category for skills in SKILL_TAXONOMY.values() for canonical in skills)
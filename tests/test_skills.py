@@ -0,0 +1,34 @@
+from latex_lint import lint_latex, repair_latex
+from skills import escape_latex, render_skills_latex
+
+SKILLS = {
+    "current_skills_by_category": {"R&D Tools": ["C#", "100% uptime SLOs", "snake_case APIs", "C:\\tools"]},
+    "recommended_skills_by_category": {"r&d tools": ["F#", "c#"]},
+    "current_certifications": ["AWS #1"],
+    "recommended_certifications": [],
+}
+
+
+def document(section):
+    return "\\documentclass{article}\n\\begin{document}\n" + section + "\n\\end{document}\n"
+
+
+def test_escape_latex_escapes_every_special():
+    assert escape_latex("R&D 100% #1 snake_case C:\\tools") == "R\\&D 100\\% \\#1 snake\\_case C:\\textbackslash{}tools"
+
+
+def test_rendered_skills_are_escaped():
+    section = render_skills_latex(SKILLS, mark_recommended=True)
+    assert "\\textbf{R\\&D Tools}{: C\\#, 100\\% uptime SLOs, snake\\_case APIs, C:\\textbackslash{}tools, F\\# (Recommended)} \\\\" in section
+    assert "\\textbf{Certifications}{: AWS \\#1}" in section
+
+
+def test_rendered_skills_are_lint_clean():
+    latex = document(render_skills_latex(SKILLS))
+    assert lint_latex(latex) == []
+    assert repair_latex(latex)[0] == latex
+
+
+def test_lint_catches_a_skill_that_was_not_escaped():
+    latex = document(render_skills_latex(SKILLS).replace("C\\#", "C#"))
+    assert [issue["code"] for issue in lint_latex(latex)] == ["unescaped_character"]
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+import speculation
+from pipeline import Deadline
+from resilience import mark_degraded, track_degraded
+from speculation import AsyncSpeculation, Speculation, SpeculationStats
+
+DRAFT = "\\section{Experience}\nBuilt a billing service"
+OPTIMIZED = "\\section{Experience}\nBuilt a billing service handling 2M payments a day"
+
+
+class Client:
+    """Stands in for the optimizer's Gemini client: answers with `answer` or raises `error`, optionally after `gate` opens."""
+
+    def __init__(self, answer=OPTIMIZED, error=None, gate=None):
+        self.answer = answer
+        self.error = error
+        self.gate = gate
+        self.calls = 0
+        self.started = threading.Event()
+
+    def optimize(self, latex_code):
+        self.calls += 1
+        self.started.set()
+        if self.gate:
+            self.gate.wait(5)
+        mark_degraded("optimizer")
+        if self.error:
+            raise self.error
+        return self.answer
+
+    async def aoptimize(self, latex_code):
+        self.calls += 1
+        if self.gate:
+            await asyncio.wait_for(self.gate.wait(), 5)
+        mark_degraded("optimizer")
+        if self.error:
+            raise self.error
+        return self.answer
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = SpeculationStats()
+    monkeypatch.setattr(speculation, "speculation_stats", stats)
+    return stats
+
+
+def counts(stats):
+    report = stats.stats()
+    return {key: report[key] for key in ("started", "won", "discarded", "cancelled", "failed")}
+
+
+def test_won_returns_the_result_and_reports_its_degraded_stages(stats):
+    with track_degraded() as degraded:
+        assert Speculation(Client().optimize, (DRAFT,), baseline=DRAFT).accept() == OPTIMIZED
+    assert degraded == ["optimizer"]
+    assert counts(stats) == {"started": 1, "won": 1, "discarded": 0, "cancelled": 0, "failed": 0}
+    assert stats.stats()["win_rate"] == 1.0 and stats.stats()["saved_seconds"] >= 0
+
+
+def test_discarded_result_is_never_returned(stats):
+    gate = threading.Event()
+    client = Client(gate=gate)
+    with track_degraded() as degraded:
+        run = Speculation(client.optimize, (DRAFT,), baseline=DRAFT)
+        assert client.started.wait(5)
+        run.discard()
+        gate.set()
+        run.future.result(5)
+        assert run.accept() is None
+    assert degraded == []
+    assert counts(stats) == {"started": 1, "won": 0, "discarded": 1, "cancelled": 0, "failed": 0}
+
+
+def test_discard_before_the_call_starts_cancels_it(stats, monkeypatch):
+    monkeypatch.setattr(speculation, "submit", lambda fn, *args: Future())
+    client = Client()
+    run = Speculation(client.optimize, (DRAFT,))
+    run.discard()
+    assert run.future.cancelled() and client.calls == 0
+    assert counts(stats) == {"started": 1, "won": 0, "discarded": 1, "cancelled": 1, "failed": 0}
+
+
+def test_discard_after_accept_does_nothing(stats):
+    run = Speculation(Client().optimize, (DRAFT,))
+    assert run.accept() == OPTIMIZED
+    run.discard()
+    assert counts(stats)["discarded"] == 0 and counts(stats)["won"] == 1
+
+
+@pytest.mark.parametrize("client", [Client(answer=DRAFT), Client(answer=None), Client(error=RuntimeError("quota"))])
+def test_unusable_results_count_as_failed(stats, client):
+    with track_degraded() as degraded:
+        assert Speculation(client.optimize, (DRAFT,), baseline=DRAFT).accept() is None
+    assert degraded == []
+    assert counts(stats) == {"started": 1, "won": 0, "discarded": 0, "cancelled": 0, "failed": 1}
+    assert stats.stats()["win_rate"] == 0.0
+
+
+def test_missing_the_deadline_counts_as_failed(stats):
+    gate = threading.Event()
+    run = Speculation(Client(gate=gate).optimize, (DRAFT,))
+    try:
+        assert run.accept(Deadline(0.05)) is None
+    finally:
+        gate.set()
+    assert counts(stats)["failed"] == 1
+
+
+def test_async_won(stats):
+    async def scenario():
+        with track_degraded() as degraded:
+            result = await AsyncSpeculation(Client().aoptimize(DRAFT), baseline=DRAFT).accept()
+        return result, degraded
+
+    assert asyncio.run(scenario()) == (OPTIMIZED, ["optimizer"])
+    assert counts(stats) == {"started": 1, "won": 1, "discarded": 0, "cancelled": 0, "failed": 0}
+
+
+def test_async_discard_cancels_the_call_and_never_returns_its_result(stats):
+    async def scenario():
+        run = AsyncSpeculation(Client(gate=asyncio.Event()).aoptimize(DRAFT), baseline=DRAFT)
+        await asyncio.sleep(0)
+        run.discard()
+        await asyncio.wait([run.task])
+        return run.task.cancelled(), await run.accept()
+
+    assert asyncio.run(scenario()) == (True, None)
+    assert counts(stats) == {"started": 1, "won": 0, "discarded": 1, "cancelled": 1, "failed": 0}
+
+
+def test_async_discard_after_the_call_finished_is_not_a_cancellation(stats):
+    async def scenario():
+        run = AsyncSpeculation(Client().aoptimize(DRAFT), baseline=DRAFT)
+        await asyncio.sleep(0)
+        run.discard()
+        return await run.accept()
+
+    assert asyncio.run(scenario()) is None
+    assert counts(stats) == {"started": 1, "won": 0, "discarded": 1, "cancelled": 0, "failed": 0}
+
+
+@pytest.mark.parametrize("client", [Client(answer=DRAFT), Client(error=RuntimeError("quota")), Client(gate=asyncio.Event())])
+def test_async_unusable_results_count_as_failed(stats, client):
+    async def scenario():
+        return await AsyncSpeculation(client.aoptimize(DRAFT), baseline=DRAFT).accept(Deadline(0.05))
+
+    assert asyncio.run(scenario()) is None
+    assert counts(stats) == {"started": 1, "won": 0, "discarded": 0, "cancelled": 0, "failed": 1}
+
+
+def test_stats_averages_the_saved_time_over_wins():
+    stats = SpeculationStats()
+    for outcome, saved in (("started", 0), ("won", 1.5), ("won", 0.5), ("discarded", 0), ("failed", 0)):
+        stats.record(outcome, saved)
+    report = stats.stats()
+    assert report["win_rate"] == 0.5
+    assert report["saved_seconds"] == 2.0 and report["avg_saved_seconds"] == 1.0
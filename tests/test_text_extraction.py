@@ -0,0 +1,61 @@
+from io import BytesIO
+
+import docx
+import PyPDF2
+
+from text_extraction import extract_docx_text, iter_docx_text, iter_pdf_text, join_chunks
+
+
+def docx_bytes():
+    document = docx.Document()
+    document.add_paragraph("Jane Doe")
+    table = document.add_table(rows=2, cols=3)
+    table.rows[0].cells[0].text = "Skills"
+    merged = table.rows[0].cells[1].merge(table.rows[0].cells[2])
+    merged.text = "Python, Go"
+    table.rows[1].cells[0].text = "Email"
+    table.rows[1].cells[2].text = "jane@example.com"
+    document.add_paragraph("Experience")
+    stream = BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+def pdf_bytes(pages):
+    writer = PyPDF2.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    stream = BytesIO()
+    writer.write(stream)
+    return stream.getvalue()
+
+
+def test_docx_tables_are_read_in_document_order():
+    assert list(iter_docx_text(docx_bytes())) == [
+        "Jane Doe",
+        "Skills | Python, Go",
+        "Email | jane@example.com",
+        "Experience",
+    ]
+
+
+def test_docx_text_stops_at_the_character_budget():
+    assert extract_docx_text(docx_bytes(), max_chars=20) == "Jane Doe\nSkills | Py"
+
+
+def test_pdf_pages_stop_at_the_page_budget():
+    assert len(list(iter_pdf_text(pdf_bytes(5), max_pages=2))) == 2
+    assert len(list(iter_pdf_text(BytesIO(pdf_bytes(3)), max_pages=10))) == 3
+
+
+def test_join_chunks_stops_reading_once_the_budget_is_reached():
+    read = []
+
+    def chunks():
+        for chunk in ("abcd", "efgh", "ijkl", "mnop"):
+            read.append(chunk)
+            yield chunk
+
+    assert join_chunks(chunks(), max_chars=7) == "abcd\nef"
+    assert read == ["abcd", "efgh"]
+    assert join_chunks(["  a", "b  "], max_chars=100) == "a\nb"
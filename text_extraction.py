@@ -0,0 +1,63 @@
+import os
+from io import BytesIO
+
+# A resume never needs page 40: stop extracting after this many pages/characters
+EXTRACT_MAX_PAGES = int(os.environ.get("EXTRACT_MAX_PAGES", "10"))
+EXTRACT_MAX_CHARS = int(os.environ.get("EXTRACT_MAX_CHARS", "50000"))
+
+
+def _as_stream(file_content):
+    return BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+
+
+def iter_pdf_text(file_content, max_pages=EXTRACT_MAX_PAGES):
+    """Yields the text of each PDF page, up to max_pages."""
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(_as_stream(file_content))
+    for index, page in enumerate(pdf_reader.pages):
+        if index >= max_pages:
+            break
+        yield page.extract_text() or ""
+
+
+def iter_docx_text(file_content):
+    """Yields DOCX paragraphs and table rows in document order."""
+    import docx
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    document = docx.Document(_as_stream(file_content))
+    for child in document.element.body.iterchildren():
+        tag = child.tag.rsplit("}", 1)[-1]
+        if tag == "p":
+            yield Paragraph(child, document).text
+        elif tag == "tbl":
+            for row in Table(child, document).rows:
+                cells = []
+                for cell in row.cells:
+                    # Merged cells are repeated once per grid column
+                    text = cell.text.strip()
+                    if text and (not cells or cells[-1] != text):
+                        cells.append(text)
+                if cells:
+                    yield " | ".join(cells)
+
+
+def join_chunks(chunks, max_chars=EXTRACT_MAX_CHARS):
+    """Joins extracted chunks once, stopping as soon as the character budget is reached."""
+    parts = []
+    total = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        total += len(chunk) + 1
+        if total >= max_chars:
+            break
+    return "\n".join(parts)[:max_chars].strip()
+
+
+def extract_pdf_text(file_content, max_pages=EXTRACT_MAX_PAGES, max_chars=EXTRACT_MAX_CHARS):
+    return join_chunks(iter_pdf_text(file_content, max_pages), max_chars)
+
+
+def extract_docx_text(file_content, max_chars=EXTRACT_MAX_CHARS):
+    return join_chunks(iter_docx_text(file_content), max_chars)